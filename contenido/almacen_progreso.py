@@ -0,0 +1,235 @@
+# contenido/almacen_progreso.py
+"""
+Almacén persistente de progreso y tabla de posiciones (SQLite en modo WAL)
+- Escrituras asíncronas: registrar() solo encola; un hilo escritor vacía la cola en lotes (una transacción por lote)
+- Idempotente: cada evento lleva una clave (usuario, fuente, clave); los reenvíos de Streamlit (reruns) se ignoran
+- Tablas: eventos (historial, índice usuario+ts), progreso (acumulado por usuario, índice cohorte+puntaje)
+  e insignias; lectores concurrentes sin bloquear al escritor (WAL), una conexión de lectura por hilo
+- Fuentes: "gamificacion", "adaptativa" (simulacion_adaptativa) y "brotes" (pestaña de decisiones)
+- Suscriptores: tras cada lote, los eventos nuevos se entregan a los callbacks (p. ej. contenido/analitica_items.py)
+Ruta: EPI101_PROGRESO en st.secrets o entorno; por defecto contenido/progreso.db
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+RUTA_PROGRESO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "progreso.db")
+COHORTE_DEFECTO = "general"
+LOTE_MAX = 2000
+ESPERA_LOTE = 0.05      # segundos que el escritor espera para agrupar eventos
+TIMEOUT_SQLITE = 10
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    usuario TEXT NOT NULL,
+    cohorte TEXT NOT NULL,
+    fuente TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    item TEXT,
+    correcto INTEGER,
+    puntos INTEGER NOT NULL DEFAULT 0,
+    detalle TEXT,
+    UNIQUE (usuario, fuente, clave)
+);
+CREATE INDEX IF NOT EXISTS idx_eventos_usuario_ts ON eventos (usuario, ts);
+CREATE TABLE IF NOT EXISTS progreso (
+    usuario TEXT PRIMARY KEY,
+    cohorte TEXT NOT NULL,
+    puntaje INTEGER NOT NULL DEFAULT 0,
+    respuestas INTEGER NOT NULL DEFAULT 0,
+    correctas INTEGER NOT NULL DEFAULT 0,
+    actualizado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_progreso_cohorte_puntaje ON progreso (cohorte, puntaje DESC);
+CREATE TABLE IF NOT EXISTS insignias (
+    usuario TEXT NOT NULL,
+    insignia TEXT NOT NULL,
+    ts REAL NOT NULL,
+    PRIMARY KEY (usuario, insignia)
+);
+"""
+
+_UPSERT_PROGRESO = """
+INSERT INTO progreso (usuario, cohorte, puntaje, respuestas, correctas, actualizado) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (usuario) DO UPDATE SET
+    cohorte = excluded.cohorte,
+    puntaje = puntaje + excluded.puntaje,
+    respuestas = respuestas + excluded.respuestas,
+    correctas = correctas + excluded.correctas,
+    actualizado = excluded.actualizado
+"""
+
+
+def ruta_progreso():
+    """EPI101_PROGRESO desde st.secrets, luego el entorno; por defecto contenido/progreso.db."""
+    valor = None
+    try:
+        import streamlit as st
+        valor = st.secrets.get("EPI101_PROGRESO")
+    except Exception:
+        pass
+    return valor or os.environ.get("EPI101_PROGRESO") or RUTA_PROGRESO
+
+def _conectar(ruta):
+    con = sqlite3.connect(ruta, timeout=TIMEOUT_SQLITE, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+
+# --------------------------
+# ALMACÉN
+# --------------------------
+class AlmacenProgreso:
+    def __init__(self, ruta=RUTA_PROGRESO):
+        self.ruta = ruta
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        with _conectar(ruta) as con:
+            con.executescript(ESQUEMA)
+        self._cola = queue.Queue()
+        self._lectura = threading.local()
+        self._suscriptores = []
+        self._escritor = threading.Thread(target=self._escribir, name="almacen-progreso", daemon=True)
+        self._escritor.start()
+        atexit.register(self.vaciar)
+
+    # escrituras ---------------------------------------------------------
+    def registrar(self, usuario, fuente, clave, puntos=0, correcto=None, item=None, cohorte=COHORTE_DEFECTO, detalle=None, insignia=None):
+        """Encola un evento (no bloquea). correcto=None marca eventos que no son respuestas (p. ej. insignias)."""
+        self._cola.put((time.time(), usuario, cohorte or COHORTE_DEFECTO, fuente, str(clave), item,
+                        None if correcto is None else int(bool(correcto)), int(puntos),
+                        json.dumps(detalle, ensure_ascii=False) if detalle is not None else None, insignia))
+
+    def suscribir(self, callback):
+        """callback(eventos) recibe, en el hilo escritor, los eventos recién guardados de cada lote (dicts)."""
+        self._suscriptores.append(callback)
+
+    def vaciar(self):
+        """Espera a que el escritor persista todo lo encolado."""
+        if self._escritor.is_alive():
+            self._cola.join()
+
+    def _escribir(self):
+        con = _conectar(self.ruta)
+        while True:
+            lote = [self._cola.get()]
+            if self._cola.empty():
+                time.sleep(ESPERA_LOTE)     # deja que lleguen más eventos antes de abrir la transacción
+            while len(lote) < LOTE_MAX:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                nuevos = self._escribir_lote(con, lote)
+                for callback in self._suscriptores:
+                    callback(nuevos)
+            except Exception:
+                pass    # el progreso es best-effort: un lote o suscriptor fallido no debe tumbar el hilo
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+
+    @staticmethod
+    def _escribir_lote(con, lote):
+        acumulado, nuevos = {}, []
+        with con:
+            for ts, usuario, cohorte, fuente, clave, item, correcto, puntos, detalle, insignia in lote:
+                cur = con.execute(
+                    "INSERT OR IGNORE INTO eventos (ts, usuario, cohorte, fuente, clave, item, correcto, puntos, detalle) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (ts, usuario, cohorte, fuente, clave, item, correcto, puntos, detalle))
+                if cur.rowcount == 0:
+                    continue    # reenvío de un evento ya guardado
+                if insignia:
+                    con.execute("INSERT OR IGNORE INTO insignias (usuario, insignia, ts) VALUES (?, ?, ?)", (usuario, insignia, ts))
+                nuevos.append({"usuario": usuario, "fuente": fuente, "item": item, "correcto": correcto,
+                               "opcion": json.loads(detalle).get("opcion") if detalle else None})
+                fila = acumulado.setdefault(usuario, [cohorte, 0, 0, 0, ts])
+                fila[0], fila[4] = cohorte, ts
+                fila[1] += puntos
+                fila[2] += correcto is not None
+                fila[3] += bool(correcto)
+            con.executemany(_UPSERT_PROGRESO, [(u, *f) for u, f in acumulado.items()])
+        return nuevos
+
+    # lecturas -----------------------------------------------------------
+    def _con(self):
+        con = getattr(self._lectura, "con", None)
+        if con is None:
+            con = self._lectura.con = _conectar(self.ruta)
+            con.row_factory = sqlite3.Row
+        return con
+
+    def top(self, cohorte=COHORTE_DEFECTO, n=10):
+        """Tabla de posiciones de una cohorte (índice cohorte + puntaje)."""
+        filas = self._con().execute(
+            "SELECT usuario, puntaje, respuestas, correctas FROM progreso WHERE cohorte = ? ORDER BY puntaje DESC LIMIT ?",
+            (cohorte, n)).fetchall()
+        return [dict(f) for f in filas]
+
+    def historial(self, usuario, n=50, fuente=None):
+        """Últimos n eventos del usuario (índice usuario + ts)."""
+        sql = "SELECT ts, fuente, item, correcto, puntos FROM eventos WHERE usuario = ?"
+        args = [usuario]
+        if fuente:
+            sql += " AND fuente = ?"
+            args.append(fuente)
+        filas = self._con().execute(sql + " ORDER BY ts DESC LIMIT ?", (*args, n)).fetchall()
+        return [dict(f) for f in filas]
+
+    def version_cohorte(self, cohorte=COHORTE_DEFECTO):
+        """(usuarios, respuestas, última actualización) de la cohorte; cambia con cada evento nuevo (índice cohorte)."""
+        fila = self._con().execute("SELECT COUNT(*), SUM(respuestas), MAX(actualizado) FROM progreso WHERE cohorte = ?", (cohorte,)).fetchone()
+        return tuple(fila)
+
+    def respuestas_cohorte(self, cohorte=COHORTE_DEFECTO):
+        """Respuestas evaluadas (ítem + correcto) de todos los usuarios de la cohorte, por puntaje y luego en orden temporal."""
+        filas = self._con().execute(
+            "SELECT e.usuario, p.puntaje, e.ts, e.fuente, e.item, e.correcto FROM progreso p JOIN eventos e ON e.usuario = p.usuario "
+            "WHERE p.cohorte = ? AND e.correcto IS NOT NULL ORDER BY p.puntaje DESC, e.usuario, e.ts", (cohorte,)).fetchall()
+        return [dict(f) for f in filas]
+
+    def progreso(self, usuario):
+        """Acumulado del usuario (puntaje, respuestas, correctas, insignias y totales por fuente) o None."""
+        con = self._con()
+        fila = con.execute("SELECT * FROM progreso WHERE usuario = ?", (usuario,)).fetchone()
+        if fila is None:
+            return None
+        res = dict(fila)
+        res["insignias"] = [r[0] for r in con.execute("SELECT insignia FROM insignias WHERE usuario = ? ORDER BY ts", (usuario,))]
+        res["por_fuente"] = {r["fuente"]: {"puntos": r["puntos"], "respuestas": r["respuestas"], "correctas": r["correctas"] or 0}
+                             for r in con.execute("SELECT fuente, SUM(puntos) AS puntos, COUNT(correcto) AS respuestas, SUM(correcto) AS correctas "
+                                                  "FROM eventos WHERE usuario = ? GROUP BY fuente", (usuario,))}
+        return res
+
+
+_almacen = None
+_almacen_lock = threading.Lock()
+
+def obtener_almacen(ruta=None):
+    """Almacén compartido por el proceso de la app (un solo hilo escritor)."""
+    global _almacen
+    with _almacen_lock:
+        if _almacen is None:
+            _almacen = AlmacenProgreso(ruta or ruta_progreso())
+        return _almacen
+
+def identidad_sesion():
+    """(usuario, cohorte) de la sesión de Streamlit; sin nombre propio se asigna un alias anónimo estable en la sesión."""
+    import streamlit as st
+    if "usuario_progreso" not in st.session_state:
+        nombre = (st.session_state.get("user_info") or {}).get("name")
+        st.session_state.usuario_progreso = nombre if nombre and nombre != "Demo" else f"anon-{uuid.uuid4().hex[:8]}"
+    return st.session_state.usuario_progreso, st.session_state.get("cohorte_progreso", COHORTE_DEFECTO)
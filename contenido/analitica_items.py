@@ -0,0 +1,193 @@
+# contenido/analitica_items.py
+"""
+Analítica de ítems en flujo para el banco de preguntas (sin Streamlit)
+- Consume eventos de respuesta (usuario, ítem, opción elegida, correcto) en lotes, p. ej. suscrita al
+  hilo escritor de contenido/almacen_progreso.py; nunca relee el historial
+- Por ítem mantiene sumas fijas (n, Σx, Σy, Σx², Σy², Σxy) con x = acierto e y = criterio del estudiante
+  (proporción de aciertos previos, suavizada): dificultad p = Σx/n y discriminación = correlación
+  punto-biserial; conteos por opción para evaluar distractores. Actualización vectorizada (np.add.at)
+- Memoria: constante por ítem y por estudiante (dos contadores), independiente del largo del historial
+- Instantáneas periódicas (intercambio atómico de referencia, opcionalmente persistidas en JSON)
+  que simulacion_adaptativa usa para elegir ítems (ver elegir_pregunta)
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+RUTA_ANALITICA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analitica_items.json")
+INTERVALO_PUBLICACION = 30      # segundos entre instantáneas
+MIN_RESPUESTAS = 20             # por debajo, el ítem se considera sin datos suficientes
+MIN_PREVIAS = 3                 # respuestas previas del estudiante para usarlo en la discriminación
+UMBRAL_FACIL, UMBRAL_DIFICIL = 0.9, 0.2
+UMBRAL_DISCRIMINACION = 0.2
+DIFICULTAD_OBJETIVO = {"Básico": 0.8, "Intermedio": 0.6, "Avanzado": 0.4}
+FUENTES_ITEMS = ("gamificacion", "adaptativa")     # las decisiones de brotes no son ítems del banco
+_SUMAS = ("n", "x", "y", "xx", "yy", "xy", "n_y")
+
+
+# --------------------------
+# ESTADO EN FLUJO
+# --------------------------
+class AnaliticaItems:
+    def __init__(self, ruta=None, intervalo=INTERVALO_PUBLICACION):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._indice = {}                         # ítem -> fila
+        self._sumas = np.zeros((0, len(_SUMAS)))
+        self._opciones = {}                       # ítem -> {opción: conteo}
+        self._estudiantes = {}                    # usuario -> [respuestas, aciertos]
+        self._publicada = 0.0
+        self.instantanea = pd.DataFrame()
+        if ruta and os.path.exists(ruta):
+            self._cargar(ruta)
+
+    def _fila(self, item):
+        fila = self._indice.get(item)
+        if fila is None:
+            fila = self._indice[item] = len(self._indice)
+            if fila >= len(self._sumas):
+                self._sumas = np.vstack([self._sumas, np.zeros((max(16, len(self._sumas)), len(_SUMAS)))])
+        return fila
+
+    def consumir(self, eventos):
+        """
+        eventos: iterable de dicts con usuario, item, correcto (bool) y opcional opcion.
+        El criterio de cada respuesta es el desempeño previo del estudiante (no incluye esta respuesta).
+        """
+        with self._lock:
+            filas, x, y, tiene_y = [], [], [], []
+            for ev in eventos:
+                if ev.get("item") is None or ev.get("correcto") is None:
+                    continue
+                previas, aciertos = self._estudiantes.setdefault(ev["usuario"], [0, 0])
+                filas.append(self._fila(ev["item"]))
+                x.append(float(bool(ev["correcto"])))
+                y.append((aciertos + 1) / (previas + 2))
+                tiene_y.append(previas >= MIN_PREVIAS)
+                self._estudiantes[ev["usuario"]] = [previas + 1, aciertos + bool(ev["correcto"])]
+                if ev.get("opcion") is not None:
+                    conteo = self._opciones.setdefault(ev["item"], {})
+                    conteo[ev["opcion"]] = conteo.get(ev["opcion"], 0) + 1
+            if not filas:
+                return
+            filas, x, y, m = np.array(filas), np.array(x), np.array(y), np.array(tiene_y, dtype=float)
+            np.add.at(self._sumas, filas, np.column_stack([np.ones_like(x), x, y * m, x * m, y * y * m, x * y * m, m]))
+        if time.time() - self._publicada >= self.intervalo:
+            self.publicar()
+
+    def tabla(self):
+        """Dificultad, discriminación y distractores de cada ítem (cálculo O(ítems))."""
+        with self._lock:
+            items = sorted(self._indice, key=self._indice.get)
+            s = self._sumas[:len(items)].copy()
+            opciones = {k: dict(v) for k, v in self._opciones.items()}
+        if not items:
+            return pd.DataFrame(columns=["item", "respuestas", "dificultad", "discriminacion", "distractores", "alertas"])
+        n, sx, sy, sxx, syy, sxy, ny = s.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dificultad = sx / n
+            cov = sxy / ny - (sxx / ny) * (sy / ny)
+            var_x = sxx / ny - (sxx / ny) ** 2
+            var_y = syy / ny - (sy / ny) ** 2
+            discriminacion = np.where(ny >= MIN_RESPUESTAS, cov / np.sqrt(var_x * var_y), np.nan)
+        filas = []
+        for i, item in enumerate(items):
+            conteo = opciones.get(item, {})
+            total = sum(conteo.values()) or 1
+            distractores = {op: c / total for op, c in sorted(conteo.items(), key=lambda kv: -kv[1])}
+            filas.append({"item": item, "respuestas": int(n[i]), "dificultad": dificultad[i], "discriminacion": discriminacion[i],
+                          "distractores": distractores, "alertas": _alertas(n[i], dificultad[i], discriminacion[i])})
+        return pd.DataFrame(filas)
+
+    def publicar(self):
+        """Nueva instantánea (los lectores ven la anterior hasta el intercambio) y, si hay ruta, estado en disco."""
+        self.instantanea = self.tabla()
+        self._publicada = time.time()
+        if self.ruta:
+            self._guardar(self.ruta)
+        return self.instantanea
+
+    # persistencia del estado (no del historial) ------------------------
+    def _guardar(self, ruta):
+        with self._lock:
+            estado = {"items": sorted(self._indice, key=self._indice.get), "sumas": self._sumas[:len(self._indice)].tolist(),
+                      "opciones": self._opciones, "estudiantes": self._estudiantes}
+            texto = json.dumps(estado, ensure_ascii=False)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(ruta)), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(texto)
+        os.replace(tmp, ruta)
+
+    def _cargar(self, ruta):
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                estado = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._indice = {item: i for i, item in enumerate(estado["items"])}
+        self._sumas = np.array(estado["sumas"], dtype=float).reshape(-1, len(_SUMAS))
+        self._opciones = estado["opciones"]
+        self._estudiantes = estado["estudiantes"]
+        self.instantanea = self.tabla()
+
+def _alertas(n, dificultad, discriminacion):
+    if n < MIN_RESPUESTAS:
+        return "pocos datos"
+    alertas = []
+    if dificultad > UMBRAL_FACIL:
+        alertas.append("muy fácil")
+    elif dificultad < UMBRAL_DIFICIL:
+        alertas.append("muy difícil")
+    if np.isfinite(discriminacion) and discriminacion < UMBRAL_DISCRIMINACION:
+        alertas.append("discrimina poco" if discriminacion >= 0 else "discriminación negativa")
+    return ", ".join(alertas)
+
+
+# --------------------------
+# SELECCIÓN DE ÍTEMS
+# --------------------------
+def elegir_pregunta(disponibles, instantanea, nivel, rng=random):
+    """
+    Elige entre las preguntas disponibles ponderando por la última instantánea:
+    dificultad cercana al objetivo del nivel y mayor discriminación; los ítems sin datos
+    suficientes conservan peso 1 (siguen recibiendo respuestas). Sin instantánea: elección uniforme.
+    """
+    if instantanea is None or instantanea.empty:
+        return rng.choice(disponibles)
+    stats = instantanea.set_index("item")
+    objetivo = DIFICULTAD_OBJETIVO.get(nivel, 0.6)
+    pesos = []
+    for q in disponibles:
+        if q["pregunta"] not in stats.index or stats.at[q["pregunta"], "respuestas"] < MIN_RESPUESTAS:
+            pesos.append(1.0)
+            continue
+        p, r = stats.at[q["pregunta"], "dificultad"], stats.at[q["pregunta"], "discriminacion"]
+        r = max(r, 0.05) if np.isfinite(r) else 0.5
+        pesos.append(r * 2 * np.exp(-((p - objetivo) / 0.2) ** 2) + 0.01)
+    return rng.choices(disponibles, weights=pesos, k=1)[0]
+
+
+_analitica = None
+_analitica_lock = threading.Lock()
+
+def obtener_analitica(ruta=RUTA_ANALITICA):
+    """Analítica compartida por el proceso; se suscribe al almacén de progreso la primera vez."""
+    global _analitica
+    with _analitica_lock:
+        if _analitica is None:
+            from .almacen_progreso import obtener_almacen
+            _analitica = AnaliticaItems(ruta)
+            analitica = _analitica
+            obtener_almacen().suscribir(lambda eventos: analitica.consumir(e for e in eventos if e["fuente"] in FUENTES_ITEMS))
+        return _analitica
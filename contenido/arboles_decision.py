@@ -0,0 +1,90 @@
+# contenido/arboles_decision.py
+"""
+Motor de escenarios ramificados (árboles de decisión de brotes)
+- Compila un árbol (DECISION_TREES) a un grafo: nodos, opciones, efectos y siguiente nodo
+- Enumera todos los caminos alcanzables (prefijos) con su puntaje e intervenciones acumuladas
+- Precalcula la trayectoria SEIR de cada prefijo en un único lote (seir_lotes)
+  para mostrar la consecuencia de cada decisión al instante
+Formato de árbol:
+{"start": {"text": ..., "options": [{"label": ..., "effect": {"score": int, "intervention": (día, reducción) | None},
+                                     "next": "id_nodo" (opcional), "feedback": texto (opcional)}]}, ...}
+"""
+
+import numpy as np
+
+from .modelos_seir import seir_lotes, resumen_escenarios
+
+NODO_INICIAL = "start"
+
+
+def compilar_arbol(arbol, inicio=NODO_INICIAL):
+    """
+    Valida el árbol y devuelve el grafo compilado:
+    - nodos: {id: {"text", "options": [{"label", "score", "intervention", "next"}]}}
+    - caminos: {prefijo (tupla de índices de opción): {"nodo", "score", "interventions"}}
+      donde "nodo" es el nodo pendiente tras el prefijo (None si el camino terminó)
+    """
+    if inicio not in arbol:
+        raise ValueError(f"El árbol no tiene nodo inicial '{inicio}'.")
+    nodos = {}
+    for nid, nodo in arbol.items():
+        opciones = []
+        for op in nodo.get("options", []):
+            efecto = op.get("effect") or {}
+            siguiente = op.get("next")
+            if siguiente is not None and siguiente not in arbol:
+                raise ValueError(f"La opción '{op['label']}' del nodo '{nid}' apunta a un nodo inexistente '{siguiente}'.")
+            opciones.append({
+                "label": op["label"],
+                "score": efecto.get("score", 0),
+                "intervention": tuple(efecto["intervention"]) if efecto.get("intervention") else None,
+                "next": siguiente,
+                "feedback": op.get("feedback"),
+            })
+        nodos[nid] = {"text": nodo.get("text", ""), "options": opciones}
+
+    caminos = {}
+    pendientes = [((), inicio, 0, (), frozenset([inicio]))]
+    while pendientes:
+        prefijo, nid, score, interventions, visitados = pendientes.pop()
+        caminos[prefijo] = {"nodo": nid, "score": score, "interventions": list(interventions)}
+        if nid is None:
+            continue
+        for idx, op in enumerate(nodos[nid]["options"]):
+            if op["next"] in visitados:
+                raise ValueError(f"Ciclo en el árbol: '{nid}' -> '{op['next']}'.")
+            extra = (op["intervention"],) if op["intervention"] else ()
+            visitados_sig = visitados | {op["next"]} if op["next"] else visitados
+            pendientes.append((prefijo + (idx,), op["next"], score + op["score"], interventions + extra, visitados_sig))
+    return {"inicio": inicio, "nodos": nodos, "caminos": caminos}
+
+
+def precomputar_trayectorias(grafo, population, init, days=120):
+    """
+    Simula en un solo lote la trayectoria de cada prefijo alcanzable.
+    Devuelve {prefijo: {"I", "muertes_acum", "peak_I", "peak_day", "total_deaths"}}.
+    """
+    prefijos = list(grafo["caminos"].keys())
+    resultado = seir_lotes(
+        population, init["I0"], init["E0"], init["R0"], days,
+        fatality=init.get("fatality", 0.01),
+        interventions_list=[grafo["caminos"][p]["interventions"] for p in prefijos],
+    )
+    metricas = resumen_escenarios(resultado)
+    muertes = np.cumsum(resultado["new_deaths"], axis=1)
+    return {
+        p: {
+            "I": resultado["I"][i],
+            "muertes_acum": muertes[i],
+            "peak_I": float(metricas["peak_I"][i]),
+            "peak_day": int(metricas["peak_day"][i]),
+            "total_deaths": float(metricas["total_deaths"][i]),
+        }
+        for i, p in enumerate(prefijos)
+    }
+
+
+def nodo_actual(grafo, camino):
+    """Nodo pendiente tras el camino recorrido (None si terminó o el camino no existe)."""
+    info = grafo["caminos"].get(tuple(camino))
+    return None if info is None or info["nodo"] is None else grafo["nodos"][info["nodo"]]
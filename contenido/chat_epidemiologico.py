@@ -0,0 +1,230 @@
+# contenido/chat_epidemiologico.py
+"""
+Backend del Chat Epidemiológico
+- Caché de respuestas (coincidencia exacta + pregunta normalizada), LRU + TTL
+- Streaming de tokens hacia la UI (st.write_stream)
+- Timeout configurable y límite de consultas concurrentes por proceso
+- Modelos intercambiables: Gemini (google.generativeai) o stub local sin red
+Configuración (st.secrets o variables de entorno):
+CHAT_BACKEND ("gemini" | "stub"), CHAT_MODEL, CHAT_TIMEOUT, CHAT_MAX_CONCURRENCIA,
+CHAT_CACHE_TTL, CHAT_CACHE_MAX, CHAT_STUB_LATENCIA, GEMINI_API_KEY
+"""
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import streamlit as st
+
+from .glosario_completo import glosario
+
+# --- Intento de importar Gemini (Google Generative AI) ---
+try:
+    import google.generativeai as genai
+    GENAI_AVAILABLE = True
+except ImportError:
+    GENAI_AVAILABLE = False
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+DEFAULTS = {
+    "CHAT_BACKEND": "gemini",
+    "CHAT_MODEL": "gemini-1.5-flash",
+    "CHAT_TIMEOUT": 30.0,
+    "CHAT_MAX_CONCURRENCIA": 4,
+    "CHAT_CACHE_TTL": 24 * 3600,
+    "CHAT_CACHE_MAX": 512,
+    "CHAT_STUB_LATENCIA": 0.0,
+}
+SISTEMA = "Eres un tutor de epidemiología para estudiantes de Epidemiología 101. Responde en español, de forma clara y breve."
+
+
+def leer_config():
+    """Lee la configuración del chat desde st.secrets, luego el entorno, luego DEFAULTS."""
+    config = {}
+    for clave, defecto in DEFAULTS.items():
+        valor = None
+        try:
+            valor = st.secrets.get(clave)
+        except Exception:
+            pass
+        if valor is None:
+            valor = os.environ.get(clave)
+        config[clave] = type(defecto)(valor) if valor is not None else defecto
+    try:
+        config["GEMINI_API_KEY"] = st.secrets.get("GEMINI_API_KEY") or os.environ.get("GEMINI_API_KEY")
+    except Exception:
+        config["GEMINI_API_KEY"] = os.environ.get("GEMINI_API_KEY")
+    return config
+
+
+# --------------------------
+# CACHÉ
+# --------------------------
+def normalizar_pregunta(texto):
+    """Minúsculas, sin tildes, sin puntuación y con espacios colapsados."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(ch for ch in texto if not unicodedata.combining(ch))
+    texto = re.sub(r"[^\w\s]", " ", texto)
+    return " ".join(texto.split())
+
+
+class CacheRespuestas:
+    """LRU + TTL con dos niveles de clave: texto exacto y pregunta normalizada."""
+
+    def __init__(self, max_items=DEFAULTS["CHAT_CACHE_MAX"], ttl=DEFAULTS["CHAT_CACHE_TTL"]):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._datos = OrderedDict()   # clave -> (expira, respuesta)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _claves(self, pregunta):
+        return ("=" + pregunta.strip(), "~" + normalizar_pregunta(pregunta))
+
+    def get(self, pregunta):
+        ahora = time.monotonic()
+        with self._lock:
+            for clave in self._claves(pregunta):
+                item = self._datos.get(clave)
+                if item is None:
+                    continue
+                expira, respuesta = item
+                if expira < ahora:
+                    del self._datos[clave]
+                    continue
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return respuesta
+            self.fallos += 1
+        return None
+
+    def put(self, pregunta, respuesta):
+        expira = time.monotonic() + self.ttl
+        with self._lock:
+            for clave in self._claves(pregunta):
+                self._datos[clave] = (expira, respuesta)
+                self._datos.move_to_end(clave)
+            while len(self._datos) > 2 * self.max_items:
+                self._datos.popitem(last=False)
+
+    def __len__(self):
+        return len(self._datos)
+
+
+# --------------------------
+# MODELOS
+# --------------------------
+class ModeloStub:
+    """
+    Modelo local determinista (sin red ni API key) para pruebas de carga y CI.
+    Responde con las definiciones del glosario que aparezcan en la pregunta.
+    """
+    nombre = "stub"
+
+    def __init__(self, latencia_token=0.0):
+        self.latencia_token = latencia_token
+        self._terminos = {normalizar_pregunta(t.split("(")[0]): (t, d) for t, d in glosario.items()}
+
+    def responder(self, prompt):
+        # con contexto recuperado, el prompt termina en "Pregunta: ..."; se responde solo a esa parte
+        pregunta = normalizar_pregunta(prompt.rsplit("Pregunta:", 1)[-1])
+        encontrados = [f"**{t}**: {d}" for clave, (t, d) in self._terminos.items() if clave and clave in pregunta]
+        if encontrados:
+            texto = "\n\n".join(encontrados)
+        else:
+            texto = "Respuesta de prueba (modelo local): revisa el Glosario Interactivo y la Academia para este tema."
+        for token in re.findall(r"\S+\s*", texto):
+            if self.latencia_token:
+                time.sleep(self.latencia_token)
+            yield token
+
+
+class ModeloGemini:
+    """Gemini vía google.generativeai con streaming y timeout por petición."""
+    nombre = "gemini"
+
+    def __init__(self, api_key, modelo=DEFAULTS["CHAT_MODEL"], timeout=DEFAULTS["CHAT_TIMEOUT"]):
+        if not GENAI_AVAILABLE:
+            raise RuntimeError("Gemini (google.generativeai) no está disponible en este entorno. Instala la librería y agrega GEMINI_API_KEY en secrets.")
+        if not api_key:
+            raise RuntimeError("No se encontró GEMINI_API_KEY en secrets.")
+        genai.configure(api_key=api_key)
+        self._modelo = genai.GenerativeModel(modelo, system_instruction=SISTEMA)
+        self.timeout = timeout
+
+    def responder(self, prompt):
+        respuesta = self._modelo.generate_content(prompt, stream=True, request_options={"timeout": self.timeout})
+        for chunk in respuesta:
+            if getattr(chunk, "text", None):
+                yield chunk.text
+
+
+def crear_modelo(config):
+    if config["CHAT_BACKEND"] == "stub":
+        return ModeloStub(latencia_token=config["CHAT_STUB_LATENCIA"])
+    return ModeloGemini(config["GEMINI_API_KEY"], modelo=config["CHAT_MODEL"], timeout=config["CHAT_TIMEOUT"])
+
+
+# --------------------------
+# SERVICIO DE CHAT
+# --------------------------
+class ChatEpidemiologico:
+    """Caché + límite de concurrencia + timeout total alrededor de un modelo intercambiable."""
+
+    def __init__(self, modelo, cache=None, timeout=DEFAULTS["CHAT_TIMEOUT"], max_concurrencia=DEFAULTS["CHAT_MAX_CONCURRENCIA"]):
+        self.modelo = modelo
+        self.cache = cache or CacheRespuestas()
+        self.timeout = timeout
+        self._cupos = threading.BoundedSemaphore(max_concurrencia)
+
+    def responder_stream(self, pregunta, prompt=None):
+        """
+        Generador de fragmentos de texto. `prompt` permite enviar al modelo un texto
+        distinto de la pregunta (p. ej. con contexto); la caché siempre usa la pregunta.
+        """
+        cacheada = self.cache.get(pregunta)
+        if cacheada is not None:
+            yield cacheada
+            return
+        if not self._cupos.acquire(timeout=self.timeout):
+            raise TimeoutError("El chat está atendiendo demasiadas consultas; intenta de nuevo en unos segundos.")
+        try:
+            limite = time.monotonic() + self.timeout
+            partes = []
+            for fragmento in self.modelo.responder(prompt or pregunta):
+                partes.append(fragmento)
+                yield fragmento
+                if time.monotonic() > limite:
+                    raise TimeoutError(f"La respuesta superó el tiempo máximo ({self.timeout:.0f} s).")
+        finally:
+            self._cupos.release()
+        self.cache.put(pregunta, "".join(partes))
+
+    def responder(self, pregunta, prompt=None):
+        return "".join(self.responder_stream(pregunta, prompt=prompt))
+
+
+@st.cache_resource(show_spinner=False)
+def _chat_para(backend, modelo, api_key, timeout, max_concurrencia, cache_ttl, cache_max, stub_latencia):
+    config = {"CHAT_BACKEND": backend, "CHAT_MODEL": modelo, "GEMINI_API_KEY": api_key, "CHAT_TIMEOUT": timeout, "CHAT_STUB_LATENCIA": stub_latencia}
+    return ChatEpidemiologico(
+        crear_modelo(config),
+        cache=CacheRespuestas(max_items=cache_max, ttl=cache_ttl),
+        timeout=timeout,
+        max_concurrencia=max_concurrencia,
+    )
+
+
+def obtener_chat(config=None):
+    """Servicio de chat compartido por proceso (uno por configuración)."""
+    config = config or leer_config()
+    return _chat_para(
+        config["CHAT_BACKEND"], config["CHAT_MODEL"], config["GEMINI_API_KEY"], config["CHAT_TIMEOUT"],
+        config["CHAT_MAX_CONCURRENCIA"], config["CHAT_CACHE_TTL"], config["CHAT_CACHE_MAX"], config["CHAT_STUB_LATENCIA"],
+    )
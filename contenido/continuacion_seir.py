@@ -0,0 +1,106 @@
+# contenido/continuacion_seir.py
+"""
+Continuación incremental del SEIR con puntos de control (sin Streamlit)
+- Cada trayectoria calculada queda en memoria junto con su beta diaria. La salida diaria (S, E, I, R)
+  es el estado completo del modelo al final de cada día, así que la trayectoria guardada sirve a la vez
+  de serie de puntos de control
+- Nueva consulta con los mismos parámetros base (N, I0, E0, R0, sigma, gamma, IFR, método): se elige la
+  trayectoria guardada con el prefijo de beta común más largo y solo se recalcula el sufijo, desde el
+  primer día que cambia
+  (mover una intervención del día 20 al 30 recalcula desde el día 20; extender `days` solo calcula los días nuevos)
+- euler: resultado idéntico bit a bit al de una corrida completa; RK45/LSODA: se reanuda en el día de
+  corte (igual dentro de la tolerancia del integrador)
+- Lotes (ensembles): cada escenario reanuda desde su propio día, en una sola pasada (seir_continuar)
+- Memoria acotada: LRU por parámetros base, con tope de variantes por clave y de días guardados en total
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .modelos_seir import beta_efectiva, seir_continuar, COMPARTIMENTOS
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+MAX_VARIANTES = 8               # trayectorias (distintas intervenciones) por combinación de parámetros base
+MAX_DIAS_GUARDADOS = 400_000    # días × escenarios en memoria (8 canales float64 ≈ 25 MB)
+
+
+class ContinuacionSEIR:
+    def __init__(self, max_variantes=MAX_VARIANTES, max_dias=MAX_DIAS_GUARDADOS):
+        self.max_variantes = max_variantes
+        self.max_dias = max_dias
+        self._lock = threading.Lock()
+        self._trayectorias = OrderedDict()      # clave -> [{canal: array (días,)}], la más reciente primero
+        self._dias = 0
+        self.estadisticas = {"consultas": 0, "dias_reutilizados": 0, "dias_calculados": 0}
+
+    def _mejor_prefijo(self, clave, beta):
+        """(días reutilizables, trayectoria) con el prefijo de beta común más largo; (0, None) si no hay."""
+        mejor = (0, None)
+        for tray in self._trayectorias.get(clave, []):
+            m = min(len(beta), len(tray["beta"]))
+            distintos = np.flatnonzero(beta[:m] != tray["beta"][:m])
+            d = int(distintos[0]) if distintos.size else m
+            if d > mejor[0]:
+                mejor = (d, tray)
+        if mejor[1] is not None:
+            self._trayectorias.move_to_end(clave)
+        return mejor
+
+    def _guardar(self, clave, nueva):
+        """La nueva trayectoria reemplaza a las que son prefijo suyo (p. ej. la misma con menos días)."""
+        dias = len(nueva["beta"])
+        variantes = self._trayectorias.pop(clave, [])
+        conservar = []
+        for tray in variantes:
+            m = len(tray["beta"])
+            if m <= dias and np.array_equal(tray["beta"], nueva["beta"][:m]):
+                self._dias -= m
+            else:
+                conservar.append(tray)
+        while len(conservar) >= self.max_variantes:
+            self._dias -= len(conservar.pop()["beta"])
+        self._trayectorias[clave] = [nueva] + conservar
+        self._dias += dias
+        while self._dias > self.max_dias and len(self._trayectorias) > 1:
+            _, viejas = self._trayectorias.popitem(last=False)
+            self._dias -= sum(len(t["beta"]) for t in viejas)
+
+    def simular(self, N, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, fatality=0.01, interventions_list=None, metodo="euler"):
+        """
+        Misma firma y salida que seir_modelo; reanuda cada escenario desde su punto de control más tardío.
+        Las trayectorias devueltas son copias: el llamador puede modificarlas sin tocar lo guardado.
+        """
+        interventions_list = [None] if interventions_list is None else list(interventions_list)
+        n = len(interventions_list)
+        params = np.column_stack([np.broadcast_to(np.asarray(x, dtype=float), (n,))
+                                  for x in (N, I0, E0, R0_value, sigma, gamma, fatality)])
+        B = beta_efectiva(params[:, 3] * params[:, 5], days, interventions_list)
+        claves = [tuple(fila) + (metodo,) for fila in params.tolist()]
+        salida = {c: np.empty((n, days)) for c in COMPARTIMENTOS}
+        desde = np.zeros(n, dtype=int)
+        with self._lock:
+            for i, clave in enumerate(claves):
+                d, tray = self._mejor_prefijo(clave, B[i])
+                if tray is not None:
+                    desde[i] = d
+                    for c in COMPARTIMENTOS:
+                        salida[c][i, :d] = tray[c][:d]
+        seir_continuar(salida, desde, *params[:, :4].T, days, sigma=params[:, 4], gamma=params[:, 5], fatality=params[:, 6],
+                       interventions_list=interventions_list, metodo=metodo)
+        with self._lock:
+            for i, clave in enumerate(claves):
+                if desde[i] < days:
+                    self._guardar(clave, {c: salida[c][i].copy() for c in COMPARTIMENTOS})
+            self.estadisticas["consultas"] += 1
+            self.estadisticas["dias_reutilizados"] += int(desde.sum())
+            self.estadisticas["dias_calculados"] += int(n * days - desde.sum())
+        return salida
+
+    def vaciar(self):
+        with self._lock:
+            self._trayectorias.clear()
+            self._dias = 0
@@ -0,0 +1,231 @@
+# contenido/exportacion.py
+"""
+Exportación de resultados en memoria constante
+- CSV en streaming (bloque a bloque)
+- Parquet por row groups (pyarrow)
+- Excel en modo write-only (openpyxl)
+- Selección automática de formato según tamaño + bytes producidos
+Las "hojas" pueden ser DataFrames o iterables de DataFrames (p. ej. un barrido
+de miles de escenarios generado bloque a bloque), nunca se concatenan en memoria.
+"""
+
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Optional dependencies with safe fallbacks
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except Exception:
+    OPENPYXL_AVAILABLE = False
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+DEFAULT_CHUNK_ROWS = 50_000
+EXCEL_MAX_ROWS = 100_000        # por encima, Excel es lento y pesado: se prefiere Parquet/CSV
+EXCEL_MAX_SHEET_ROWS = 1_048_575
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+EXCEL_MAX_NOMBRE = 31
+_PROHIBIDOS_EXCEL = str.maketrans({c: "_" for c in "/\\:?*[]"})
+
+MIME = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# --------------------------
+# UTILIDADES
+# --------------------------
+def iter_bloques(datos, filas=DEFAULT_CHUNK_ROWS):
+    """
+    Itera bloques de hasta `filas` filas; acepta un DataFrame o un iterable de DataFrames.
+    Los bloques pequeños (p. ej. un escenario de 365 días) se agrupan hasta `filas`
+    para no generar miles de row groups diminutos.
+    """
+    if isinstance(datos, pd.DataFrame):
+        for inicio in range(0, max(len(datos), 1), filas):
+            yield datos.iloc[inicio:inicio + filas]
+        return
+    pendientes, n_pend = [], 0
+    for bloque in datos:
+        if len(bloque) >= filas:
+            yield from iter_bloques(bloque, filas)
+            continue
+        pendientes.append(bloque)
+        n_pend += len(bloque)
+        if n_pend >= filas:
+            yield pd.concat(pendientes, ignore_index=True)
+            pendientes, n_pend = [], 0
+    if pendientes:
+        yield pd.concat(pendientes, ignore_index=True)
+
+def contar_filas(hojas):
+    """Filas totales si se conocen sin consumir los iterables (None si alguna hoja es un generador)."""
+    total = 0
+    for datos in hojas.values():
+        if not isinstance(datos, pd.DataFrame):
+            return None
+        total += len(datos)
+    return total
+
+def elegir_formato(n_filas):
+    """Excel para tablas pequeñas; Parquet (o CSV sin pyarrow) para tablas grandes o de tamaño desconocido."""
+    if n_filas is not None and n_filas <= EXCEL_MAX_ROWS and OPENPYXL_AVAILABLE:
+        return "xlsx"
+    return "parquet" if PYARROW_AVAILABLE else "csv"
+
+def tamano_legible(n_bytes):
+    for unidad in ["B", "KB", "MB", "GB"]:
+        if n_bytes < 1024 or unidad == "GB":
+            return f"{n_bytes:.0f} {unidad}" if unidad == "B" else f"{n_bytes:.1f} {unidad}"
+        n_bytes /= 1024
+
+def _con_hoja(bloque, nombre, varias):
+    """En formatos planos (CSV/Parquet) las hojas se apilan en formato largo con una columna 'hoja'."""
+    if not varias:
+        return bloque
+    return bloque.assign(hoja=nombre)[["hoja"] + list(bloque.columns)]
+
+
+# --------------------------
+# ESCRITORES
+# --------------------------
+def escribir_csv(hojas, destino, filas=DEFAULT_CHUNK_ROWS):
+    """CSV en streaming sobre un archivo binario abierto. Devuelve filas escritas."""
+    varias = len(hojas) > 1
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="", write_through=True)
+    n, cabecera = 0, True
+    try:
+        for nombre, datos in hojas.items():
+            for bloque in iter_bloques(datos, filas):
+                _con_hoja(bloque, nombre, varias).to_csv(texto, header=cabecera, index=False)
+                cabecera = False
+                n += len(bloque)
+        texto.flush()
+    finally:
+        texto.detach()
+    return n
+
+def escribir_parquet(hojas, destino, filas=DEFAULT_CHUNK_ROWS, compression="zstd"):
+    """
+    Parquet con un row group por bloque. El esquema lo fija el primer bloque: las hojas
+    siguientes pueden omitir columnas (quedan nulas) pero no añadir nuevas. Devuelve filas escritas.
+    """
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow no instalado")
+    varias = len(hojas) > 1
+    writer, schema, n = None, None, 0
+    try:
+        for nombre, datos in hojas.items():
+            for bloque in iter_bloques(datos, filas):
+                bloque = _con_hoja(bloque, nombre, varias)
+                if schema is not None:
+                    extra = set(bloque.columns) - set(schema.names)
+                    if extra:
+                        raise ValueError(f"Columnas {sorted(extra)} de '{nombre}' no están en el esquema Parquet; usa Excel o CSV.")
+                    bloque = bloque.reindex(columns=schema.names)
+                tabla = pa.Table.from_pandas(bloque, schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = tabla.schema
+                    writer = pq.ParquetWriter(destino, schema, compression=compression)
+                writer.write_table(tabla)
+                n += len(bloque)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n
+
+def nombres_unicos(nombres, largo=None):
+    """Nombres sin repetir, en orden: el segundo "x" pasa a "x_2", etc. (cabe en `largo` caracteres si se indica)."""
+    vistos, salida = set(), []
+    for nombre in nombres:
+        base = str(nombre)[:largo] if largo else str(nombre)
+        candidato, k = base, 1
+        while candidato.lower() in vistos:        # Excel compara nombres de hoja sin distinguir mayúsculas
+            k += 1
+            sufijo = f"_{k}"
+            candidato = (base[:largo - len(sufijo)] if largo else base) + sufijo
+        vistos.add(candidato.lower())
+        salida.append(candidato)
+    return salida
+
+def nombres_hoja_excel(nombres):
+    """Nombres de hoja válidos para Excel: sin / \\ : ? * [ ], no vacíos, ≤ 31 caracteres y únicos."""
+    limpios = [(str(n).translate(_PROHIBIDOS_EXCEL).strip("'") or "hoja") for n in nombres]
+    return nombres_unicos(limpios, EXCEL_MAX_NOMBRE)
+
+def _celda(v):
+    if v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NaT:
+        return None
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+def escribir_excel(hojas, destino, filas=DEFAULT_CHUNK_ROWS):
+    """Excel en modo write-only: las filas se vuelcan a disco al escribirse. Devuelve filas escritas."""
+    if not OPENPYXL_AVAILABLE:
+        raise RuntimeError("openpyxl no instalado")
+    wb = Workbook(write_only=True)
+    n = 0
+    for titulo, (nombre, datos) in zip(nombres_hoja_excel(hojas), hojas.items()):
+        ws = wb.create_sheet(title=titulo)
+        cabecera, filas_hoja = True, 0
+        for bloque in iter_bloques(datos, filas):
+            if cabecera:
+                ws.append([str(c) for c in bloque.columns])
+                cabecera = False
+            for fila in bloque.itertuples(index=False, name=None):
+                if filas_hoja >= EXCEL_MAX_SHEET_ROWS:
+                    raise ValueError(f"La hoja '{nombre}' excede el límite de filas de Excel; usa Parquet o CSV.")
+                ws.append([_celda(v) for v in fila])
+                filas_hoja += 1
+            n += len(bloque)
+    wb.save(destino)
+    return n
+
+ESCRITORES = {"csv": escribir_csv, "parquet": escribir_parquet, "xlsx": escribir_excel}
+
+
+# --------------------------
+# API
+# --------------------------
+def exportar(hojas, formato="auto", ruta=None, filas=DEFAULT_CHUNK_ROWS):
+    """
+    Exporta {nombre: DataFrame | iterable de DataFrames} a `ruta` (o a un archivo temporal).
+    Devuelve dict con formato, ruta, filas, bytes y mime.
+    """
+    if formato == "auto":
+        formato = elegir_formato(contar_filas(hojas))
+    if ruta is None:
+        fd, ruta = tempfile.mkstemp(prefix="epi101_", suffix=f".{formato}")
+        os.close(fd)
+    with open(ruta, "wb") as destino:
+        n = ESCRITORES[formato](hojas, destino, filas=filas)
+    return {"formato": formato, "ruta": ruta, "filas": n, "bytes": os.path.getsize(ruta), "mime": MIME[formato]}
+
+def exportar_bytes(hojas, formato="auto", filas=DEFAULT_CHUNK_ROWS):
+    """
+    Igual que `exportar` pero devuelve los bytes (para st.download_button).
+    Se escribe en un SpooledTemporaryFile: por encima de SPOOL_MAX_BYTES el buffer pasa a disco, pero el
+    resultado son los bytes completos en memoria; la cola de reportes los guarda con tope de bytes totales.
+    """
+    if formato == "auto":
+        formato = elegir_formato(contar_filas(hojas))
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as destino:
+        ESCRITORES[formato](hojas, destino, filas=filas)
+        destino.seek(0)
+        return destino.read()
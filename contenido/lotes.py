@@ -0,0 +1,184 @@
+# contenido/lotes.py
+"""
+Ejecución por lotes sin Streamlit (precomputar material del curso, barridos grandes en servidores)
+- seir:   archivo de escenarios (CSV / JSON / YAML) -> resumen por escenario y, opcionalmente, trayectorias
+- tablas: archivo de tablas 2x2 (columnas a,b,c,d) -> RR, OR, RD, p de Fisher y, opcionalmente, IC por remuestreo
+- El archivo se parte en bloques que se reparten en un pool de procesos; la salida (Parquet o CSV)
+  se elige por la extensión
+Solo importa los núcleos numéricos (modelos_seir, tablas_2x2, remuestreo), nunca la app de Streamlit.
+Uso:
+  python -m contenido.lotes seir escenarios.csv --salida resumen.parquet [--trayectorias tray.parquet]
+  python -m contenido.lotes tablas tablas.csv --salida resultados.csv [--remuestreos 10000]
+Columnas de escenarios (solo R0 es obligatoria): nombre, N, I0, E0, R0, IFR, dias, sigma, gamma, metodo,
+intervenciones ("20:0.4;60:0.2" en CSV, o lista de [día, reducción] en JSON/YAML).
+Trayectorias en formato largo: escenario (número de fila del archivo, desde 0), nombre, dia y compartimentos,
+en el orden del archivo aunque los bloques se agrupen por días/método.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .modelos_seir import seir_modelo, resumen_escenarios, COMPARTIMENTOS, METODOS
+from .tablas_2x2 import analizar_tablas
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+DEFAULTS_ESCENARIO = {"N": 100000, "I0": 10, "E0": 5, "IFR": 0.01, "dias": 180, "sigma": 1/5.2, "gamma": 1/7, "metodo": "euler"}
+DEFAULT_BLOQUE_SEIR = 256
+DEFAULT_BLOQUE_TABLAS = 2000
+
+
+# --------------------------
+# ENTRADA / SALIDA
+# --------------------------
+def leer_tabla(ruta):
+    """CSV, JSON (lista de objetos) o YAML (lista de objetos) como DataFrame."""
+    ext = os.path.splitext(ruta)[1].lower()
+    if ext in (".yaml", ".yml"):
+        import yaml
+        with open(ruta, "r", encoding="utf-8") as f:
+            return pd.DataFrame(yaml.safe_load(f))
+    if ext == ".json":
+        return pd.read_json(ruta)
+    if ext == ".parquet":
+        return pd.read_parquet(ruta)
+    return pd.read_csv(ruta)
+
+def escribir_tabla(df, ruta):
+    """Parquet si la extensión es .parquet, si no CSV."""
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    if ruta.lower().endswith(".parquet"):
+        df.to_parquet(ruta, index=False)
+    else:
+        df.to_csv(ruta, index=False)
+
+def parsear_intervenciones(valor):
+    """"20:0.4;60:0.2" o [[20, 0.4], [60, 0.2]] -> [(20, 0.4), (60, 0.2)]."""
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)) or valor == "":
+        return []
+    if isinstance(valor, str):
+        return [(int(dia), float(red)) for dia, red in (par.split(":") for par in valor.split(";") if par.strip())]
+    return [(int(dia), float(red)) for dia, red in valor]
+
+def normalizar_escenarios(df):
+    if "R0" not in df.columns:
+        raise ValueError("El archivo de escenarios necesita al menos la columna R0.")
+    df = df.copy()
+    for col, valor in DEFAULTS_ESCENARIO.items():
+        df[col] = df[col].fillna(valor) if col in df.columns else valor
+    if "nombre" not in df.columns:
+        df["nombre"] = [f"escenario_{i}" for i in range(len(df))]
+    desconocidos = set(df["metodo"]) - set(METODOS)
+    if desconocidos:
+        raise ValueError(f"Métodos desconocidos {sorted(desconocidos)}; opciones: {METODOS}")
+    df["intervenciones"] = [parsear_intervenciones(v) for v in df["intervenciones"]] if "intervenciones" in df.columns else [[] for _ in range(len(df))]
+    df["dias"] = df["dias"].astype(int)
+    return df.reset_index(drop=True)
+
+
+# --------------------------
+# TRABAJADORES (nivel de módulo: se serializan al pool)
+# --------------------------
+def _bloque_seir(bloque, trayectorias):
+    """Un bloque con los mismos días y método: una sola llamada vectorizada a seir_modelo."""
+    dias, metodo = int(bloque["dias"].iloc[0]), bloque["metodo"].iloc[0]
+    resultado = seir_modelo(bloque["N"].to_numpy(), bloque["I0"].to_numpy(), bloque["E0"].to_numpy(), bloque["R0"].to_numpy(), dias,
+                            sigma=bloque["sigma"].to_numpy(), gamma=bloque["gamma"].to_numpy(), fatality=bloque["IFR"].to_numpy(),
+                            interventions_list=list(bloque["intervenciones"]), metodo=metodo)
+    m = resumen_escenarios(resultado)
+    resumen = bloque.drop(columns=["intervenciones"]).assign(
+        intervenciones=[";".join(f"{d}:{r}" for d, r in iv) for iv in bloque["intervenciones"]],
+        pico_I=m["peak_I"], dia_pico=m["peak_day"], infecciones_totales=m["total_infections"],
+        muertes_totales=m["total_deaths"], tasa_ataque=m["total_infections"] / bloque["N"].to_numpy(),
+    )
+    if not trayectorias:
+        return resumen, None
+    n = len(bloque)
+    largo = pd.DataFrame({"escenario": np.repeat(bloque.index.to_numpy(), dias), "nombre": np.repeat(bloque["nombre"].to_numpy(), dias),
+                          "dia": np.tile(np.arange(dias), n)})
+    for c in COMPARTIMENTOS:
+        largo[c] = resultado[c].reshape(-1).astype("float32")
+    return resumen, largo
+
+def _bloque_tablas(bloque, remuestreos, semilla):
+    return analizar_tablas(bloque, remuestreos=remuestreos, semilla=semilla)
+
+def _repartir(funcion, bloques, procesos, *args):
+    """Mapea los bloques en un pool (o en el proceso actual si procesos == 1 o hay un solo bloque); conserva el orden."""
+    if procesos == 1 or len(bloques) <= 1:
+        return [funcion(b, *args) for b in bloques]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(funcion, bloques, *([a] * len(bloques) for a in args)))
+
+def _partir(df, tamano, por=None):
+    grupos = [g for _, g in df.groupby(list(por), sort=False)] if por else [df]
+    return [g.iloc[i:i + tamano] for g in grupos for i in range(0, len(g), tamano)]
+
+
+# --------------------------
+# SUBCOMANDOS
+# --------------------------
+def correr_seir(entrada, salida, trayectorias=None, procesos=None, bloque=DEFAULT_BLOQUE_SEIR):
+    escenarios = normalizar_escenarios(leer_tabla(entrada))
+    partes = _repartir(_bloque_seir, _partir(escenarios, bloque, por=("dias", "metodo")), procesos, trayectorias is not None)
+    resumen = pd.concat([p[0] for p in partes]).sort_index()      # los bloques se agrupan por días/método; vuelve al orden del archivo
+    escribir_tabla(resumen.reset_index(drop=True), salida)
+    if trayectorias:
+        # "nombre" puede repetirse: la fila original identifica cada escenario y restablece el orden del archivo
+        largo = pd.concat([p[1] for p in partes], ignore_index=True)
+        escribir_tabla(largo.sort_values(["escenario", "dia"], kind="stable", ignore_index=True), trayectorias)
+    return len(resumen)
+
+def correr_tablas(entrada, salida, remuestreos=0, semilla=2024, procesos=None, bloque=DEFAULT_BLOQUE_TABLAS):
+    tablas = leer_tabla(entrada)
+    tablas.columns = [str(c).strip().lower() for c in tablas.columns]
+    tamano = max(1, min(bloque, 50)) if remuestreos else bloque
+    partes = _repartir(_bloque_tablas, _partir(tablas, tamano), procesos, remuestreos, semilla)
+    resultado = pd.concat(partes, ignore_index=True)
+    escribir_tabla(resultado, salida)
+    return len(resultado)
+
+
+# --------------------------
+# CLI
+# --------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulaciones SEIR y análisis 2x2 por lotes, sin Streamlit.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_seir = sub.add_parser("seir", help="escenarios SEIR (CSV/JSON/YAML)")
+    p_seir.add_argument("entrada")
+    p_seir.add_argument("--salida", required=True, help="resumen por escenario (.parquet o .csv)")
+    p_seir.add_argument("--trayectorias", help="trayectorias diarias en formato largo (.parquet o .csv)")
+    p_seir.add_argument("--bloque", type=int, default=DEFAULT_BLOQUE_SEIR, help="escenarios por tarea")
+    p_tab = sub.add_parser("tablas", help="tablas 2x2 (columnas a,b,c,d)")
+    p_tab.add_argument("entrada")
+    p_tab.add_argument("--salida", required=True)
+    p_tab.add_argument("--remuestreos", type=int, default=0, help="remuestras bootstrap por tabla (0 = sin IC por remuestreo)")
+    p_tab.add_argument("--semilla", type=int, default=2024)
+    p_tab.add_argument("--bloque", type=int, default=DEFAULT_BLOQUE_TABLAS, help="tablas por tarea")
+    for p in (p_seir, p_tab):
+        p.add_argument("--procesos", type=int, default=None, help="procesos del pool (por defecto, todos los núcleos)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    try:
+        if args.comando == "seir":
+            n = correr_seir(args.entrada, args.salida, args.trayectorias, args.procesos, args.bloque)
+        else:
+            n = correr_tablas(args.entrada, args.salida, args.remuestreos, args.semilla, args.procesos, args.bloque)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"{n} filas -> {args.salida} ({time.perf_counter() - inicio:.1f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
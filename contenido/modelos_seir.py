@@ -0,0 +1,218 @@
+# contenido/modelos_seir.py
+"""
+Núcleo numérico SEIR (sin Streamlit)
+- seir_lotes: muchos escenarios en una sola pasada vectorizada (NumPy)
+- Misma discretización que seir_simulate (Euler, dt = 1 día, compartimentos acotados en 0)
+- seir_ode: integración adaptativa (solve_ivp RK45/LSODA) con los cambios de intervención como discontinuidades
+- seir_continuar: reanuda trayectorias desde un día intermedio reutilizando el prefijo ya calculado
+- Intervenciones: lista de (día_inicio, reducción) por escenario
+- tabla_resumen: comparación de escenarios (pico, muertes, infecciones evitadas)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.integrate import solve_ivp
+
+COMPARTIMENTOS = ["S", "E", "I", "R", "new_infections", "new_recovered", "new_deaths", "beta"]
+METODOS = ["euler", "RK45", "LSODA"]   # euler = paso fijo de 1 día (rápido); RK45/LSODA = paso adaptativo (preciso)
+DEFAULT_RTOL = 1e-6
+DEFAULT_ATOL = 1e-6
+
+
+def beta_efectiva(beta, days, interventions_list):
+    """
+    Matriz (escenarios, días) de beta con las intervenciones aplicadas.
+    Las reducciones se multiplican en el orden de la lista, igual que en seir_simulate.
+    """
+    beta = np.asarray(beta, dtype=float)
+    B = np.repeat(beta[:, None], days, axis=1)
+    for s, interventions in enumerate(interventions_list):
+        for (start_day, reduction) in (interventions or []):
+            B[s, int(np.clip(np.ceil(start_day), 0, days)):] *= (1 - reduction)   # días t >= start_day
+    return B
+
+
+def seir_lotes(N, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, fatality=0.01, interventions_list=None):
+    """
+    Simula varios escenarios SEIR a la vez.
+    - N, I0, E0, R0_value, sigma, gamma, fatality: escalares o arrays de longitud n_escenarios
+    - interventions_list: lista (una por escenario) de listas de (day_start, reduction)
+    Devuelve dict {compartimento: array (n_escenarios, days)} con las mismas columnas que seir_simulate.
+    """
+    if interventions_list is None:
+        interventions_list = [None]
+    n = len(interventions_list)
+    N, I0, E0, R0_value, sigma, gamma, fatality = (
+        np.broadcast_to(np.asarray(x, dtype=float), (n,)).copy() for x in (N, I0, E0, R0_value, sigma, gamma, fatality)
+    )
+    salida = {c: np.empty((n, days)) for c in COMPARTIMENTOS}
+    salida["beta"] = beta_efectiva(R0_value * gamma, days, interventions_list)
+    _pasos_euler(salida, np.zeros(n, dtype=int), N, I0, E0, sigma, gamma, fatality)
+    return salida
+
+
+def _pasos_euler(salida, desde, N, I0, E0, sigma, gamma, fatality):
+    """
+    Bucle de Euler sobre `salida` (arrays (n, days), con salida["beta"] ya fijada).
+    desde: primer día que calcula cada escenario; los días anteriores ya están en `salida`
+    (prefijo reutilizado) y la fila solo toma de ahí su estado hasta llegar a su día.
+    """
+    days = salida["S"].shape[1]
+    t0 = int(desde.min()) if len(desde) else days
+    parcial = bool(np.any(desde != t0))
+    if t0 == 0:
+        S, E, I, R = N - I0 - E0, E0.copy(), I0.copy(), np.zeros(len(desde))
+    else:
+        S, E, I, R = (salida[c][:, t0 - 1].copy() for c in ("S", "E", "I", "R"))
+    B = salida["beta"]
+    for t in range(t0, days):
+        new_exposed = B[:, t] * I * S / N
+        new_infectious = sigma * E
+        new_recovered = gamma * I
+        new_deaths = new_recovered * fatality
+        S = np.maximum(0, S - new_exposed)
+        E = np.maximum(0, E + new_exposed - new_infectious)
+        I = np.maximum(0, I + new_infectious - new_recovered)
+        R = np.maximum(0, R + new_recovered - new_deaths)
+        if parcial and t < desde.max():
+            activo = t >= desde
+            for c, v in (("S", S), ("E", E), ("I", I), ("R", R), ("new_infections", new_exposed),
+                         ("new_recovered", new_recovered), ("new_deaths", new_deaths)):
+                salida[c][activo, t] = v[activo]
+            S, E, I, R = (salida[c][:, t].copy() for c in ("S", "E", "I", "R"))
+            continue
+        salida["S"][:, t] = S
+        salida["E"][:, t] = E
+        salida["I"][:, t] = I
+        salida["R"][:, t] = R
+        salida["new_infections"][:, t] = new_exposed
+        salida["new_recovered"][:, t] = new_recovered
+        salida["new_deaths"][:, t] = new_deaths
+
+
+def _derivadas(t, y, beta, N, sigma, gamma, fatality):
+    S, E, I = y[0], y[1], y[2]
+    infecciones = beta * I * S / N
+    return [-infecciones, infecciones - sigma * E, sigma * E - gamma * I,
+            gamma * I * (1 - fatality), infecciones, gamma * I, gamma * I * fatality]
+
+def seir_ode(N, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, fatality=0.01, interventions=None,
+             metodo="RK45", rtol=DEFAULT_RTOL, atol=DEFAULT_ATOL, desde=0, estado=None):
+    """
+    SEIR continuo integrado con solve_ivp (paso adaptativo) para un escenario.
+    - Beta es constante a trozos: se integra por tramos entre días de cambio de intervención,
+      así el integrador nunca da un paso a través de una discontinuidad
+    - Salida densa muestreada en días enteros; la fila t corresponde al final del día t (como en seir_simulate)
+    - new_infections / new_recovered / new_deaths: incrementos diarios de los acumulados integrados
+    - desde / estado: reanuda en el día `desde` desde (S, E, I, R) al final del día desde - 1;
+      devuelve solo los días desde..days - 1
+    Devuelve el mismo dict que seir_lotes con un solo escenario.
+    """
+    beta_dias = beta_efectiva([R0_value * gamma], days, [interventions])[0]
+    cortes = sorted({desde, days} | {c for c in (int(np.clip(np.ceil(d), 0, days)) for d, _ in (interventions or [])) if c > desde})
+    # estado: S, E, I, R, infecciones acumuladas, recuperaciones acumuladas (salidas de I), muertes acumuladas
+    y = np.array([N - I0 - E0, E0, I0, 0.0] if estado is None else list(estado)[:4], dtype=float)
+    y = np.concatenate([y, np.zeros(3)])
+    muestras = [y[:, None]]
+    for t0, t1 in zip(cortes[:-1], cortes[1:]):
+        if t1 <= t0:
+            continue
+        sol = solve_ivp(_derivadas, (t0, t1), y, method=metodo, t_eval=np.arange(t0 + 1, t1 + 1),
+                        args=(beta_dias[t0], N, sigma, gamma, fatality), rtol=rtol, atol=atol)
+        if not sol.success:
+            raise RuntimeError(f"solve_ivp ({metodo}) falló en el tramo [{t0}, {t1}]: {sol.message}")
+        muestras.append(sol.y)
+        y = sol.y[:, -1]
+    Y = np.maximum(0, np.concatenate(muestras, axis=1))    # (7, days - desde + 1), columna 0 = condición inicial
+    salida = {
+        "S": Y[0, 1:], "E": Y[1, 1:], "I": Y[2, 1:], "R": Y[3, 1:],
+        "new_infections": np.diff(Y[4]), "new_recovered": np.diff(Y[5]), "new_deaths": np.diff(Y[6]),
+        "beta": beta_dias[desde:],
+    }
+    return {c: v[None, :] for c, v in salida.items()}
+
+def seir_modelo(N, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, fatality=0.01, interventions_list=None, metodo="euler"):
+    """
+    Punto de entrada con motor seleccionable: "euler" usa el lote vectorizado;
+    RK45/LSODA integran cada escenario con seir_ode y apilan los resultados.
+    """
+    if metodo == "euler":
+        return seir_lotes(N, I0, E0, R0_value, days, sigma=sigma, gamma=gamma, fatality=fatality, interventions_list=interventions_list)
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido '{metodo}'; opciones: {METODOS}")
+    interventions_list = [None] if interventions_list is None else interventions_list
+    n = len(interventions_list)
+    params = [np.broadcast_to(np.asarray(x, dtype=float), (n,)) for x in (N, I0, E0, R0_value, sigma, gamma, fatality)]
+    partes = [seir_ode(*(p[i] for p in params[:4]), days, sigma=params[4][i], gamma=params[5][i], fatality=params[6][i],
+                       interventions=interventions_list[i], metodo=metodo) for i in range(n)]
+    return {c: np.concatenate([p[c] for p in partes]) for c in COMPARTIMENTOS}
+
+
+def seir_continuar(salida, desde, N, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, fatality=0.01,
+                   interventions_list=None, metodo="euler"):
+    """
+    Completa `salida` (arrays (n, days), ver seir_lotes) a partir del día `desde` de cada escenario.
+    Los días anteriores deben venir ya calculados (prefijo de una trayectoria con la misma beta hasta ese día):
+    el estado al final del día desde - 1 es el punto de control desde el que se reanuda.
+    - euler: un solo bucle vectorizado; cada fila empieza en su día (idéntico a una corrida completa)
+    - RK45/LSODA: seir_ode reanudado por escenario (igual a una corrida completa dentro de la tolerancia)
+    """
+    interventions_list = [None] if interventions_list is None else interventions_list
+    n = len(interventions_list)
+    N, I0, E0, R0_value, sigma, gamma, fatality = (
+        np.broadcast_to(np.asarray(x, dtype=float), (n,)).copy() for x in (N, I0, E0, R0_value, sigma, gamma, fatality)
+    )
+    desde = np.minimum(np.asarray(desde, dtype=int), days)
+    salida["beta"] = beta_efectiva(R0_value * gamma, days, interventions_list)
+    if metodo == "euler":
+        _pasos_euler(salida, desde, N, I0, E0, sigma, gamma, fatality)
+        return salida
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido '{metodo}'; opciones: {METODOS}")
+    for i in np.flatnonzero(desde < days):
+        d = int(desde[i])
+        estado = None if d == 0 else [salida[c][i, d - 1] for c in ("S", "E", "I", "R")]
+        parte = seir_ode(N[i], I0[i], E0[i], R0_value[i], days, sigma=sigma[i], gamma=gamma[i], fatality=fatality[i],
+                         interventions=interventions_list[i], metodo=metodo, desde=d, estado=estado)
+        for c in COMPARTIMENTOS:
+            salida[c][i, d:] = parte[c][0]
+    return salida
+
+
+def a_dataframe(resultado, i=0, start=None):
+    """DataFrame de un escenario con el formato de seir_simulate (day, compartimentos, date)."""
+    days = resultado["S"].shape[1]
+    df = pd.DataFrame({"day": np.arange(days)})
+    for c in COMPARTIMENTOS:
+        df[c] = resultado[c][i]
+    start = pd.Timestamp.today().normalize() if start is None else start
+    df["date"] = start + pd.to_timedelta(df["day"], unit="D")
+    return df
+
+
+def resumen_escenarios(resultado):
+    """Métricas por escenario: pico de I, día del pico, infecciones y muertes totales."""
+    I = resultado["I"]
+    return {
+        "peak_I": I.max(axis=1),
+        "peak_day": I.argmax(axis=1),
+        "total_infections": resultado["new_infections"].sum(axis=1),
+        "total_deaths": resultado["new_deaths"].sum(axis=1),
+    }
+
+
+def tabla_resumen(resultado, nombres, start=None, base=0):
+    """
+    Tabla comparativa por escenario: pico, fecha del pico, muertes totales
+    e infecciones evitadas respecto al escenario `base`.
+    """
+    m = resumen_escenarios(resultado)
+    start = pd.Timestamp.today().normalize() if start is None else start
+    return pd.DataFrame({
+        "escenario": nombres,
+        "pico_I": m["peak_I"].round().astype(int),
+        "fecha_pico": (start + pd.to_timedelta(m["peak_day"], unit="D")).date,
+        "muertes_totales": m["total_deaths"].round().astype(int),
+        "infecciones_totales": m["total_infections"].round().astype(int),
+        "infecciones_evitadas": (m["total_infections"][base] - m["total_infections"]).round().astype(int),
+    })
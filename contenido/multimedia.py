@@ -0,0 +1,95 @@
+# contenido/multimedia.py
+"""
+Capa de multimedia diferida
+- Miniatura liviana (imagen estática de YouTube) + botón; el reproductor (iframe) solo se crea al hacer clic
+- Un reproductor activo por grupo: abrir otro video cierra el anterior
+- Metadatos (título, autor) vía oEmbed en segundo plano: el render nunca espera a la red; mientras tanto
+  (o sin red, o en modo instantánea) se muestra la miniatura estándar con el id del video.
+  Éxitos cacheados 7 días, fallos solo unos minutos
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+
+from .instantaneas import modo_datos
+
+OEMBED_URL = "https://www.youtube.com/oembed"
+MINIATURA_URL = "https://i.ytimg.com/vi/{id}/mqdefault.jpg"   # 320x180, ~10 KB
+ANCHO_MINIATURA = 320
+TIMEOUT_OEMBED = 4
+TTL_METADATOS = 7 * 24 * 3600
+TTL_FALLO = 300             # un fallo de red se reintenta a los 5 minutos
+_PATRON_ID = re.compile(r"(?:v=|youtu\.be/|embed/|shorts/)([A-Za-z0-9_-]{11})")
+
+_metadatos = {}             # url -> (dict oEmbed o None si falló, expira)
+_pendientes = set()
+_metadatos_lock = threading.Lock()
+_pool_oembed = ThreadPoolExecutor(max_workers=2, thread_name_prefix="epi101-oembed")
+
+
+def id_youtube(url):
+    """Id de 11 caracteres de una URL de YouTube (None si no es de YouTube)."""
+    m = _PATRON_ID.search(url or "")
+    return m.group(1) if m else None
+
+def _descargar_metadatos(url):
+    """Tarea en segundo plano: consulta oEmbed y guarda el resultado (o el fallo, con TTL corto)."""
+    try:
+        r = requests.get(OEMBED_URL, params={"url": url, "format": "json"}, timeout=TIMEOUT_OEMBED)
+        r.raise_for_status()
+        oembed = r.json()
+        datos, ttl = {k: oembed.get(k) for k in ("title", "author_name") if oembed.get(k)}, TTL_METADATOS
+    except Exception:
+        datos, ttl = None, TTL_FALLO
+    with _metadatos_lock:
+        _metadatos[url] = (datos, time.time() + ttl)
+        _pendientes.discard(url)
+
+def metadatos_video(url):
+    """
+    Título/autor/miniatura del video sin bloquear: devuelve lo que haya en caché y, si falta,
+    encola la consulta oEmbed (salvo en modo instantánea); el título aparece en un rerun posterior.
+    """
+    vid = id_youtube(url)
+    datos = {"title": None, "author_name": None, "thumbnail_url": MINIATURA_URL.format(id=vid) if vid else None}
+    if vid is None:
+        return datos
+    with _metadatos_lock:
+        guardado = _metadatos.get(url)
+        if guardado is not None and guardado[1] > time.time():
+            return dict(datos, **(guardado[0] or {}))
+        if url in _pendientes or modo_datos() == "instantanea":
+            return datos
+        _pendientes.add(url)
+    _pool_oembed.submit(_descargar_metadatos, url)
+    return datos
+
+def video_diferido(url, titulo=None, key=None, grupo="videos"):
+    """
+    Miniatura + "Reproducir"; el st.video se instancia solo para el video activo del grupo.
+    key identifica el video dentro del grupo (por defecto, la URL).
+    """
+    key = key or url
+    activos = st.session_state.setdefault("video_activo", {})
+    meta = metadatos_video(url)
+    titulo = titulo or meta["title"] or f"YouTube · {id_youtube(url) or url}"
+    if activos.get(grupo) == key:
+        st.video(url, autoplay=True)
+        if st.button("⏹️ Cerrar video", key=f"cerrar_{grupo}_{key}"):
+            activos.pop(grupo, None)
+            st.rerun()
+        return
+    if meta["thumbnail_url"]:
+        st.image(meta["thumbnail_url"], caption=titulo, width=ANCHO_MINIATURA)
+    elif titulo:
+        st.caption(titulo)
+    col1, col2 = st.columns([1, 3])
+    if col1.button("▶️ Reproducir", key=f"play_{grupo}_{key}"):
+        activos[grupo] = key
+        st.rerun()
+    col2.markdown(f"[Abrir en YouTube]({url})")
@@ -0,0 +1,126 @@
+# contenido/procesos_ramificacion.py
+"""
+Proceso de ramificación (cadenas de transmisión) con rastreo de contactos (sin Streamlit)
+- Descendencia binomial negativa (R, k): k pequeño = sobredispersión / supercontagio
+- Rastreo/aislamiento: una fracción de los casos es rastreada y su transmisión se reduce según la eficacia
+- Cada generación de todas las cadenas se sortea en un solo lote: la suma de m descendencias
+  NB(k, p) es NB(m*k, p), así que basta un sorteo por cadena y por generación
+- Probabilidad de extinción (simulada y analítica) y distribución del tamaño de brote
+- Intervalo generacional (gamma) para ubicar en el tiempo una muestra de cadenas: solo incidencia_cadenas
+  tiene tiempos, con un bucle por cadena (la UI lo usa sobre 30 cadenas); simular_cadenas cuenta por generación
+"""
+
+import numpy as np
+
+DEFAULT_MAX_CASOS = 5000
+DEFAULT_MAX_GENERACIONES = 100
+
+
+# --------------------------
+# DESCENDENCIA
+# --------------------------
+def _nb_suma(rng, casos, R, k):
+    """Descendencia total de `casos` individuos NB(R, k) por cadena (array), sin iterar sobre individuos."""
+    total = np.zeros(len(casos), dtype=np.int64)
+    hay = casos > 0
+    if R > 0 and hay.any():
+        total[hay] = rng.negative_binomial(k * casos[hay], k / (k + R))
+    return total
+
+def simular_cadenas(n_cadenas, R, k, rastreo=0.0, eficacia=1.0, casos_iniciales=1,
+                    max_casos=DEFAULT_MAX_CASOS, max_generaciones=DEFAULT_MAX_GENERACIONES, semilla=0):
+    """
+    Simula n_cadenas independientes generación por generación.
+    - rastreo: probabilidad de que un caso sea rastreado y aislado
+    - eficacia: reducción de la transmisión de un caso aislado (1 = no transmite)
+    - max_casos: tope de tamaño; las cadenas que lo alcanzan se consideran brotes grandes
+    - max_generaciones: las cadenas que siguen activas al llegar aquí (sin tope ni extinción) quedan censuradas:
+      su tamaño es una cota inferior y no cuentan como extinguidas ni como brotes grandes
+    Devuelve dict con arrays por cadena: tamano, generaciones, extinguida, tope, censurada.
+    Sin tiempos: el intervalo generacional solo existe en incidencia_cadenas.
+    """
+    rng = np.random.default_rng(semilla)
+    activos = np.full(n_cadenas, casos_iniciales, dtype=np.int64)
+    tamano = activos.copy()
+    generaciones = np.zeros(n_cadenas, dtype=np.int64)
+    R_aislado = R * (1 - eficacia)
+    for _ in range(max_generaciones):
+        vivas = np.flatnonzero((activos > 0) & (tamano < max_casos))
+        if len(vivas) == 0:
+            break
+        casos = activos[vivas]
+        rastreados = rng.binomial(casos, rastreo) if rastreo > 0 else np.zeros_like(casos)
+        hijos = _nb_suma(rng, casos - rastreados, R, k) + _nb_suma(rng, rastreados, R_aislado, k)
+        activos[:] = 0
+        activos[vivas] = hijos
+        tamano[vivas] += hijos
+        generaciones[vivas[hijos > 0]] += 1
+    tope = tamano >= max_casos
+    return {
+        "tamano": np.minimum(tamano, max_casos),
+        "generaciones": generaciones,
+        "extinguida": (activos == 0) & ~tope,
+        "tope": tope,
+        "censurada": (activos > 0) & ~tope,
+    }
+
+def probabilidad_extincion(R, k, rastreo=0.0, eficacia=1.0, iteraciones=2000):
+    """
+    Probabilidad de extinción analítica: menor raíz de q = G(q) en [0, 1], con G la función
+    generadora de la descendencia (mezcla de casos rastreados y no rastreados).
+    """
+    def G(s, r):
+        return (1 + r / k * (1 - s)) ** (-k)
+    q = 0.0
+    for _ in range(iteraciones):
+        q_nuevo = (1 - rastreo) * G(q, R) + rastreo * G(q, R * (1 - eficacia))
+        if abs(q_nuevo - q) < 1e-12:
+            break
+        q = q_nuevo
+    return q
+
+def resumen_cadenas(resultado):
+    """
+    Probabilidad de extinción estimada, fracción de brotes grandes, fracción censurada (activas al llegar a
+    max_generaciones) y cuantiles del tamaño de las cadenas extinguidas.
+    """
+    tam = resultado["tamano"][resultado["extinguida"]]
+    return {
+        "p_extincion": float(resultado["extinguida"].mean()),
+        "p_brote_grande": float(resultado["tope"].mean()),
+        "p_censurada": float(resultado["censurada"].mean()),
+        "tamano_mediana": float(np.median(tam)) if len(tam) else float("nan"),
+        "tamano_p95": float(np.percentile(tam, 95)) if len(tam) else float("nan"),
+        "tamano_max": int(tam.max()) if len(tam) else 0,
+    }
+
+
+# --------------------------
+# TIEMPO (intervalo generacional)
+# --------------------------
+def intervalo_gamma(rng, n, media, sd):
+    forma = (media / sd) ** 2
+    return rng.gamma(forma, media / forma, size=n)
+
+def incidencia_cadenas(n_muestras, R, k, rastreo=0.0, eficacia=1.0, gi_media=5.0, gi_sd=2.0, dias=60,
+                       max_casos=DEFAULT_MAX_CASOS, semilla=0):
+    """
+    Incidencia diaria (n_muestras, dias) de cadenas individuales con tiempos de infección.
+    Cada generación se sortea en lote: descendencia por caso, tiempo del hijo = tiempo del padre + intervalo generacional.
+    El bucle es por cadena (no vectorizado entre cadenas): pensado para una muestra chica, no para las n_cadenas completas.
+    """
+    rng = np.random.default_rng(semilla)
+    curvas = np.zeros((n_muestras, dias), dtype=np.int64)
+    for m in range(n_muestras):
+        tiempos = np.zeros(1)
+        total = 1
+        curvas[m, 0] = 1
+        while len(tiempos) and total < max_casos:
+            rastreado = rng.random(len(tiempos)) < rastreo
+            r = np.where(rastreado, R * (1 - eficacia), R)
+            hijos = np.where(r > 0, rng.negative_binomial(k, k / (k + np.maximum(r, 1e-12))), 0)
+            tiempos = np.repeat(tiempos, hijos) + intervalo_gamma(rng, int(hijos.sum()), gi_media, gi_sd)
+            tiempos = tiempos[tiempos < dias]
+            total += len(tiempos)
+            np.add.at(curvas[m], tiempos.astype(np.int64), 1)
+    return curvas
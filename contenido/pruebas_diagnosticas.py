@@ -0,0 +1,121 @@
+# contenido/pruebas_diagnosticas.py
+"""
+Exactitud de pruebas diagnósticas sobre tablas 2x2 (vectorizado, sin Streamlit)
+Convención de la tabla:            Enfermo   Sano
+                    Prueba +          a        b
+                    Prueba -          c        d
+- Sensibilidad, especificidad, VPP, VPN, exactitud, razones de verosimilitud
+- Intervalos de Wilson o Clopper-Pearson (exacto) para proporciones; log-método para LR+/LR-
+- Barrido de VPP/VPN sobre miles de prevalencias (teorema de Bayes)
+Todas las funciones aceptan escalares o arrays: un lote de tablas se procesa en una sola pasada.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import beta, norm
+
+METODOS_IC = ("wilson", "clopper-pearson")
+COLUMNAS_LOTE = ("a", "b", "c", "d")
+ALIAS_LOTE = {"vp": "a", "tp": "a", "fp": "b", "fn": "c", "vn": "d", "tn": "d"}
+
+
+# --------------------------
+# INTERVALOS PARA PROPORCIONES
+# --------------------------
+def wilson(x, n, conf=0.95):
+    """Intervalo de Wilson (arrays); n = 0 devuelve NaN."""
+    x, n = np.asarray(x, dtype=float), np.asarray(n, dtype=float)
+    z = norm.ppf(0.5 + conf / 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = x / n
+        centro = (p + z**2 / (2 * n)) / (1 + z**2 / n)
+        radio = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+    return centro - radio, centro + radio
+
+def clopper_pearson(x, n, conf=0.95):
+    """Intervalo exacto de Clopper-Pearson (cuantiles beta, arrays)."""
+    x, n = np.asarray(x, dtype=float), np.asarray(n, dtype=float)
+    alfa = 1 - conf
+    with np.errstate(invalid="ignore", divide="ignore"):
+        inf = np.where(x > 0, beta.ppf(alfa / 2, x, n - x + 1), 0.0)
+        sup = np.where(x < n, beta.ppf(1 - alfa / 2, x + 1, n - x), 1.0)
+    invalido = n <= 0
+    return np.where(invalido, np.nan, inf), np.where(invalido, np.nan, sup)
+
+def intervalo_proporcion(x, n, conf=0.95, metodo="wilson"):
+    if metodo not in METODOS_IC:
+        raise ValueError(f"Método de IC desconocido '{metodo}'; opciones: {METODOS_IC}")
+    return wilson(x, n, conf) if metodo == "wilson" else clopper_pearson(x, n, conf)
+
+
+# --------------------------
+# MEDIDAS
+# --------------------------
+def _razon_ic(p1, n1, p2, n2, z):
+    """LR = p1 / p2 con IC por log-método (Simel et al. 1991)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lr = p1 / p2
+        ee = np.sqrt((1 - p1) / (p1 * n1) + (1 - p2) / (p2 * n2))
+        return lr, lr * np.exp(-z * ee), lr * np.exp(z * ee)
+
+def exactitud_diagnostica(a, b, c, d, conf=0.95, metodo="wilson"):
+    """
+    Medidas de exactitud con IC para una o muchas tablas.
+    Devuelve dict {medida: valor, medida_l: límite inferior, medida_u: límite superior} con arrays.
+    """
+    a, b, c, d = (np.asarray(v, dtype=float) for v in (a, b, c, d))
+    z = norm.ppf(0.5 + conf / 2)
+    enfermos, sanos, positivos, negativos = a + c, b + d, a + b, c + d
+    total = enfermos + sanos
+    res = {}
+    for nombre, x, n in [("sensibilidad", a, enfermos), ("especificidad", d, sanos),
+                         ("vpp", a, positivos), ("vpn", d, negativos),
+                         ("exactitud", a + d, total), ("prevalencia", enfermos, total)]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            res[nombre] = x / n
+        res[f"{nombre}_l"], res[f"{nombre}_u"] = intervalo_proporcion(x, n, conf, metodo)
+    sens, spec = res["sensibilidad"], res["especificidad"]
+    res["lr_pos"], res["lr_pos_l"], res["lr_pos_u"] = _razon_ic(sens, enfermos, 1 - spec, sanos, z)
+    res["lr_neg"], res["lr_neg_l"], res["lr_neg_u"] = _razon_ic(1 - sens, enfermos, spec, sanos, z)
+    return res
+
+def barrido_prevalencia(sensibilidad, especificidad, prevalencias):
+    """
+    VPP y VPN para cada prevalencia (Bayes). Con arrays de sensibilidad/especificidad de largo m y
+    k prevalencias devuelve matrices (m, k); con escalares, vectores (k,).
+    """
+    se = np.asarray(sensibilidad, dtype=float)[..., None]
+    sp = np.asarray(especificidad, dtype=float)[..., None]
+    p = np.asarray(prevalencias, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vpp = se * p / (se * p + (1 - sp) * (1 - p))
+        vpn = sp * (1 - p) / (sp * (1 - p) + (1 - se) * p)
+    return vpp, vpn
+
+
+# --------------------------
+# LOTES
+# --------------------------
+def normalizar_lote(df):
+    """Renombra columnas VP/FP/FN/VN (o TP/TN) a a/b/c/d; falla si faltan."""
+    df = df.rename(columns=lambda col: ALIAS_LOTE.get(str(col).strip().lower(), str(col).strip().lower()))
+    faltan = [c for c in COLUMNAS_LOTE if c not in df.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas {faltan}; se esperan a,b,c,d o VP,FP,FN,VN.")
+    return df
+
+def evaluar_lote(df, conf=0.95, metodo="wilson"):
+    """Todas las tablas del DataFrame en una sola pasada vectorizada; conserva las demás columnas (p. ej. nombre)."""
+    df = normalizar_lote(df)
+    res = exactitud_diagnostica(*(df[c].to_numpy() for c in COLUMNAS_LOTE), conf=conf, metodo=metodo)
+    return pd.concat([df.reset_index(drop=True), pd.DataFrame(res)], axis=1)
+
+def tabla_resultados(res, i=0):
+    """Resumen legible (medida, valor, IC) de la tabla i de un resultado de exactitud_diagnostica."""
+    etiquetas = {"sensibilidad": "Sensibilidad", "especificidad": "Especificidad", "vpp": "VPP", "vpn": "VPN",
+                 "exactitud": "Exactitud", "prevalencia": "Prevalencia (muestra)", "lr_pos": "LR+", "lr_neg": "LR-"}
+    filas = []
+    for clave, etiqueta in etiquetas.items():
+        v, l, u = (np.atleast_1d(res[k])[i] for k in (clave, f"{clave}_l", f"{clave}_u"))
+        filas.append({"medida": etiqueta, "valor": round(float(v), 4), "ic_inf": round(float(l), 4), "ic_sup": round(float(u), 4)})
+    return pd.DataFrame(filas)
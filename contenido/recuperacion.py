@@ -0,0 +1,175 @@
+# contenido/recuperacion.py
+"""
+Recuperación local (BM25) sobre el contenido del curso para el Chat Epidemiológico
+- Fuentes: contenido/*.md, glosario y banco de preguntas
+- Fragmentación por encabezados / párrafos
+- Índice invertido BM25 construido al inicio (o en un paso de build a JSON)
+- Prompt con los pasajes más relevantes y citas [n]
+Build: python -m contenido.recuperacion  (escribe contenido/indice_recuperacion.json)
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+import streamlit as st
+
+from .chat_epidemiologico import normalizar_pregunta
+from .glosario_completo import glosario
+from .ejercicios_completos import preguntas
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+CONTENIDO_DIR = os.path.dirname(os.path.abspath(__file__))
+RUTA_INDICE = os.path.join(CONTENIDO_DIR, "indice_recuperacion.json")
+FUENTES_MD = ["conceptosbasicos.md", "medidas_completas.md", "disenos_completos.md", "sesgos_completos.md", "visualizacion.md"]
+PALABRAS_POR_FRAGMENTO = 150
+BM25_K1 = 1.5
+BM25_B = 0.75
+TOP_K = 3
+MAX_CARACTERES_PASAJE = 700   # acota el prompt aunque un fragmento sea una tabla larga
+STOPWORDS = set("""
+a al algo ante como con cual cuales cuando de del desde donde e el ella ellas ellos en entre es esta este esto estos
+fue ha hay la las le les lo los mas me mi muy ni no o para pero por que quien se sea ser si sin sobre son su sus
+tambien te tiene un una uno unos unas y ya
+""".split())
+
+
+def tokenizar(texto):
+    return [t for t in normalizar_pregunta(texto).split() if t not in STOPWORDS and len(t) > 1]
+
+
+# --------------------------
+# FRAGMENTACIÓN
+# --------------------------
+def fragmentar_md(texto, fuente, palabras=PALABRAS_POR_FRAGMENTO):
+    """Un fragmento por sección '#'; las secciones largas (o archivos sin encabezados) se cortan por párrafos."""
+    fragmentos = []
+    secciones = re.split(r"\n(?=#{1,6} )", texto)
+    for sec in secciones:
+        lineas = sec.strip().splitlines()
+        if not lineas:
+            continue
+        titulo = lineas[0].lstrip("#").strip() if lineas[0].startswith("#") else ""
+        parrafos = [p.strip() for p in re.split(r"\n\s*\n", sec) if p.strip()]
+        actual, n = [], 0
+        for p in parrafos:
+            if not titulo and not actual:
+                titulo = p.splitlines()[0][:80]
+            actual.append(p)
+            n += len(p.split())
+            if n >= palabras:
+                fragmentos.append({"fuente": fuente, "titulo": titulo, "texto": "\n\n".join(actual)})
+                actual, n, titulo = [], 0, (titulo if lineas[0].startswith("#") else "")
+        if actual:
+            fragmentos.append({"fuente": fuente, "titulo": titulo, "texto": "\n\n".join(actual)})
+    return fragmentos
+
+def recolectar_fragmentos(directorio=CONTENIDO_DIR):
+    fragmentos = []
+    for nombre in FUENTES_MD:
+        ruta = os.path.join(directorio, nombre)
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                fragmentos.extend(fragmentar_md(f.read(), nombre))
+    for termino, definicion in glosario.items():
+        fragmentos.append({"fuente": "glosario", "titulo": termino, "texto": f"{termino}: {definicion}"})
+    for p in preguntas:
+        fragmentos.append({"fuente": "preguntas", "titulo": p["pregunta"], "texto": f"{p['pregunta']} Respuesta: {p['respuesta_correcta']}"})
+    return fragmentos
+
+
+# --------------------------
+# ÍNDICE BM25
+# --------------------------
+class IndiceBM25:
+    """Índice invertido: término -> [(id_fragmento, tf)], con longitudes de documento e idf precalculados."""
+
+    def __init__(self, fragmentos, postings, longitudes):
+        self.fragmentos = fragmentos
+        self.postings = postings
+        self.longitudes = longitudes
+        self.n_docs = len(fragmentos)
+        self.long_media = (sum(longitudes) / self.n_docs) if self.n_docs else 0.0
+        self.idf = {t: math.log(1 + (self.n_docs - len(p) + 0.5) / (len(p) + 0.5)) for t, p in postings.items()}
+
+    @classmethod
+    def construir(cls, fragmentos):
+        postings = defaultdict(list)
+        longitudes = []
+        for i, frag in enumerate(fragmentos):
+            tokens = tokenizar(frag["titulo"] + " " + frag["texto"])
+            longitudes.append(len(tokens))
+            for termino, tf in Counter(tokens).items():
+                postings[termino].append((i, tf))
+        return cls(fragmentos, dict(postings), longitudes)
+
+    def buscar(self, consulta, k=TOP_K):
+        """Top-k fragmentos como lista de (puntaje, fragmento)."""
+        puntajes = defaultdict(float)
+        for termino in set(tokenizar(consulta)):
+            idf = self.idf.get(termino)
+            if idf is None:
+                continue
+            for i, tf in self.postings[termino]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.longitudes[i] / self.long_media)
+                puntajes[i] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        mejores = sorted(puntajes.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [(p, self.fragmentos[i]) for i, p in mejores]
+
+    def a_dict(self):
+        return {"fragmentos": self.fragmentos, "postings": self.postings, "longitudes": self.longitudes}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        postings = {t: [tuple(x) for x in p] for t, p in datos["postings"].items()}
+        return cls(datos["fragmentos"], postings, datos["longitudes"])
+
+
+def _fuentes_mtime(directorio=CONTENIDO_DIR):
+    rutas = [os.path.join(directorio, n) for n in FUENTES_MD + ["glosario_completo.py", "ejercicios_completos.py"]]
+    return max((os.path.getmtime(r) for r in rutas if os.path.exists(r)), default=0)
+
+def guardar_indice(indice, ruta=RUTA_INDICE):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(indice.a_dict(), f, ensure_ascii=False)
+
+def cargar_indice(ruta=RUTA_INDICE):
+    """Usa el índice precompilado si existe y es más reciente que las fuentes; si no, lo construye."""
+    if os.path.exists(ruta) and os.path.getmtime(ruta) >= _fuentes_mtime():
+        with open(ruta, "r", encoding="utf-8") as f:
+            return IndiceBM25.desde_dict(json.load(f))
+    return IndiceBM25.construir(recolectar_fragmentos())
+
+@st.cache_resource(show_spinner=False)
+def obtener_indice():
+    """Índice único por proceso."""
+    return cargar_indice()
+
+
+# --------------------------
+# PROMPT CON CONTEXTO
+# --------------------------
+def construir_prompt(pregunta, pasajes):
+    """Prompt breve: pasajes numerados + pregunta; el modelo debe citar [n]."""
+    if not pasajes:
+        return pregunta
+    bloques = [f"[{n}] ({frag['fuente']} — {frag['titulo']}) {frag['texto'][:MAX_CARACTERES_PASAJE]}" for n, (_, frag) in enumerate(pasajes, start=1)]
+    return (
+        "Usa solo el siguiente material del curso para responder y cita las fuentes como [n].\n\n"
+        + "\n\n".join(bloques)
+        + f"\n\nPregunta: {pregunta}"
+    )
+
+def citas(pasajes):
+    """Líneas de referencia para mostrar bajo la respuesta."""
+    return [f"[{n}] {frag['fuente']} — {frag['titulo']}" for n, (_, frag) in enumerate(pasajes, start=1)]
+
+
+if __name__ == "__main__":
+    indice = IndiceBM25.construir(recolectar_fragmentos())
+    guardar_indice(indice)
+    print(f"Índice con {indice.n_docs} fragmentos y {len(indice.postings)} términos -> {RUTA_INDICE}")
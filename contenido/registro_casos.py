@@ -0,0 +1,101 @@
+# contenido/registro_casos.py
+"""
+Registro de casos de brotes cargado desde archivos (contenido/casos/*.yaml | *.json)
+- Un archivo por caso; los docentes agregan casos sin tocar código
+- Índice por id y por tag con solo los campos livianos (título, tags, población, condiciones iniciales)
+- Detalle completo (descripción, cronología, video) cargado bajo demanda y cacheado por (ruta, mtime)
+- actualizar() relee solo los archivos nuevos o modificados
+"""
+
+import json
+import os
+from functools import lru_cache
+
+try:
+    import yaml
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)   # libyaml si está disponible
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+DIRECTORIO_CASOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "casos")
+EXTENSIONES = (".yaml", ".yml", ".json") if YAML_AVAILABLE else (".json",)
+CAMPOS_INDICE = ("id", "title", "tags", "population", "init", "decision_tree")
+CAMPOS_REQUERIDOS = ("id", "title", "population", "init")
+
+
+@lru_cache(maxsize=256)
+def _leer(ruta, mtime):
+    """Documento completo de un caso (mtime forma parte de la clave: un archivo editado se relee)."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        datos = json.load(f) if ruta.endswith(".json") else yaml.load(f, Loader=YAML_LOADER)
+    faltan = [c for c in CAMPOS_REQUERIDOS if c not in (datos or {})]
+    if faltan:
+        raise ValueError(f"Caso inválido en {ruta}: faltan {faltan}")
+    return datos
+
+
+class RegistroCasos:
+    def __init__(self, directorio=DIRECTORIO_CASOS):
+        self.directorio = directorio
+        self.indice = {}       # id -> campos livianos + "_ruta", "_mtime"
+        self.por_tag = {}      # tag -> [ids]
+        self.errores = {}      # archivo -> mensaje (casos que no se pudieron cargar)
+        self.actualizar()
+
+    def actualizar(self):
+        """Relee los archivos nuevos o modificados y descarta los eliminados."""
+        vistos = {}
+        if os.path.isdir(self.directorio):
+            for entrada in os.scandir(self.directorio):
+                if entrada.is_file() and entrada.name.endswith(EXTENSIONES):
+                    vistos[entrada.path] = entrada.stat().st_mtime
+        actuales = {c["_ruta"]: c for c in self.indice.values()}
+        indice, errores = {}, {}
+        for ruta, mtime in sorted(vistos.items()):
+            previo = actuales.get(ruta)
+            if previo is not None and previo["_mtime"] == mtime:
+                indice[previo["id"]] = previo
+                continue
+            try:
+                datos = _leer(ruta, mtime)
+            except Exception as e:
+                errores[os.path.basename(ruta)] = str(e)
+                continue
+            if datos["id"] in indice:
+                errores[os.path.basename(ruta)] = f"id duplicado '{datos['id']}'"
+                continue
+            indice[datos["id"]] = {**{k: datos.get(k) for k in CAMPOS_INDICE}, "_ruta": ruta, "_mtime": mtime}
+            indice[datos["id"]]["tags"] = list(datos.get("tags") or [])
+        por_tag = {}
+        for cid, c in indice.items():
+            for tag in c["tags"]:
+                por_tag.setdefault(tag, []).append(cid)
+        self.indice, self.por_tag, self.errores = indice, por_tag, errores
+        return self
+
+    def ids(self, tags=None):
+        """Ids de casos (todos, o los que tienen alguno de los tags), en orden estable."""
+        if not tags:
+            return list(self.indice)
+        elegidos = set().union(*(self.por_tag.get(t, []) for t in tags))
+        return [cid for cid in self.indice if cid in elegidos]
+
+    def tags(self):
+        return sorted(self.por_tag)
+
+    def resumen(self, cid):
+        """Campos livianos del índice (sin leer el archivo)."""
+        return self.indice[cid]
+
+    def titulo(self, cid):
+        c = self.indice.get(cid)
+        return c["title"] if c else cid
+
+    def detalle(self, cid):
+        """Caso completo (descripción, cronología, video...), leído del archivo bajo demanda."""
+        c = self.indice[cid]
+        return _leer(c["_ruta"], c["_mtime"])
+
+    def __len__(self):
+        return len(self.indice)
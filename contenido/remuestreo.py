@@ -0,0 +1,223 @@
+# contenido/remuestreo.py
+"""
+Inferencia por remuestreo para tablas 2x2 y estratificadas (sin Streamlit)
+- Bootstrap multinomial vectorizado por bloques (percentil y BCa) para RR, OR y RD
+- Bloques repartidos en procesos con semillas reproducibles (SeedSequence.spawn por bloque:
+  el resultado no depende del número de procesos)
+- Pruebas exactas de permutación: con márgenes fijos la distribución de `a` es hipergeométrica,
+  y RR, OR y RD son monótonos en `a`, así que el p-valor se enumera exactamente
+- IC exacto condicional del OR (inversión de la hipergeométrica no central)
+- Estratificado: OR/RR de Mantel-Haenszel, bootstrap dentro de cada estrato y prueba exacta
+  (convolución de las hipergeométricas de los estratos)
+Convención: a = casos expuestos, b = no casos expuestos, c = casos no expuestos, d = no casos no expuestos.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import brentq
+from scipy.stats import hypergeom, nchypergeom_fisher, norm
+
+MEDIDAS = ("RR", "OR", "RD")
+DEFAULT_REMUESTREOS = 10_000
+DEFAULT_BLOQUE = 20_000
+DEFAULT_SEMILLA = 2024
+# la app corre hilos con locks (cola de reportes, escritor SQLite): un fork podría heredar un lock tomado
+INICIO_PROCESOS = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# --------------------------
+# ESTADÍSTICOS (vectorizados)
+# --------------------------
+def medidas(a, b, c, d):
+    """RR, OR y RD para arrays de tablas; las tablas con algún cero reciben +0.5 en todas las celdas (Haldane)."""
+    a, b, c, d = (np.asarray(v, dtype=float) for v in (a, b, c, d))
+    cero = (a == 0) | (b == 0) | (c == 0) | (d == 0)
+    a, b, c, d = (np.where(cero, v + 0.5, v) for v in (a, b, c, d))
+    r1, r0 = a / (a + b), c / (c + d)
+    return {"RR": r1 / r0, "OR": (a * d) / (b * c), "RD": r1 - r0}
+
+def mantel_haenszel(tablas):
+    """OR y RR de Mantel-Haenszel para tablas (..., K, 4); suma sobre el eje de estratos."""
+    t = np.asarray(tablas, dtype=float)
+    a, b, c, d = t[..., 0], t[..., 1], t[..., 2], t[..., 3]
+    n = a + b + c + d
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "OR": (a * d / n).sum(axis=-1) / (b * c / n).sum(axis=-1),
+            "RR": (a * (c + d) / n).sum(axis=-1) / (c * (a + b) / n).sum(axis=-1),
+        }
+
+
+# --------------------------
+# BOOTSTRAP
+# --------------------------
+def _bloque_bootstrap(tablas, n, semilla):
+    """
+    n remuestras de cada estrato (multinomial con su total y proporciones de celda).
+    tablas: (K, 4). Devuelve dict medida -> array (n,): medidas crudas si K == 1, Mantel-Haenszel si K > 1.
+    """
+    rng = np.random.default_rng(semilla)
+    tablas = np.asarray(tablas, dtype=float)
+    muestras = np.stack([rng.multinomial(int(t.sum()), t / t.sum(), size=n) for t in tablas], axis=1)  # (n, K, 4)
+    if len(tablas) == 1:
+        m = muestras[:, 0]
+        return medidas(m[:, 0], m[:, 1], m[:, 2], m[:, 3])
+    return mantel_haenszel(muestras)
+
+def obtener_pool(procesos=None):
+    """Pool de procesos compartido (se crea una vez por proceso de la app; workers por forkserver/spawn, nunca fork)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=procesos or os.cpu_count() or 1, mp_context=multiprocessing.get_context(INICIO_PROCESOS))
+        return _pool
+
+def bootstrap(tablas, remuestreos=DEFAULT_REMUESTREOS, semilla=DEFAULT_SEMILLA, bloque=DEFAULT_BLOQUE, procesos=None):
+    """
+    Distribución bootstrap por bloques; cada bloque usa su propia semilla hija (reproducible).
+    Con un solo bloque se calcula en el proceso actual (evita el costo de arrancar procesos).
+    """
+    tablas = np.atleast_2d(np.asarray(tablas, dtype=float))
+    tamanos = [min(bloque, remuestreos - i) for i in range(0, remuestreos, bloque)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    if len(tamanos) == 1 or procesos == 1:
+        partes = [_bloque_bootstrap(tablas, n, s) for n, s in zip(tamanos, semillas)]
+    else:
+        pool = obtener_pool(procesos)
+        partes = list(pool.map(_bloque_bootstrap, [tablas] * len(tamanos), tamanos, semillas))
+    return {k: np.concatenate([p[k] for p in partes]) for k in partes[0]}
+
+def _jackknife(tablas, estadistico):
+    """Valores leave-one-out agrupados por tipo de celda (cada observación de la celda j da el mismo valor)."""
+    tablas = np.atleast_2d(np.asarray(tablas, dtype=float))
+    valores, pesos = [], []
+    for k in range(len(tablas)):
+        for j in range(4):
+            if tablas[k, j] > 0:
+                t = tablas.copy()
+                t[k, j] -= 1
+                valores.append(estadistico(t))
+                pesos.append(tablas[k, j])
+    return np.array(valores), np.array(pesos)
+
+def ic_bootstrap(distribucion, estimado, conf=0.95, metodo="percentil", jackknife=None):
+    """
+    IC percentil o BCa sobre la escala que reciba (los llamadores pasan RR/OR en log).
+    Para BCa, jackknife = (valores, pesos) del estadístico (ver _jackknife).
+    Sin remuestras finitas (p. ej. un estrato degenerado en todas) devuelve (nan, nan).
+    """
+    d = distribucion[np.isfinite(distribucion)]
+    if d.size == 0:
+        return np.nan, np.nan
+    alfa = np.array([(1 - conf) / 2, (1 + conf) / 2])
+    if metodo == "percentil" or jackknife is None:
+        return tuple(np.quantile(d, alfa))
+    z0 = norm.ppf(np.clip((d < estimado).mean() + 0.5 * (d == estimado).mean(), 1e-10, 1 - 1e-10))
+    valores, pesos = jackknife
+    media = np.average(valores, weights=pesos)
+    dif = media - valores
+    den = 6 * (pesos * dif**2).sum() ** 1.5
+    acel = (pesos * dif**3).sum() / den if den > 0 else 0.0
+    z = norm.ppf(alfa)
+    ajustado = norm.cdf(z0 + (z0 + z) / (1 - acel * (z0 + z)))
+    return tuple(np.quantile(d, ajustado))
+
+
+# --------------------------
+# PERMUTACIÓN EXACTA
+# --------------------------
+def _soporte(tabla):
+    a, b, c, d = (int(v) for v in tabla)
+    n1, n0, m1 = a + b, c + d, a + c
+    x = np.arange(max(0, m1 - n0), min(n1, m1) + 1)
+    return x, n1, n0, m1
+
+def permutacion_exacta(tabla):
+    """
+    p-valores bilaterales exactos (márgenes fijos) para RR, OR y RD: P(|T - T_nulo| >= |t_obs - T_nulo|),
+    con T_nulo el valor del estadístico bajo independencia (1 para razones en escala log, 0 para RD).
+    """
+    x, n1, n0, m1 = _soporte(tabla)
+    pmf = hypergeom.pmf(x, n1 + n0, n1, m1)
+    est = medidas(x, n1 - x, m1 - x, n0 - (m1 - x))
+    obs = medidas(*tabla)
+    p = {}
+    for k in MEDIDAS:
+        t, t_obs = (np.log(est[k]), np.log(obs[k])) if k != "RD" else (est[k], obs[k])
+        p[k] = float(min(1.0, pmf[np.abs(t) >= np.abs(t_obs) - 1e-12].sum()))
+    return p
+
+def ic_exacto_or(tabla, conf=0.95):
+    """IC exacto condicional (Cornfield) del OR invirtiendo la hipergeométrica no central de Fisher."""
+    a = int(tabla[0])
+    x, n1, n0, m1 = _soporte(tabla)
+    alfa = (1 - conf) / 2
+    def cola_sup(log_or):   # P(X >= a | OR)
+        return nchypergeom_fisher.sf(a - 1, n1 + n0, n1, m1, np.exp(log_or))
+    def cola_inf(log_or):   # P(X <= a | OR)
+        return nchypergeom_fisher.cdf(a, n1 + n0, n1, m1, np.exp(log_or))
+    inf = 0.0 if a == x.min() else np.exp(brentq(lambda t: cola_sup(t) - alfa, -30, 30))
+    sup = np.inf if a == x.max() else np.exp(brentq(lambda t: cola_inf(t) - alfa, -30, 30))
+    return inf, sup
+
+def permutacion_estratificada(tablas):
+    """
+    Prueba exacta estratificada (márgenes fijos en cada estrato): la distribución de sum(a_k) es la
+    convolución de las hipergeométricas; p bilateral = P(prob <= prob observada).
+    """
+    tablas = np.atleast_2d(np.asarray(tablas, dtype=int))
+    pmf, minimo = np.array([1.0]), 0
+    for t in tablas:
+        x, n1, n0, m1 = _soporte(t)
+        pmf = np.convolve(pmf, hypergeom.pmf(x, n1 + n0, n1, m1))
+        minimo += int(x.min())
+    obs = int(tablas[:, 0].sum()) - minimo
+    return float(min(1.0, pmf[pmf <= pmf[obs] * (1 + 1e-7)].sum()))
+
+
+# --------------------------
+# RESUMEN
+# --------------------------
+def inferencia_2x2(tabla, remuestreos=DEFAULT_REMUESTREOS, conf=0.95, semilla=DEFAULT_SEMILLA, procesos=None):
+    """Filas por medida: estimado, IC percentil, IC BCa y p exacto (más IC exacto condicional para el OR)."""
+    tabla = np.asarray(tabla, dtype=float).reshape(4)
+    dist = bootstrap(tabla[None, :], remuestreos, semilla, procesos=procesos)
+    obs = medidas(*tabla)
+    p_exacto = permutacion_exacta(tabla)
+    filas = []
+    for k in MEDIDAS:
+        log = k != "RD"
+        transf = np.log if log else (lambda v: v)
+        inv = np.exp if log else (lambda v: v)
+        jk = _jackknife(tabla[None, :], lambda t, k=k: transf(medidas(*t[0])[k]))
+        perc = ic_bootstrap(transf(dist[k]), transf(obs[k]), conf, "percentil")
+        bca = ic_bootstrap(transf(dist[k]), transf(obs[k]), conf, "bca", jackknife=jk)
+        fila = {"medida": k, "estimado": float(obs[k]), "perc_inf": float(inv(perc[0])), "perc_sup": float(inv(perc[1])),
+                "bca_inf": float(inv(bca[0])), "bca_sup": float(inv(bca[1])), "p_exacto": p_exacto[k]}
+        if k == "OR":
+            fila["exacto_inf"], fila["exacto_sup"] = (float(v) for v in ic_exacto_or(tabla, conf))
+        filas.append(fila)
+    return filas
+
+def inferencia_estratificada(tablas, remuestreos=DEFAULT_REMUESTREOS, conf=0.95, semilla=DEFAULT_SEMILLA, procesos=None):
+    """OR/RR de Mantel-Haenszel con IC bootstrap estratificado (percentil y BCa) y p exacto estratificado."""
+    tablas = np.atleast_2d(np.asarray(tablas, dtype=float))
+    dist = bootstrap(tablas, remuestreos, semilla, procesos=procesos)
+    obs = mantel_haenszel(tablas)
+    p = permutacion_estratificada(tablas)
+    filas = []
+    for k in ("OR", "RR"):
+        jk = _jackknife(tablas, lambda t, k=k: np.log(mantel_haenszel(t)[k]))
+        perc = ic_bootstrap(np.log(dist[k]), np.log(obs[k]), conf, "percentil")
+        bca = ic_bootstrap(np.log(dist[k]), np.log(obs[k]), conf, "bca", jackknife=jk)
+        filas.append({"medida": f"{k} Mantel-Haenszel", "estimado": float(obs[k]),
+                      "perc_inf": float(np.exp(perc[0])), "perc_sup": float(np.exp(perc[1])),
+                      "bca_inf": float(np.exp(bca[0])), "bca_sup": float(np.exp(bca[1])), "p_exacto": p})
+    return filas
@@ -0,0 +1,257 @@
+# contenido/reportes.py
+"""
+Cola de reportes (PDF / Excel) para Epi101
+- Render diferido: los archivos solo se generan cuando alguien los pide
+- Pool de workers (hilos) compartido por todas las sesiones del proceso
+- Direccionamiento por contenido: reportes idénticos se reutilizan
+- Modo lote: un PDF consolidado con varias secciones (casos, estudiantes)
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .exportacion import tamano_legible
+
+# PDF support
+try:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.utils import ImageReader
+    REPORTLAB_AVAILABLE = True
+except Exception:
+    REPORTLAB_AVAILABLE = False
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_ITEMS = 64
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024    # tope de la caché en bytes (un Excel grande puede pesar decenas de MB)
+DEFAULT_WAIT_SECONDS = 20
+
+_log = logging.getLogger(__name__)
+
+
+# --------------------------
+# HUELLA DE CONTENIDO
+# --------------------------
+def huella(*partes):
+    """Hash sha256 estable de las entradas de un reporte (texto, bytes, DataFrames, arrays)."""
+    h = hashlib.sha256()
+    for p in partes:
+        if isinstance(p, (bytes, bytearray)):
+            h.update(b"b"); h.update(bytes(p))
+        elif isinstance(p, pd.DataFrame):
+            h.update(b"df"); h.update(repr(list(p.columns)).encode())
+            h.update(pd.util.hash_pandas_object(p, index=False).values.tobytes())
+        elif isinstance(p, np.ndarray):
+            h.update(b"nd"); h.update(str(p.dtype).encode()); h.update(repr(p.shape).encode())
+            h.update(np.ascontiguousarray(p).tobytes())
+        elif isinstance(p, (list, tuple)):
+            h.update(b"["); h.update(huella(*p).encode()); h.update(b"]")
+        elif isinstance(p, dict):
+            h.update(b"{"); h.update(huella(*sorted(p.items(), key=lambda kv: str(kv[0]))).encode()); h.update(b"}")
+        else:
+            h.update(b"r"); h.update(repr(p).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+# --------------------------
+# RENDER PDF
+# --------------------------
+def render_pdf_secciones(secciones):
+    """
+    PDF con una o varias secciones. Cada sección es un dict con:
+    - title, subtitle: encabezado
+    - lines: lista de líneas de texto
+    - figs: lista de imágenes PNG (bytes)
+    Devuelve bytes o None si reportlab no está instalado.
+    """
+    if not REPORTLAB_AVAILABLE:
+        return None
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter)
+    for idx, sec in enumerate(secciones):
+        if idx > 0:
+            c.showPage()
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(40, 760, sec.get("title", ""))
+        c.setFont("Helvetica", 10)
+        c.drawString(40, 745, sec.get("subtitle", ""))
+        y = 720
+        for ln in sec.get("lines", []):
+            c.drawString(40, y, ln)
+            y -= 12
+            if y < 120:
+                c.showPage()
+                c.setFont("Helvetica", 10)
+                y = 760
+        figs = sec.get("figs", [])
+        if figs:
+            c.showPage()
+        for i, fb in enumerate(figs):
+            try:
+                img = ImageReader(BytesIO(fb))
+                c.drawImage(img, 40, 320, width=520, height=320)
+                if i < len(figs) - 1:
+                    c.showPage()
+            except Exception:
+                pass
+    c.save()
+    buf.seek(0)
+    return buf.getvalue()
+
+
+# --------------------------
+# COLA DE TRABAJOS
+# --------------------------
+class ColaReportes:
+    """
+    Pool de workers con caché LRU direccionada por contenido.
+    Un mismo `clave` solo se renderiza una vez: las peticiones repetidas
+    (otra sesión, otro rerun) reciben el mismo Future o los bytes ya listos.
+    La caché se acota por cantidad (max_items) y por bytes totales (max_bytes); el reporte recién
+    terminado siempre se conserva, así que el pico es max_bytes más un archivo.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_items=DEFAULT_MAX_ITEMS, max_bytes=DEFAULT_MAX_BYTES):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="epi101-reportes")
+        self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._listos = OrderedDict()   # clave -> bytes
+        self._pendientes = {}          # clave -> Future
+        self._errores = OrderedDict()  # clave -> mensaje del último fallo (se borra al volver a solicitar)
+        self._lock = threading.Lock()
+
+    def solicitar(self, clave, funcion, *args, **kwargs):
+        """Encola `funcion(*args, **kwargs)` bajo `clave` (si no existe ya) y devuelve su Future."""
+        with self._lock:
+            if clave in self._listos:
+                self._listos.move_to_end(clave)
+                return _future_resuelto(self._listos[clave])
+            if clave in self._pendientes:
+                return self._pendientes[clave]
+            self._errores.pop(clave, None)
+            fut = self._pool.submit(funcion, *args, **kwargs)
+            self._pendientes[clave] = fut
+        fut.add_done_callback(lambda f, k=clave: self._terminar(k, f))
+        return fut
+
+    def _terminar(self, clave, fut):
+        with self._lock:
+            self._pendientes.pop(clave, None)
+            if fut.cancelled():
+                return
+            if fut.exception() is not None or fut.result() is None:
+                self._fallo(clave, fut.exception())
+                return
+            datos = fut.result()
+            self._bytes += len(datos) - len(self._listos.pop(clave, b""))
+            self._listos[clave] = datos
+            while len(self._listos) > 1 and (len(self._listos) > self._max_items or self._bytes > self._max_bytes):
+                self._bytes -= len(self._listos.popitem(last=False)[1])
+
+    def _fallo(self, clave, exc):
+        """Registra el fallo de `clave` (con el lock tomado); el mensaje queda disponible en error()."""
+        if clave in self._errores:
+            return
+        if exc is None:
+            mensaje = "el generador no devolvió datos"
+            _log.error("Reporte %s: %s", clave[:12], mensaje)
+        else:
+            mensaje = f"{type(exc).__name__}: {exc}"
+            _log.error("Reporte %s falló", clave[:12], exc_info=exc)
+        self._errores[clave] = mensaje
+        while len(self._errores) > self._max_items:
+            self._errores.popitem(last=False)
+
+    def estado(self, clave):
+        """'listo', 'pendiente', 'error' o None."""
+        with self._lock:
+            if clave in self._listos:
+                return "listo"
+            if clave in self._pendientes:
+                return "pendiente"
+            if clave in self._errores:
+                return "error"
+        return None
+
+    def error(self, clave):
+        """Mensaje del último fallo de `clave` (o None)."""
+        with self._lock:
+            return self._errores.get(clave)
+
+    def resultado(self, clave):
+        with self._lock:
+            return self._listos.get(clave)
+
+    def esperar(self, clave, timeout=DEFAULT_WAIT_SECONDS):
+        """Bytes del reporte si termina dentro de `timeout`; None si sigue pendiente o falló."""
+        with self._lock:
+            if clave in self._listos:
+                return self._listos[clave]
+            fut = self._pendientes.get(clave)
+        if fut is None:
+            return None
+        try:
+            return fut.result(timeout=timeout)
+        except FuturesTimeout:
+            return None
+        except Exception as e:
+            # el callback de _terminar puede correr después de despertar a este hilo: se registra aquí también
+            with self._lock:
+                self._pendientes.pop(clave, None)
+                self._fallo(clave, e)
+            return None
+
+
+def _future_resuelto(valor):
+    fut = Future()
+    fut.set_result(valor)
+    return fut
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_cola():
+    """Cola única por proceso (compartida entre sesiones)."""
+    return ColaReportes()
+
+
+# --------------------------
+# UI: descarga diferida
+# --------------------------
+def descarga_diferida(etiqueta, clave, funcion, args=(), file_name="reporte.pdf", mime="application/pdf", key=None, timeout=DEFAULT_WAIT_SECONDS):
+    """
+    Muestra "Preparar <etiqueta>" y solo genera el archivo al pulsarlo.
+    Si el archivo ya existe en la caché (misma huella) se ofrece la descarga directamente.
+    Si el trabajo falla se muestra el motivo (y "Preparar" lo reintenta).
+    Devuelve True si se mostró el botón de descarga.
+    """
+    cola = obtener_cola()
+    key = key or f"diferido_{clave[:16]}"
+    datos = cola.resultado(clave)
+    if datos is None:
+        pedir = st.button(f"Preparar {etiqueta}", key=f"{key}_btn")
+        if not pedir and cola.estado(clave) != "pendiente":
+            if cola.estado(clave) == "error":     # falló después de la espera (en un rerun anterior)
+                st.warning(f"No se pudo generar {etiqueta}: {cola.error(clave)}")
+            return False
+        with st.spinner(f"Generando {etiqueta}..."):
+            cola.solicitar(clave, funcion, *args)
+            datos = cola.esperar(clave, timeout=timeout)
+        if datos is None:
+            if cola.estado(clave) == "pendiente":
+                st.info(f"{etiqueta} en cola. Pulsa 'Actualizar' en unos segundos.")
+                st.button("Actualizar", key=f"{key}_refresh")
+            else:
+                st.warning(f"No se pudo generar {etiqueta}: {cola.error(clave) or 'error desconocido'}")
+            return False
+    st.download_button(f"⬇️ Descargar {etiqueta} ({tamano_legible(len(datos))})", data=datos, file_name=file_name, mime=mime, key=f"{key}_dl")
+    return True
@@ -0,0 +1,157 @@
+# contenido/seir_edades.py
+"""
+SEIR estructurado por edades (sin Streamlit)
+- 16 grupos quinquenales (0-4 ... 75+) y matrices de contacto por entorno: hogar, escuela, trabajo, otros
+- Fuerza de infección con productos matriciales (einsum) para muchos escenarios a la vez
+- IFR por edad; beta calibrado para que el radio espectral de la matriz de próxima generación sea R0
+- Intervenciones: escalado de sub-matrices de contacto (cierre de escuelas, protección de mayores, ...)
+Las matrices son sintéticas (forma tipo Prem et al.), pensadas para docencia, no para estimación.
+"""
+
+import numpy as np
+import pandas as pd
+
+GRUPOS = [f"{a}-{a+4}" for a in range(0, 75, 5)] + ["75+"]
+ENTORNOS = ["hogar", "escuela", "trabajo", "otros"]
+# IFR por edad (orden de magnitud de estimaciones COVID-19, Verity et al. 2020)
+IFR_EDAD = np.array([0.00002, 0.00002, 0.00003, 0.00008, 0.00015, 0.0003, 0.0006, 0.001,
+                     0.0016, 0.0025, 0.004, 0.006, 0.01, 0.018, 0.03, 0.08])
+
+
+# --------------------------
+# POBLACIÓN Y CONTACTOS
+# --------------------------
+def poblacion_por_edad(N, pesos=None):
+    """Reparte N en los 16 grupos; por defecto una pirámide que se estrecha con la edad."""
+    pesos = np.linspace(1.0, 0.35, len(GRUPOS)) if pesos is None else np.asarray(pesos, dtype=float)
+    return N * pesos / pesos.sum()
+
+def matrices_contacto():
+    """
+    Contactos diarios por entorno (dict entorno -> matriz 16x16, fila = edad de quien contacta).
+    Hogar: diagonal + banda padres-hijos (±25-30 años); escuela: 5-19 años; trabajo: 20-64; otros: difuso.
+    """
+    edades = np.arange(len(GRUPOS)) * 5 + 2.5
+    d = edades[:, None] - edades[None, :]
+    hogar = 0.9 * np.exp(-(d / 6) ** 2) + 0.5 * np.exp(-((np.abs(d) - 27.5) / 6) ** 2)
+    en_edad_escolar = (edades >= 5) & (edades < 20)
+    escuela = 6.0 * np.exp(-(d / 4) ** 2) * np.outer(en_edad_escolar, en_edad_escolar)
+    escuela += 0.3 * np.outer(en_edad_escolar, (edades >= 25) & (edades < 65))   # docentes
+    en_edad_laboral = (edades >= 20) & (edades < 65)
+    trabajo = 1.0 * np.exp(-(d / 20) ** 2) * np.outer(en_edad_laboral, en_edad_laboral)
+    otros = 0.6 * np.exp(-(d / 15) ** 2)
+    return {"hogar": hogar, "escuela": escuela, "trabajo": trabajo, "otros": otros}
+
+def radio_espectral(C):
+    """Radio espectral de la matriz de próxima generación N_a C_ab / N_b (igual al de C por semejanza)."""
+    return float(np.max(np.abs(np.linalg.eigvals(np.asarray(C, dtype=float)))))
+
+def beta_para_R0(R0_value, C, gamma=1/7):
+    return R0_value * gamma / radio_espectral(C)
+
+
+# --------------------------
+# INTERVENCIONES
+# --------------------------
+def escalar_contactos(matrices, intervenciones):
+    """
+    Matriz total tras aplicar intervenciones activas.
+    Cada intervención: {"entorno": nombre | None (todos), "factor": multiplicador,
+                        "edades": (desde, hasta) índices de grupo (opcional; se escalan filas y columnas del rango)}.
+    """
+    escaladas = {k: m.copy() for k, m in matrices.items()}
+    for iv in intervenciones:
+        entornos = ENTORNOS if iv.get("entorno") is None else [iv["entorno"]]
+        mascara = np.ones(len(GRUPOS), dtype=bool)
+        if iv.get("edades") is not None:
+            mascara[:] = False
+            mascara[iv["edades"][0]:iv["edades"][1] + 1] = True
+        celdas = mascara[:, None] | mascara[None, :]
+        for e in entornos:
+            escaladas[e][celdas] *= iv["factor"]
+    return sum(escaladas.values())
+
+def matrices_por_dia(matrices, intervenciones, days):
+    """
+    Cambios de la matriz total de un escenario: lista ordenada de (día, matriz).
+    Intervenciones con "dia" (inicio) y opcional "fin"; solo se recalcula la matriz en los días de cambio.
+    """
+    cortes = sorted({0} | {iv.get("dia", 0) for iv in intervenciones} | {iv["fin"] for iv in intervenciones if iv.get("fin") is not None})
+    cambios = []
+    for t in cortes:
+        if t >= days:
+            break
+        activas = [iv for iv in intervenciones if iv.get("dia", 0) <= t and (iv.get("fin") is None or t < iv["fin"])]
+        cambios.append((t, escalar_contactos(matrices, activas)))
+    return cambios
+
+
+# --------------------------
+# SIMULACIÓN
+# --------------------------
+def seir_edades_lotes(poblacion, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, ifr=IFR_EDAD,
+                      escenarios=None, matrices=None):
+    """
+    Simula varios escenarios (listas de intervenciones) de un SEIR por edades.
+    - poblacion: array (A,) de personas por grupo; I0/E0: escalares (repartidos según poblacion) o arrays (A,)
+    - R0_value: R0 sin intervenciones; beta se calibra con el radio espectral de la matriz total
+    Devuelve dict {"S","E","I","R","new_infections","new_deaths": array (n_escenarios, days, A)}.
+    """
+    matrices = matrices_contacto() if matrices is None else matrices
+    escenarios = [[]] if escenarios is None else escenarios
+    n, A = len(escenarios), len(poblacion)
+    Nb = np.asarray(poblacion, dtype=float)
+    reparto = Nb / Nb.sum()
+    I = np.broadcast_to(np.asarray(I0, dtype=float) * (reparto if np.ndim(I0) == 0 else 1), (n, A)).copy()
+    E = np.broadcast_to(np.asarray(E0, dtype=float) * (reparto if np.ndim(E0) == 0 else 1), (n, A)).copy()
+    S = Nb - I - E
+    R = np.zeros((n, A))
+    ifr = np.broadcast_to(np.asarray(ifr, dtype=float), (A,))
+    beta = beta_para_R0(R0_value, sum(matrices.values()), gamma)
+
+    cambios = [dict(matrices_por_dia(matrices, iv, days)) for iv in escenarios]
+    C = np.stack([c[0] for c in cambios])                  # (n, A, A) matriz vigente de cada escenario
+    salida = {k: np.empty((n, days, A)) for k in ["S", "E", "I", "R", "new_infections", "new_deaths"]}
+    for t in range(days):
+        for s, c in enumerate(cambios):
+            if t in c and t:
+                C[s] = c[t]
+        # fuerza de infección: lambda[s, a] = beta * sum_b C[s, a, b] * I[s, b] / N[b]
+        fuerza = beta * np.einsum("sab,sb->sa", C, I / Nb)
+        new_exposed = fuerza * S
+        new_infectious = sigma * E
+        new_recovered = gamma * I
+        new_deaths = new_recovered * ifr
+        S = np.maximum(0, S - new_exposed)
+        E = np.maximum(0, E + new_exposed - new_infectious)
+        I = np.maximum(0, I + new_infectious - new_recovered)
+        R = np.maximum(0, R + new_recovered - new_deaths)
+        salida["S"][:, t] = S
+        salida["E"][:, t] = E
+        salida["I"][:, t] = I
+        salida["R"][:, t] = R
+        salida["new_infections"][:, t] = new_exposed
+        salida["new_deaths"][:, t] = new_deaths
+    return salida
+
+def resumen_por_edad(resultado, i=0):
+    """Infecciones y muertes totales por grupo de edad de un escenario."""
+    return pd.DataFrame({
+        "grupo": GRUPOS,
+        "infecciones": resultado["new_infections"][i].sum(axis=0).round().astype(int),
+        "muertes": resultado["new_deaths"][i].sum(axis=0).round(1),
+    })
+
+
+# --------------------------
+# INTERVENCIONES PREDEFINIDAS
+# --------------------------
+def cierre_escuelas(dia, factor=0.1, fin=None):
+    return {"entorno": "escuela", "factor": factor, "dia": dia, "fin": fin}
+
+def proteccion_mayores(dia, factor=0.4, desde_grupo=12, fin=None):
+    """Reduce todos los contactos de los grupos >= desde_grupo (60+ por defecto)."""
+    return {"entorno": None, "factor": factor, "edades": (desde_grupo, len(GRUPOS) - 1), "dia": dia, "fin": fin}
+
+def teletrabajo(dia, factor=0.5, fin=None):
+    return {"entorno": "trabajo", "factor": factor, "dia": dia, "fin": fin}
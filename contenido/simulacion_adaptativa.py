@@ -1,30 +1,32 @@
-import random
 import datetime
 from .ejercicios_completos import preguntas
+from .reportes import render_pdf_secciones
+from .analitica_items import elegir_pregunta
 import pandas as pd
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from io import BytesIO
 import base64
 
-def simulacion_adaptativa(respuestas_usuario, max_preguntas=10, puntaje=0):
+def simulacion_adaptativa(respuestas_usuario, max_preguntas=10, puntaje=0, registrar=None, instantanea=None, intento=None):
     """
     Simulación adaptativa para Epidemiología 101 con motivación, progreso y badges.
+    registrar: opcional, p. ej. functools.partial(almacen.registrar, usuario, "adaptativa", cohorte=cohorte)
+    (ver contenido/almacen_progreso.py); recibe cada respuesta evaluada y las insignias obtenidas.
+    instantanea: opcional, última instantánea de contenido/analitica_items.py para ponderar la elección de ítems.
+    intento: opcional, identifica el intento en las claves de registrar (el almacén ignora claves repetidas,
+    así un segundo intento del mismo usuario no choca con el primero).
     """
+    prefijo = "" if intento is None else f"{intento}:"
 
     usadas = [r["pregunta"] for r in respuestas_usuario.values()]
 
-    # Limite máximo de preguntas
-    if len(respuestas_usuario) >= max_preguntas:
-        badge = asignar_badge(puntaje)
-        return None, f"🎉 ¡Simulación completada! Respondiste {len(respuestas_usuario)} preguntas. {badge}", puntaje
-
     if not respuestas_usuario:
         # Primera pregunta siempre nivel Básico
         disponibles = [q for q in preguntas if q["nivel"] == "Básico" and q["pregunta"] not in usadas]
         if not disponibles:
             return None, "No hay preguntas disponibles en nivel Básico.", puntaje
-        pregunta = random.choice(disponibles)
+        pregunta = elegir_pregunta(disponibles, instantanea, "Básico")
         return pregunta, "🌟 Primera pregunta, nivel Básico. ¡Tú puedes!", puntaje
 
     ultima = list(respuestas_usuario.values())[-1]
@@ -32,11 +34,22 @@ def simulacion_adaptativa(respuestas_usuario, max_preguntas=10, puntaje=0):
     acierto = ultima["correcto"]
     mensaje = ""
 
-    # Ajustar puntaje
+    # Ajustar puntaje (también la última respuesta, antes de cerrar por límite)
+    previo = puntaje
     if acierto:
         puntaje += 10
     else:
         puntaje = max(0, puntaje - 5)
+    if registrar:
+        registrar(clave=f"{prefijo}{len(respuestas_usuario)}", item=ultima["pregunta"], correcto=acierto, puntos=puntaje - previo,
+                  detalle={"opcion": ultima["respuesta"]} if ultima.get("respuesta") else None)
+
+    # Limite máximo de preguntas
+    if len(respuestas_usuario) >= max_preguntas:
+        badge = asignar_badge(puntaje)
+        if registrar:
+            registrar(clave=f"{prefijo}fin", insignia=badge)
+        return None, f"🎉 ¡Simulación completada! Respondiste {len(respuestas_usuario)} preguntas. {badge}", puntaje
 
     # Lógica adaptativa
     if ultimo_nivel == "Básico":
@@ -58,6 +71,8 @@ def simulacion_adaptativa(respuestas_usuario, max_preguntas=10, puntaje=0):
     elif ultimo_nivel == "Avanzado":
         if acierto:
             badge = asignar_badge(puntaje)
+            if registrar:
+                registrar(clave=f"{prefijo}fin", insignia=badge)
             return None, f"🏆 ¡Felicidades! Has completado la simulación adaptativa y alcanzaste el nivel Avanzado 🎉 {badge}", puntaje
         nivel_siguiente = "Intermedio"
         mensaje = "⚡ Casi llegas al final. Regresas a nivel Intermedio para reforzar conocimientos."
@@ -68,7 +83,7 @@ def simulacion_adaptativa(respuestas_usuario, max_preguntas=10, puntaje=0):
     if not disponibles:
         return None, "No hay más preguntas disponibles. Simulación finalizada.", puntaje
 
-    pregunta = random.choice(disponibles)
+    pregunta = elegir_pregunta(disponibles, instantanea, nivel_siguiente)
     return pregunta, mensaje, puntaje
 
 
@@ -106,6 +121,38 @@ def exportar_resultados_pdf(respuestas_usuario, puntaje):
     return pdf
 
 
+def exportar_resultados_pdf_lote(registros):
+    """
+    Un único PDF consolidado para varios estudiantes (modo lote).
+    registros: dict {estudiante: (respuestas_usuario, puntaje)}
+    """
+    secciones = []
+    for estudiante, (respuestas_usuario, puntaje) in registros.items():
+        lineas = [
+            f"{idx}. {datos['pregunta']} | Nivel: {datos['nivel']} | Correcto: {datos['correcto']}"
+            for idx, datos in respuestas_usuario.items()
+        ]
+        secciones.append({
+            "title": f"Reporte Simulación Adaptativa - {estudiante}",
+            "subtitle": f"Fecha: {datetime.date.today()} | Puntaje final: {puntaje} | {asignar_badge(puntaje)}",
+            "lines": lineas,
+        })
+    return render_pdf_secciones(secciones)
+
+
+def reporte_cohorte_pdf(almacen, cohorte):
+    """
+    Job para la cola de reportes (contenido/reportes.py): un PDF con todos los estudiantes de la cohorte.
+    Lee las respuestas del almacén de progreso dentro del worker, no en la ejecución del script.
+    """
+    niveles = {q["pregunta"]: q["nivel"] for q in preguntas}
+    registros = {}
+    for ev in almacen.respuestas_cohorte(cohorte):
+        respuestas, _ = registros.setdefault(ev["usuario"], ({}, ev["puntaje"]))
+        respuestas[len(respuestas) + 1] = {"pregunta": ev["item"], "nivel": niveles.get(ev["item"], ev["fuente"]), "correcto": bool(ev["correcto"])}
+    return exportar_resultados_pdf_lote(registros)
+
+
 def exportar_resultados_excel(respuestas_usuario, puntaje):
     """Exporta historial de respuestas a Excel (DataFrame)."""
     data = [
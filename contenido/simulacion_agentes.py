@@ -0,0 +1,188 @@
+# contenido/simulacion_agentes.py
+"""
+Simulador de brotes basado en agentes para casos institucionales (sin Streamlit)
+- Estructura de arreglos: estado, temporizador, hogar y aula son arrays NumPy (sin objetos por agente)
+- Red comunitaria en formato CSR (indptr, indices)
+- Cada día se actualiza la población con operaciones vectorizadas: infecciosos por hogar/aula con
+  bincount, miembros de hogares/aulas y vecinos de la red con gather CSR (solo los expuestos se evalúan)
+- Registra infecciones nuevas por entorno (hogar, aula, comunidad) para discutir dónde ocurre la transmisión
+"""
+
+import numpy as np
+import pandas as pd
+
+S, E, I, R, D = 0, 1, 2, 3, 4
+ESTADOS = ["S", "E", "I", "R", "D"]
+ENTORNOS = ["hogar", "aula", "comunidad"]
+
+DEFAULT_PARAMETROS = {
+    "p_hogar": 0.08,        # probabilidad diaria de transmisión por conviviente infeccioso
+    "p_aula": 0.015,        # por compañero infeccioso de aula
+    "p_comunidad": 0.02,    # por contacto infeccioso de la red comunitaria
+    "incubacion": 5.2,      # días medios en E
+    "infeccioso": 7.0,      # días medios en I
+    "letalidad": 0.005,
+}
+
+
+# --------------------------
+# POBLACIÓN
+# --------------------------
+def red_csr(n, grado_medio, rng):
+    """Red aleatoria no dirigida (Erdős–Rényi aproximada) como CSR: (indptr, indices)."""
+    m = int(n * grado_medio / 2)
+    u = rng.integers(0, n, size=m, dtype=np.int64)
+    v = rng.integers(0, n, size=m, dtype=np.int64)
+    distintos = u != v
+    u, v = u[distintos], v[distintos]
+    origen = np.concatenate([u, v])
+    destino = np.concatenate([v, u])
+    orden = np.argsort(origen, kind="stable")
+    indices = destino[orden].astype(np.int32)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origen, minlength=n), out=indptr[1:])
+    return indptr, indices
+
+def crear_poblacion(n, tam_hogar=3.0, tam_aula=30, frac_estudiantes=0.6, grado_comunidad=4.0, semilla=0):
+    """
+    Población institucional como dict de arrays:
+    - hogar: id de hogar (tamaños ~ 1 + Poisson(tam_hogar - 1))
+    - aula: id de aula para estudiantes, -1 para el resto
+    - indptr/indices: red comunitaria CSR
+    """
+    rng = np.random.default_rng(semilla)
+    tamanos = 1 + rng.poisson(tam_hogar - 1, size=int(n / tam_hogar) + 1)
+    while tamanos.sum() < n:        # la suma puede quedar corta: se agregan hogares hasta cubrir n
+        tamanos = np.concatenate([tamanos, 1 + rng.poisson(tam_hogar - 1, size=int((n - tamanos.sum()) / tam_hogar) + 1)])
+    hogar = np.repeat(np.arange(len(tamanos), dtype=np.int32), tamanos)[:n]      # exactamente n: la suma ya cubre n
+    estudiante = rng.random(n) < frac_estudiantes
+    aula = np.full(n, -1, dtype=np.int32)
+    aula[estudiante] = rng.permutation(int(estudiante.sum())) // tam_aula
+    indptr, indices = red_csr(n, grado_comunidad, rng)
+    return {
+        "n": n,
+        "hogar": hogar,
+        "aula": aula,
+        "indptr": indptr,
+        "indices": indices,
+        "n_hogares": int(hogar.max()) + 1,
+        "n_aulas": int(aula.max()) + 1,
+    }
+
+
+# --------------------------
+# TRANSMISIÓN
+# --------------------------
+def segmentos(indptr, valores, filas):
+    """Concatena valores[indptr[f]:indptr[f+1]] para cada f en filas (gather CSR vectorizado)."""
+    inicio = indptr[filas]
+    largos = indptr[filas + 1] - inicio
+    total = int(largos.sum())
+    if total == 0:
+        return valores[:0]
+    # posición de cada elemento: inicio de su segmento + desplazamiento dentro del segmento
+    desplaz = np.arange(total) - np.repeat(np.cumsum(largos) - largos, largos)
+    return valores[np.repeat(inicio, largos) + desplaz]
+
+def grupos_csr(ids, n_grupos):
+    """Miembros de cada grupo (hogar/aula) como CSR: (indptr, agentes ordenados por grupo). ids < 0 se ignoran."""
+    validos = np.flatnonzero(ids >= 0)
+    orden = validos[np.argsort(ids[validos], kind="stable")]
+    indptr = np.zeros(n_grupos + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids[validos], minlength=n_grupos), out=indptr[1:])
+    return indptr, orden.astype(np.int32)
+
+def simular_agentes(poblacion, dias=120, I0=10, parametros=None, cierre_aulas=None, aislamiento=0.0, semilla=0):
+    """
+    Simula el brote día a día.
+    - cierre_aulas: día desde el que no hay transmisión en aulas (None = sin cierre)
+    - aislamiento: fracción de infecciosos aislados (no transmiten fuera del hogar)
+    Solo se evalúan los susceptibles expuestos (convivientes, compañeros de aula o vecinos de un infeccioso),
+    así el costo por día sigue al tamaño del brote y no al de la población.
+    Devuelve (DataFrame diario con S, E, I, R, D y nuevas infecciones por entorno, estado final).
+    """
+    p = dict(DEFAULT_PARAMETROS, **(parametros or {}))
+    rng = np.random.default_rng(semilla)
+    n = poblacion["n"]
+    hogar, aula = poblacion["hogar"], poblacion["aula"]
+    hogares = grupos_csr(hogar, poblacion["n_hogares"])
+    aulas = grupos_csr(aula, poblacion["n_aulas"])
+    tasa = -np.log1p(-np.array([p["p_hogar"], p["p_aula"], p["p_comunidad"]]))   # riesgo por contacto infeccioso
+    estado = np.zeros(n, dtype=np.int8)
+    temporizador = np.zeros(n, dtype=np.int16)
+    aislado = np.zeros(n, dtype=bool)
+    conteo = np.array([n, 0, 0, 0, 0], dtype=np.int64)
+
+    def pasar_a(idx, nuevo, media=None):
+        np.add.at(conteo, estado[idx], -1)
+        estado[idx] = nuevo
+        conteo[nuevo] += len(idx)
+        if media is not None:
+            temporizador[idx] = rng.geometric(1 / media, size=len(idx))
+
+    pasar_a(rng.choice(n, size=min(I0, n), replace=False), I, p["infeccioso"])
+    infecciosos = np.flatnonzero(estado == I)
+    aislado[infecciosos] = rng.random(len(infecciosos)) < aislamiento
+    activos = infecciosos                       # agentes en E o I (los únicos con temporizador)
+
+    filas = []
+    for dia in range(dias):
+        infecciosos = activos[estado[activos] == I]
+        transmiten = infecciosos[~aislado[infecciosos]]
+        aulas_abiertas = (cierre_aulas is None or dia < cierre_aulas) and poblacion["n_aulas"] > 0
+        # infecciosos por grupo (bincount) y contactos expuestos (gather CSR de miembros y vecinos)
+        k_hogar = np.bincount(hogar[infecciosos], minlength=poblacion["n_hogares"])
+        expuestos = [segmentos(hogares[0], hogares[1], np.flatnonzero(k_hogar))]
+        if aulas_abiertas:
+            en_aula = transmiten[aula[transmiten] >= 0]
+            k_aula = np.bincount(aula[en_aula], minlength=poblacion["n_aulas"])
+            expuestos.append(segmentos(aulas[0], aulas[1], np.flatnonzero(k_aula)))
+        vecinos = segmentos(poblacion["indptr"], poblacion["indices"], transmiten)
+        marca = np.zeros(n, dtype=bool)
+        for grupo in expuestos + [vecinos]:
+            marca[grupo] = True
+        candidatos = np.flatnonzero(marca & (estado == S))
+        k_com = np.bincount(vecinos, minlength=n)[candidatos] if len(vecinos) else np.zeros(len(candidatos), dtype=np.int64)
+
+        # riesgos por entorno (hazards) y probabilidad total de infección
+        h = np.zeros((3, len(candidatos)))
+        h[0] = tasa[0] * k_hogar[hogar[candidatos]]
+        if aulas_abiertas:
+            c_aula = aula[candidatos]
+            h[1] = tasa[1] * np.where(c_aula >= 0, k_aula[np.maximum(c_aula, 0)], 0)
+        h[2] = tasa[2] * k_com
+        total = h.sum(axis=0)
+        infectado = rng.random(len(candidatos)) < -np.expm1(-total)
+        nuevos = candidatos[infectado]
+        # entorno de cada infección: proporcional a su riesgo
+        if len(nuevos):
+            acum = np.cumsum(h[:, infectado], axis=0) / total[infectado]
+            por_entorno = np.bincount((rng.random(len(nuevos)) > acum).sum(axis=0), minlength=3)
+        else:
+            por_entorno = np.zeros(3, dtype=np.int64)
+
+        # progresión: temporizadores de E/I que vencen hoy
+        temporizador[activos] -= 1
+        vence = activos[temporizador[activos] <= 0]
+        a_infeccioso = vence[estado[vence] == E]
+        a_resuelto = vence[estado[vence] == I]
+        pasar_a(a_infeccioso, I, p["infeccioso"])
+        aislado[a_infeccioso] = rng.random(len(a_infeccioso)) < aislamiento
+        muere = rng.random(len(a_resuelto)) < p["letalidad"]
+        pasar_a(a_resuelto[~muere], R)
+        pasar_a(a_resuelto[muere], D)
+        pasar_a(nuevos, E, p["incubacion"])
+        activos = np.concatenate([activos[(estado[activos] == E) | (estado[activos] == I)], nuevos])
+
+        filas.append([dia, *conteo, *por_entorno])
+    df = pd.DataFrame(filas, columns=["day", *ESTADOS, *[f"nuevas_{e}" for e in ENTORNOS]])
+    return df, {"estado": estado, "temporizador": temporizador, "aislado": aislado}
+
+def tasa_ataque_por_grupo(poblacion, estado):
+    """Tasa de ataque (fracción alguna vez infectada) en estudiantes y no estudiantes."""
+    infectado = estado != S
+    estudiante = poblacion["aula"] >= 0
+    return {
+        "estudiantes": float(infectado[estudiante].mean()) if estudiante.any() else 0.0,
+        "otros": float(infectado[~estudiante].mean()) if (~estudiante).any() else 0.0,
+    }
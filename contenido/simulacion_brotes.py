@@ -4,10 +4,12 @@ Módulo PRO: Simulación de Brotes (Integrado)
 - WHO DONs (RSS)
 - Mapas interactivos (folium / plotly)
 - SEIR simplificado + intervención (escenario comparador)
-- Casos ramificados, roles y decisiones
-- Videos interactivos + preguntas
-- Export PDF / Excel
+- Casos ramificados (cadenas de transmisión + rastreo), roles y decisiones (puntaje persistido en contenido/almacen_progreso.py)
+- Videos interactivos (miniatura; el reproductor se carga al hacer clic) + preguntas
+- Export PDF / Excel (diferido, vía cola de reportes)
 - Alertas: nuevos DONs hoy
+- Modo offline: instantánea local de DONs + OWID (contenido/instantaneas.py)
+- Series largas (SEIR, OWID): submuestreo en el servidor al ancho del gráfico + plotly WebGL, más detalle al ampliar (contenido/submuestreo.py)
 """
 
 import streamlit as st
@@ -20,6 +22,23 @@ import datetime
 import json
 import math
 from io import BytesIO
+from matplotlib.figure import Figure
+
+from .reportes import huella, render_pdf_secciones, descarga_diferida
+from .exportacion import exportar_bytes, elegir_formato, contar_filas, MIME, nombres_unicos
+from .trazas import span, trazar
+from .modelos_seir import seir_modelo, a_dataframe, tabla_resumen, resumen_escenarios, METODOS
+from .sustituto_seir import SustitutoSEIR
+from .continuacion_seir import ContinuacionSEIR
+from .submuestreo import submuestrear, solapa, PUNTOS_DEFAULT
+from .seir_edades import seir_edades_lotes, poblacion_por_edad, cierre_escuelas, proteccion_mayores, GRUPOS as GRUPOS_EDAD
+from .simulacion_agentes import crear_poblacion, simular_agentes, tasa_ataque_por_grupo
+from .procesos_ramificacion import simular_cadenas, probabilidad_extincion, resumen_cadenas, incidencia_cadenas
+from .registro_casos import RegistroCasos
+from .multimedia import video_diferido
+from .instantaneas import cargar_instantanea, modo_datos
+from .arboles_decision import compilar_arbol, precomputar_trayectorias, nodo_actual
+from .almacen_progreso import obtener_almacen, identidad_sesion
 
 # Optional dependencies with safe fallbacks
 try:
@@ -42,7 +61,7 @@ except Exception:
     STREAMLIT_FOLIUM_AVAILABLE = False
 
 try:
-    import plotly.express as px
+    import plotly.graph_objects as go
     PLOTLY_AVAILABLE = True
 except Exception:
     PLOTLY_AVAILABLE = False
@@ -67,6 +86,7 @@ DEFAULT_SERIAL_INTERVAL_DAYS = 4.0
 # --------------------------
 # UTILIDADES
 # --------------------------
+@trazar()
 @st.cache_data(show_spinner=False)
 def fetch_who_dons():
     """Descarga WHO DONs via RSS (fallback si feedparser no está)."""
@@ -83,6 +103,7 @@ def fetch_who_dons():
         })
     return entries, None
 
+@trazar()
 @st.cache_data(show_spinner=False)
 def fetch_owid_sample(nrows=2000):
     """Descarga una porción OWID como ejemplo (puede tardar)."""
@@ -92,7 +113,48 @@ def fetch_owid_sample(nrows=2000):
     except Exception as e:
         return None
 
-def seir_simulate(N, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, fatality=0.01, interventions=None):
+@st.cache_resource(show_spinner=False)
+def instantanea_local():
+    """Offline bundle (contenido/instantanea), memory-mapped once per process; None if absent."""
+    return cargar_instantanea()
+
+def _origen_instantanea(snap):
+    return f"instantánea offline del {snap['manifest']['creado'][:10]}"
+
+def obtener_dons():
+    """(entries, err, origen): live feed unless disabled, falling back to the offline snapshot."""
+    modo = modo_datos()
+    entries, err = None, None
+    if modo != "instantanea":
+        entries, err = fetch_who_dons() if FEEDPARSER_AVAILABLE else (None, "feedparser no instalado")
+        if entries:
+            return entries, None, "en vivo"
+    if modo != "vivo":
+        snap = instantanea_local()
+        if snap and snap["dons"]:
+            return snap["dons"], None, _origen_instantanea(snap)
+    return entries, err, None
+
+def obtener_owid():
+    """(df, origen) with the same live/snapshot policy as obtener_dons."""
+    modo = modo_datos()
+    if modo != "instantanea":
+        df = fetch_owid_sample()
+        if df is not None:
+            return df, "en vivo"
+    if modo != "vivo":
+        snap = instantanea_local()
+        if snap is not None and len(snap["owid"]):
+            return snap["owid"], _origen_instantanea(snap)
+    return None, None
+
+@st.cache_resource(show_spinner=False)
+def obtener_continuacion():
+    """Checkpointed trajectories shared by all sessions: edits to interventions/days only recompute the changed suffix."""
+    return ContinuacionSEIR()
+
+@trazar()
+def seir_simulate(N, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, fatality=0.01, interventions=None, metodo="euler"):
     """
     Simulador SEIR determinista con posibilidad de intervención (reduce beta).
     - N: population
@@ -104,48 +166,85 @@ def seir_simulate(N, I0, E0, R0_value, days, sigma=1/5.2, gamma=1/7, fatality=0.
     - gamma: 1/infectious period
     - fatality: IFR (proportion)
     - interventions: list of tuples (day_start, reduction_factor) e.g. (10, 0.5) reduces beta by 50% from day 10
+    - metodo: "euler" (fixed 1-day step, fast) or "RK45"/"LSODA" (adaptive solve_ivp, accurate at high R0)
     Returns DataFrame with S,E,I,R,new_infections,deaths
+    Resumes from the latest checkpoint of an earlier run with the same base parameters (see contenido/continuacion_seir.py).
     """
-    dt = 1.0
-    beta = R0_value * gamma  # initial transmission rate
-    S = N - I0 - E0
-    E = E0
-    I = I0
-    R = 0.0
-    results = []
-    for t in range(days):
-        # apply interventions
-        effective_beta = beta
-        if interventions:
-            for (start_day, reduction) in interventions:
-                if t >= start_day:
-                    effective_beta = effective_beta * (1 - reduction)
-        # SEIR equations
-        new_exposed = (effective_beta * I * S / N) * dt
-        new_infectious = sigma * E * dt
-        new_recovered = gamma * I * dt
-        # deaths as proportion of new_recovered * fatality (approx)
-        new_deaths = new_recovered * fatality
-
-        S = max(0, S - new_exposed)
-        E = max(0, E + new_exposed - new_infectious)
-        I = max(0, I + new_infectious - new_recovered)
-        R = max(0, R + new_recovered - new_deaths)
-
-        results.append({
-            "day": t,
-            "S": S,
-            "E": E,
-            "I": I,
-            "R": R,
-            "new_infections": new_exposed,
-            "new_recovered": new_recovered,
-            "new_deaths": new_deaths,
-            "beta": effective_beta
-        })
-    df = pd.DataFrame(results)
-    df["date"] = pd.Timestamp.today().normalize() + pd.to_timedelta(df["day"], unit="D")
-    return df
+    resultado = obtener_continuacion().simular(N, I0, E0, R0_value, days, sigma=sigma, gamma=gamma, fatality=fatality,
+                                               interventions_list=[interventions], metodo=metodo)
+    return a_dataframe(resultado)
+
+@trazar()
+def seir_escenarios(N, I0, E0, escenarios, days, sigma=1/5.2, gamma=1/7, metodo="euler"):
+    """
+    Runs every named scenario in one vectorized pass (euler) or one adaptive integration each (RK45/LSODA).
+    - escenarios: list of dicts {"nombre", "R0", "fatality", "interventions"}
+    Returns the seir_lotes result (arrays of shape (n_scenarios, days)); each scenario resumes from its own checkpoint.
+    """
+    return obtener_continuacion().simular(
+        N, I0, E0, [e["R0"] for e in escenarios], days, sigma=sigma, gamma=gamma,
+        fatality=[e["fatality"] for e in escenarios],
+        interventions_list=[e["interventions"] for e in escenarios], metodo=metodo,
+    )
+
+@st.cache_resource(show_spinner="Precomputando la grilla de vista previa SEIR…")
+def obtener_sustituto():
+    """SEIR surrogate shared by all sessions (build artifact if present, otherwise built once at startup)."""
+    return SustitutoSEIR.cargar_o_construir()
+
+def vista_previa_seir(N, I0, E0, R0_value, fatality, days, metodo="euler"):
+    """
+    Instant preview for slider moves: surrogate lookup (euler model, sub-millisecond) or,
+    outside the precomputed grid / for adaptive integrators, one exact run.
+    Returns dict with I curve, peak_I, peak_day, attack_rate, total_deaths and "fuente".
+    """
+    previa = obtener_sustituto().consultar(N, I0, E0, R0_value, days, fatality) if metodo == "euler" else None
+    if previa is not None:
+        return dict(previa, fuente="sustituto")
+    resultado = seir_modelo(N, I0, E0, R0_value, days, fatality=fatality, metodo=metodo)
+    m = resumen_escenarios(resultado)
+    return {"I": resultado["I"][0], "peak_I": float(m["peak_I"][0]), "peak_day": int(m["peak_day"][0]),
+            "attack_rate": float(m["total_infections"][0] / N), "total_deaths": float(m["total_deaths"][0]), "fuente": "exacto"}
+
+@trazar()
+def seir_por_edades(N, I0, E0, R0_value, days, escenarios):
+    """Age-structured SEIR for a list of intervention lists (see seir_edades); N is split with the default pyramid."""
+    return seir_edades_lotes(poblacion_por_edad(N), I0, E0, R0_value, days, escenarios=escenarios)
+
+@st.cache_resource(show_spinner=False)
+def poblacion_institucional(n, semilla=0):
+    """Agent population (households, classrooms, CSR community network); read-only, shared across sessions."""
+    return crear_poblacion(n, semilla=semilla)
+
+@trazar()
+def simular_institucion(n, dias, I0, cierre_aulas=None, aislamiento=0.0, semilla=0):
+    df, final = simular_agentes(poblacion_institucional(n, semilla), dias, I0=I0, cierre_aulas=cierre_aulas, aislamiento=aislamiento, semilla=semilla)
+    return df, tasa_ataque_por_grupo(poblacion_institucional(n, semilla), final["estado"])
+
+@trazar()
+@st.cache_data(show_spinner=False)
+def cadenas_transmision(R, k, rastreo, eficacia, n_cadenas=100_000, n_muestras=30):
+    """Branching-process summary for the UI: chain outcomes, analytic extinction and sampled incidence curves."""
+    resultado = simular_cadenas(n_cadenas, R, k, rastreo=rastreo, eficacia=eficacia)
+    return {
+        "resumen": resumen_cadenas(resultado),
+        "q_analitica": probabilidad_extincion(R, k, rastreo=rastreo, eficacia=eficacia),
+        "tamanos": resultado["tamano"][resultado["extinguida"]],
+        "curvas": incidencia_cadenas(n_muestras, R, k, rastreo=rastreo, eficacia=eficacia),
+    }
+
+@trazar()
+def risk_grid(center_lat, center_lon, R0_value, mobility, n=25, span=0.03):
+    """Grid of points around cluster center with risk = base * exp(R0*mob); base decays with distance from center."""
+    lats = np.linspace(center_lat-span, center_lat+span, n)
+    lons = np.linspace(center_lon-span, center_lon+span, n)
+    risk = np.zeros((n,n))
+    for i,lat in enumerate(lats):
+        for j,lon in enumerate(lons):
+            dist = math.hypot(lat - center_lat, lon - center_lon)
+            base = math.exp(-dist*50)
+            risk[i,j] = base * math.exp(R0_value*mobility/2)
+    return risk
 
 def fig_to_bytes(fig, fmt="png"):
     buf = BytesIO()
@@ -155,98 +254,150 @@ def fig_to_bytes(fig, fmt="png"):
 
 def create_pdf_report(title, subtitle, text_lines, fig_bytes_list):
     """Crea PDF con texto y figuras (usa reportlab)."""
-    if not REPORTLAB_AVAILABLE:
-        return None
-    buf = BytesIO()
-    c = canvas.Canvas(buf, pagesize=letter)
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(40, 760, title)
-    c.setFont("Helvetica", 10)
-    c.drawString(40, 745, subtitle)
-    y = 720
-    for ln in text_lines:
-        c.drawString(40, y, ln)
-        y -= 12
-        if y < 120:
-            c.showPage()
-            y = 760
-    for fb in fig_bytes_list:
-        try:
-            img = ImageReader(BytesIO(fb))
-            c.drawImage(img, 40, 320, width=520, height=320)
-            c.showPage()
-        except Exception:
-            pass
-    c.save()
-    buf.seek(0)
-    return buf.getvalue()
+    return render_pdf_secciones([{"title": title, "subtitle": subtitle, "lines": text_lines, "figs": fig_bytes_list}])
+
+def series_png(x, series, title="", ylabel="", figsize=(9,4)):
+    """PNG de series de línea; usa Figure (no pyplot) para poder renderizar en los workers de la cola."""
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    for label, y in series.items():
+        ax.plot(x, y, label=label)
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    ax.legend()
+    return fig_to_bytes(fig)
+
+def serie_interactiva(x, series, key, titulo="", ylabel="", puntos=PUNTOS_DEFAULT, height=380):
+    """
+    Long time series with a bounded payload: every trace is reduced server-side (MinMax + LTTB) to ~`puntos`
+    inside the visible window. Box-selecting a range (drag on the chart) re-queries that window at full
+    resolution; "Restablecer zoom" returns to the whole series.
+    Plotly Scattergl (WebGL) when available, otherwise matplotlib with the same reduced points.
+    """
+    clave_rango = f"{key}_rango"
+    rango = st.session_state.get(clave_rango)
+    if rango is not None and not solapa(x, rango):
+        # window left over from an earlier run (other dates / length): back to the whole series
+        st.session_state.pop(clave_rango, None)
+        rango = None
+    trazas = submuestrear(x, series, puntos, rango)
+    if not PLOTLY_AVAILABLE:
+        fig, ax = plt.subplots(figsize=(9,4))
+        for nombre, (xs, ys) in trazas.items():
+            ax.plot(xs, ys, label=nombre)
+        ax.set_title(titulo); ax.set_ylabel(ylabel)
+        ax.legend(fontsize=8)
+        st.pyplot(fig)
+    else:
+        fig = go.Figure([go.Scattergl(x=xs, y=ys, mode="lines", name=nombre) for nombre, (xs, ys) in trazas.items()])
+        fig.update_layout(title=titulo, yaxis_title=ylabel, height=height, dragmode="select", selectdirection="h",
+                          margin=dict(l=10, r=10, t=40 if titulo else 10, b=10), legend=dict(font=dict(size=10)))
+        if rango is not None:
+            fig.update_xaxes(range=list(rango))
+        evento = st.plotly_chart(fig, use_container_width=True, key=key, on_select="rerun", selection_mode="box")
+        cajas = (evento.selection.get("box") or []) if evento else []
+        if cajas and cajas[0].get("x"):
+            nuevo = tuple(sorted(cajas[0]["x"]))
+            if nuevo != rango:
+                st.session_state[clave_rango] = nuevo
+                st.rerun()
+    total = len(x) * len(series)
+    enviados = sum(len(xs) for xs, _ in trazas.values())
+    col1, col2 = st.columns([4, 1])
+    col1.caption(f"{enviados:,} de {total:,} puntos enviados" + (f" · ventana {rango[0]} → {rango[1]}" if rango else "")
+                 + (" · arrastra sobre el gráfico para ampliar un tramo" if PLOTLY_AVAILABLE else ""))
+    if rango is not None and col2.button("Restablecer zoom", key=f"{key}_reset"):
+        st.session_state.pop(clave_rango, None)
+        st.rerun()
+
+def pdf_series_report(title, subtitle, text_lines, x, series, ylabel=""):
+    """Reporte PDF de una figura de series; pensado para encolarse (renderiza la figura en el worker)."""
+    return create_pdf_report(title, subtitle, text_lines, [series_png(x, series, title=title, ylabel=ylabel)])
+
+def reporte_lote_casos(registro, case_ids, days=120):
+    """Un único PDF consolidado con la simulación baseline de cada caso (los documentos se leen aquí, en el worker)."""
+    secciones = []
+    for cid in case_ids:
+        case = registro.detalle(cid)
+        init = case["init"]
+        df = seir_simulate(case["population"], init["I0"], init["E0"], init["R0"], days=days, fatality=init.get("fatality",0.01))
+        peak_idx = df["I"].idxmax()
+        secciones.append({
+            "title": case["title"],
+            "subtitle": f"N={case['population']}, R0={init['R0']}, IFR={init.get('fatality',0.01)}",
+            "lines": [
+                case.get("description", "")[:110],
+                f"Pico de infectados: {int(df.loc[peak_idx, 'I'])} (día {int(df.loc[peak_idx, 'day'])})",
+                f"Muertes acumuladas a {days} días: {int(df['new_deaths'].sum())}",
+                "Tags: " + ", ".join(case.get("tags", [])),
+            ],
+            "figs": [series_png(df["date"], {"Infectados": df["I"], "Muertes acumuladas": df["new_deaths"].cumsum()}, title=case["title"])],
+        })
+    return render_pdf_secciones(secciones)
+
+def descarga_tabular(etiqueta, hojas, file_stem, key):
+    """Descarga diferida de tablas; el formato (Excel/Parquet/CSV) se elige por tamaño o por el usuario."""
+    opciones = ["auto", "xlsx", "parquet", "csv"]
+    formato = st.selectbox("Formato de exportación", opciones, key=f"{key}_fmt", format_func=lambda f: "Automático (según tamaño)" if f == "auto" else f.upper())
+    if formato == "auto":
+        formato = elegir_formato(contar_filas(hojas))
+    clave = huella(formato, *hojas.keys(), *hojas.values())
+    descarga_diferida(f"{etiqueta} ({formato.upper()})", clave, exportar_bytes, args=(hojas, formato), file_name=f"{file_stem}.{formato}", mime=MIME[formato], key=f"{key}_{formato}")
 
 # --------------------------
 # BANCO DE CASOS (históricos + ficticios)
 # --------------------------
-# Cases include: id, title, description, video (optional), timeline (list of events), initial conditions for SEIR
-CASES = [
-    {
-        "id":"cholera_haiti",
-        "title":"Cólera - Haití (2010) - Caso histórico",
-        "description":"Brote de cólera post-huracán con rápida transmisión por agua contaminada. Lecciones: acceso a agua segura y tratamiento de deshidratación.",
-        "video":"https://www.youtube.com/watch?v=tVcmFSF9N6E",  # ejemplo
-        "population":100000,
-        "init": {"I0":10, "E0":0, "R0":2.0, "fatality":0.01},
-        "timeline":[
-            {"date":"2010-10-01","event":"Primeros casos reportados"},
-            {"date":"2010-10-05","event":"Aumento semanal del 300%"}
-        ],
-        "tags":["cholera","waterborne","historical"]
-    },
-    {
-        "id":"ebola_west_africa",
-        "title":"Ébola - África Occidental (2014) - Caso histórico",
-        "description":"Brote de Ébola con alta letalidad y transmisión por contacto. Lecciones: aislamiento, rastreo de contactos, confianza comunitaria.",
-        "video":"https://www.youtube.com/watch?v=a8dIqXYxYLA",
-        "population":500000,
-        "init": {"I0":5, "E0":2, "R0":1.8, "fatality":0.4},
-        "timeline":[],
-        "tags":["ebola","hemorrhagic","historical"]
-    },
-    {
-        "id":"dengue_municipio",
-        "title":"Dengue - Municipio costero (Simulado)",
-        "description":"Aumento de casos febriles con signos sugestivos de dengue. Enfoque en vigilancia entomológica y control vectorial.",
-        "video":"https://www.youtube.com/watch?v=UDni_A0cLpM",
-        "population":50000,
-        "init": {"I0":8, "E0":5, "R0":2.5, "fatality":0.005},
-        "timeline":[],
-        "tags":["dengue","vectorborne","simulation"]
-    },
-    {
-        "id":"covid_university",
-        "title":"COVID-19 - Brote en Universidad (Simulado)",
-        "description":"Surtido de casos en campus universitario. Rápida toma de decisiones sobre aislamiento y clases.",
-        "video":"https://www.youtube.com/watch?v=RGhn-fW2424",
-        "population":20000,
-        "init": {"I0":15, "E0":10, "R0":2.1, "fatality":0.005},
-        "timeline":[],
-        "tags":["covid","institution","simulation"]
-    }
-]
+# Cases live in contenido/casos/*.yaml|json (one file per case): id, title, description, video (optional),
+# timeline (list of events), tags, initial conditions for SEIR and optional decision_tree
+@st.cache_resource(show_spinner=False)
+def _registro_casos():
+    return RegistroCasos()
+
+def obtener_registro():
+    """Shared case registry (contenido/casos); new or edited files are picked up on the next rerun."""
+    return _registro_casos().actualizar()
 
 # --------------------------
 # ROLE-BASED DECISION TREE (simple)
 # --------------------------
 DECISION_TREES = {
-    # Each node: text, options => next node id or effect (function)
+    # Each node: text, options => effect (score, intervention) and optional next node id; compiled by arboles_decision
+    "triage_general": {
+        "start":{
+            "text":"Decisión 1: ¿Cuál es tu primera acción?",
+            "options":[
+                {"label":"Notificar a autoridad y activar vigilancia", "effect":{"score":15,"intervention":(3,0.5)}, "feedback":"✅ Correcto — activa vigilancia y rastreo."},
+                {"label":"Esperar confirmación laboratorio", "effect":{"score":-5,"intervention":None}, "feedback":"⚠️ La espera puede costar tiempo."},
+                {"label":"Implementar control inmediato (mass interventions)", "effect":{"score":5,"intervention":(1,0.6)}, "feedback":"Intervención agresiva registrada — evaluar costo/beneficio."}
+            ]
+        }
+    },
     "dengue_response": {
         "start":{
             "text":"Se detectan 20 casos febriles. ¿Qué haces primero?",
             "options":[
-                {"label":"Notificar INS y buscar casos", "effect":{"score":10,"intervention":(3,0.4)}},
-                {"label":"Iniciar fumigación masiva sin investigar", "effect":{"score":-5,"intervention":(7,0.1)}},
-                {"label":"Esperar resultados de laboratorio", "effect":{"score":-10,"intervention":None}}
+                {"label":"Notificar INS y buscar casos", "effect":{"score":10,"intervention":(3,0.4)}, "next":"control_vectorial"},
+                {"label":"Iniciar fumigación masiva sin investigar", "effect":{"score":-5,"intervention":(7,0.1)}, "next":"control_vectorial"},
+                {"label":"Esperar resultados de laboratorio", "effect":{"score":-10,"intervention":None}, "next":"control_vectorial"}
+            ]
+        },
+        "control_vectorial":{
+            "text":"Se confirma dengue. ¿Qué medida de control priorizas?",
+            "options":[
+                {"label":"Eliminación de criaderos con la comunidad", "effect":{"score":10,"intervention":(10,0.3)}},
+                {"label":"Fumigación focalizada alrededor de casos", "effect":{"score":5,"intervention":(8,0.15)}},
+                {"label":"Solo tratamiento clínico de casos", "effect":{"score":-5,"intervention":None}}
             ]
         }
     }
 }
+DEFAULT_DECISION_TREE = "triage_general"
+
+@st.cache_data(show_spinner=False)
+def decision_tree_paths(tree_id, population, init, days=120):
+    """Compiled tree + precomputed SEIR trajectory for every reachable decision path (one batched run)."""
+    grafo = compilar_arbol(DECISION_TREES[tree_id])
+    return grafo, precomputar_trayectorias(grafo, population, init, days=days)
 
 # --------------------------
 # APP UI
@@ -262,11 +413,11 @@ def app():
     st.sidebar.markdown("---")
     st.sidebar.markdown("🔔 Alertas WHO DONs")
     # Fetch WHO DONs
-    entries, err = (None, None)
-    if FEEDPARSER_AVAILABLE:
-        entries, err = fetch_who_dons()
-    else:
+    entries, err, origen_dons = obtener_dons()
+    if not FEEDPARSER_AVAILABLE and origen_dons is None:
         st.sidebar.info("Instala feedparser para alertas WHO DONs (feedparser).")
+    if origen_dons and origen_dons != "en vivo":
+        st.sidebar.caption(f"📦 DONs desde {origen_dons}")
 
     # Show headlines and mark new today
     if entries:
@@ -303,12 +454,13 @@ def app():
     # --------------------------
     # TAB 1: Datos en tiempo real (WHO DONs + OWID sample)
     # --------------------------
-    with tab_data:
+    with tab_data, span("tab datos"):
         st.header("📡 Datos en tiempo real")
         st.markdown("Conexión WHO Disease Outbreak News (DONs) y dataset OWID (ejemplo).")
         # WHO DONs list
         if entries:
             st.subheader("WHO Disease Outbreak News (últimos)")
+            st.caption(f"Fuente: {origen_dons}")
             for e in entries[:10]:
                 st.markdown(f"**[{e['title']}]({e['link']})**  \n_{e.get('published','')}_")
                 st.write(e.get("summary","")[:300] + "...")
@@ -316,26 +468,27 @@ def app():
             st.info("No se pudieron obtener DONs. Instala feedparser o revisa conexión.")
         # OWID sample
         st.subheader("Our World in Data (muestra)")
-        df_owid = fetch_owid_sample()
+        df_owid, origen_owid = obtener_owid()
         if df_owid is not None:
             # interactive preview and country selector
             st.write("Preview OWID (COVID example).")
+            st.caption(f"Fuente: {origen_owid}")
             st.dataframe(df_owid.iloc[:100][["location","date","new_cases"]].head(100))
             if PLOTLY_AVAILABLE:
                 country_choices = sorted(df_owid["location"].unique().tolist())
                 country = st.selectbox("Selecciona país (OWID sample)", country_choices, index=country_choices.index("Colombia") if "Colombia" in country_choices else 0)
-                df_ctry = df_owid[df_owid["location"]==country].copy()
-                fig = px.line(df_ctry, x="date", y="new_cases", title=f"Serie new_cases - {country}")
-                st.plotly_chart(fig, use_container_width=True)
+                df_ctry = df_owid[df_owid["location"]==country].sort_values("date")
+                serie_interactiva(df_ctry["date"], {"new_cases": df_ctry["new_cases"]}, key=f"owid_{country}", titulo=f"Serie new_cases - {country}")
             else:
-                st.line_chart(df_owid.groupby("date")["new_cases"].sum().fillna(0))
+                total = df_owid.groupby("date")["new_cases"].sum().fillna(0)
+                serie_interactiva(total.index, {"new_cases (total)": total.to_numpy()}, key="owid_total")
         else:
-            st.info("OWID no disponible (conexión fallida). Puedes subir CSV.")
+            st.info("OWID no disponible (conexión fallida y sin instantánea offline: python -m contenido.instantaneas). Puedes subir CSV.")
 
     # --------------------------
     # TAB 2: Mapas & Heatmap
     # --------------------------
-    with tab_map:
+    with tab_map, span("tab mapas"):
         st.header("🌍 Mapas Interactivos")
         st.markdown("Mapa global demo + heatmap simulado según casos y R0.")
         # allow user to pick a case population center set
@@ -360,16 +513,7 @@ def app():
         st.subheader("Simulación rápida: heatmap por R0 + movilidad")
         R0_user = st.slider("R0 (transmisibilidad)", 0.5, 4.0, 1.8, 0.1)
         mobility = st.slider("Movilidad (0 bajo - 1 alto)", 0.0, 1.0, 0.5, 0.05)
-        # create grid of points around cluster center and compute risk = base * exp(R0*mob)
-        lats = np.linspace(cluster["lat"]-0.03, cluster["lat"]+0.03, 25)
-        lons = np.linspace(cluster["lon"]-0.03, cluster["lon"]+0.03, 25)
-        risk = np.zeros((25,25))
-        for i,lat in enumerate(lats):
-            for j,lon in enumerate(lons):
-                # base risk decays with distance from center
-                dist = math.hypot(lat - cluster["lat"], lon - cluster["lon"])
-                base = math.exp(-dist*50)
-                risk[i,j] = base * math.exp(R0_user*mobility/2)
+        risk = risk_grid(cluster["lat"], cluster["lon"], R0_user, mobility)
         # show heatmap via matplotlib
         fig, ax = plt.subplots(figsize=(6,4))
         im = ax.imshow(risk, cmap="hot", origin="lower")
@@ -380,7 +524,7 @@ def app():
     # --------------------------
     # TAB 3: SEIR Simulation (comparador de intervenciones)
     # --------------------------
-    with tab_sim:
+    with tab_sim, span("tab SEIR"):
         st.header("🎲 Simulación SEIR avanzada")
         st.markdown("Configura R0, letalidad e intervenciones. Compara escenarios lado a lado.")
         # baseline inputs
@@ -390,6 +534,18 @@ def app():
         R0_val = st.slider("R0 (baseline)", 0.5, 5.0, 2.2, 0.1)
         fatality = st.slider("Fracción fatalidad (IFR)", 0.0, 0.5, 0.01, 0.001)
         days = st.slider("Días a simular", 30, 365, 120)
+        metodo = st.selectbox("Integrador", METODOS, format_func=lambda m: {"euler": "Euler, paso fijo de 1 día (rápido)", "RK45": "RK45 adaptativo (preciso)", "LSODA": "LSODA adaptativo (preciso, rígido)"}[m], key="seir_metodo")
+
+        # live baseline preview: answers every slider move without pressing "Simular escenarios"
+        previa = vista_previa_seir(population, I0, E0, R0_val, fatality, days, metodo)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Pico de infectados", f"{previa['peak_I']:,.0f}")
+        col2.metric("Día del pico", previa["peak_day"])
+        col3.metric("Tasa de ataque", f"{previa['attack_rate']:.1%}")
+        col4.metric("Muertes", f"{previa['total_deaths']:,.0f}")
+        st.line_chart(pd.DataFrame({"I (vista previa, baseline)": previa["I"]}), height=200)
+        st.caption("Vista previa: sustituto precomputado (interpolado, error típico ~1-3 %)." if previa["fuente"] == "sustituto"
+                   else "Vista previa: ejecución exacta (parámetros fuera de la grilla precomputada o integrador adaptativo).")
 
         # interventions definition UI
         st.markdown("Define intervenciones (reducción relativa de transmisión a partir del día X).")
@@ -406,57 +562,178 @@ def app():
         if session_int:
             st.write("Intervenciones guardadas:", session_int)
 
-        # compare scenarios: baseline vs interventions
+        # scenario manager: each row is a named scenario with its own R0, IFR and one intervention
+        st.markdown("Escenarios adicionales (agrega filas; se simulan todos juntos en una sola pasada).")
+        escenarios_df = st.data_editor(
+            pd.DataFrame([{"nombre": "Cierre temprano", "R0": R0_val, "IFR": fatality, "dia_inicio": 10, "reduccion_pct": 50}]),
+            num_rows="dynamic", use_container_width=True, key="seir_escenarios",
+            column_config={
+                "R0": st.column_config.NumberColumn(min_value=0.5, max_value=5.0, step=0.1),
+                "IFR": st.column_config.NumberColumn(min_value=0.0, max_value=0.5, step=0.001, format="%.3f"),
+                "dia_inicio": st.column_config.NumberColumn(min_value=0, step=1),
+                "reduccion_pct": st.column_config.NumberColumn(min_value=0, max_value=100, step=1),
+            },
+        )
+
+        # compare scenarios: baseline, saved interventions and every editor row
         if st.button("Simular escenarios"):
-            # baseline
-            df_baseline = seir_simulate(population, I0, E0, R0_val, days, fatality=fatality, interventions=None)
-            # with interventions from session
-            df_int = seir_simulate(population, I0, E0, R0_val, days, fatality=fatality, interventions=session_int)
-            # plot comparison
-            fig, ax = plt.subplots(figsize=(9,4))
-            ax.plot(df_baseline["date"], df_baseline["I"], label="I - baseline")
-            ax.plot(df_int["date"], df_int["I"], label="I - con intervenciones")
-            ax.set_ylabel("Número infectados (I)")
-            ax.set_xlabel("Fecha")
-            ax.legend()
-            st.pyplot(fig)
-            # metrics: peak I and day
-            peak_b = df_baseline["I"].max(); day_b = df_baseline.loc[df_baseline["I"].idxmax(), "date"]
-            peak_i = df_int["I"].max(); day_i = df_int.loc[df_int["I"].idxmax(), "date"]
-            st.metric("Peak baseline (I)", f"{int(peak_b)} on {pd.to_datetime(day_b).date()}")
-            st.metric("Peak with interventions (I)", f"{int(peak_i)} on {pd.to_datetime(day_i).date()}")
-            # enable export
-            buf_xl = BytesIO()
-            with pd.ExcelWriter(buf_xl, engine="openpyxl") as writer:
-                df_baseline.to_excel(writer, sheet_name="baseline", index=False)
-                df_int.to_excel(writer, sheet_name="interventions", index=False)
-            buf_xl.seek(0)
-            st.download_button("⬇️ Descargar datos (Excel)", data=buf_xl, file_name="seir_compare.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-            # pdf with figs
-            fig_bytes = fig_to_bytes(fig)
-            pdf_bytes = create_pdf_report(f"SEIR simulation - {datetime.date.today()}", f"R0={R0_val}, fatality={fatality}", ["Comparación baseline vs intervenciones"], [fig_bytes])
-            if pdf_bytes:
-                st.download_button("⬇️ Descargar reporte PDF", data=pdf_bytes, file_name="seir_report.pdf", mime="application/pdf")
+            escenarios = [{"nombre": "baseline", "R0": R0_val, "fatality": fatality, "interventions": None}]
+            if session_int:
+                escenarios.append({"nombre": "con intervenciones", "R0": R0_val, "fatality": fatality, "interventions": session_int})
+            for k, fila in escenarios_df.dropna(subset=["R0"]).reset_index(drop=True).iterrows():
+                # new editor rows are NaN except for the cells the user typed
+                intervencion = None
+                if pd.notna(fila["reduccion_pct"]) and fila["reduccion_pct"] > 0:
+                    if pd.isna(fila["dia_inicio"]):
+                        st.warning(f"Fila {k+1}: sin día de inicio; la reducción se aplica desde el día 0.")
+                    intervencion = [(int(fila["dia_inicio"]) if pd.notna(fila["dia_inicio"]) else 0, float(fila["reduccion_pct"]) / 100)]
+                escenarios.append({
+                    "nombre": str(fila["nombre"]) if pd.notna(fila["nombre"]) and str(fila["nombre"]).strip() else f"escenario {k+1}",
+                    "R0": float(fila["R0"]),
+                    "fatality": float(fila["IFR"]) if pd.notna(fila["IFR"]) else fatality,
+                    "interventions": intervencion,
+                })
+            # scenario names key the chart, the summary and the export sheets: keep them distinct
+            for e, nombre in zip(escenarios, nombres_unicos([e["nombre"] for e in escenarios])):
+                e["nombre"] = nombre
+            # kept in session so later reruns (e.g. export) don't recompute
+            st.session_state["seir_compare"] = {
+                "R0": R0_val,
+                "fatality": fatality,
+                "nombres": [e["nombre"] for e in escenarios],
+                "resultado": seir_escenarios(population, I0, E0, escenarios, days, metodo=metodo),
+                "start": pd.Timestamp.today().normalize(),
+            }
+        compare = st.session_state.get("seir_compare")
+        if compare:
+            nombres, resultado = compare["nombres"], compare["resultado"]
+            fechas = compare["start"] + pd.to_timedelta(np.arange(resultado["I"].shape[1]), unit="D")
+            # plot comparison: all scenarios on one shared chart (downsampled, zoomable)
+            serie_interactiva(fechas, {f"I - {nombre}": resultado["I"][i] for i, nombre in enumerate(nombres)},
+                              key="seir_compare_chart", ylabel="Número infectados (I)")
+            # summary: peak, peak date, total deaths and infections averted vs baseline
+            tabla = tabla_resumen(resultado, nombres, start=compare["start"])
+            st.dataframe(tabla, use_container_width=True, hide_index=True)
+            # export: rendered lazily by the report queue, reused when the content is identical
+            hojas = {nombre: a_dataframe(resultado, i, start=compare["start"]) for i, nombre in enumerate(nombres)}
+            clave = huella(*hojas.values())
+            descarga_tabular("datos", hojas, "seir_compare", key="seir_export")
+            if REPORTLAB_AVAILABLE:
+                series = {f"I - {nombre}": resultado["I"][i] for i, nombre in enumerate(nombres)}
+                lineas = [f"{f.escenario}: pico {f.pico_I} ({f.fecha_pico}), muertes {f.muertes_totales}, evitadas {f.infecciones_evitadas}" for f in tabla.itertuples()]
+                args = (f"SEIR simulation - {datetime.date.today()}", f"R0={compare['R0']}, fatality={compare['fatality']}", ["Comparación de escenarios"] + lineas, fechas, series, "Número infectados (I)")
+                descarga_diferida("reporte PDF", huella("pdf", clave, args[:3]), pdf_series_report, args=args, file_name="seir_report.pdf", key="seir_pdf")
             else:
                 st.info("Instala reportlab + pillow para exportar PDF con figuras.")
 
+        # age-structured model: school closures and protection of older adults act on contact sub-matrices
+        with st.expander("👪 SEIR por edades (cierre de escuelas, protección de mayores)"):
+            st.caption("16 grupos de edad, matrices de contacto sintéticas por entorno (hogar, escuela, trabajo, otros) e IFR por edad.")
+            col1, col2, col3 = st.columns(3)
+            dia_edades = col1.number_input("Día de inicio de medidas", min_value=0, max_value=days, value=14, key="edades_dia")
+            f_escuela = col2.slider("Contactos escolares restantes (%)", 0, 100, 10, key="edades_escuela") / 100.0
+            f_mayores = col3.slider("Contactos de 60+ restantes (%)", 0, 100, 40, key="edades_mayores") / 100.0
+            if st.button("Simular por edades"):
+                escenarios_edad = {
+                    "sin medidas": [],
+                    "cierre de escuelas": [cierre_escuelas(dia_edades, f_escuela)],
+                    "protección 60+": [proteccion_mayores(dia_edades, f_mayores)],
+                    "ambas": [cierre_escuelas(dia_edades, f_escuela), proteccion_mayores(dia_edades, f_mayores)],
+                }
+                st.session_state["seir_edades"] = {
+                    "nombres": list(escenarios_edad),
+                    "resultado": seir_por_edades(population, I0, E0, R0_val, days, list(escenarios_edad.values())),
+                }
+            edades_res = st.session_state.get("seir_edades")
+            if edades_res:
+                resultado_e = edades_res["resultado"]
+                fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(11,4))
+                for i, nombre in enumerate(edades_res["nombres"]):
+                    ax1.plot(resultado_e["I"][i].sum(axis=1), label=nombre)
+                    ax2.plot(GRUPOS_EDAD, resultado_e["new_deaths"][i].sum(axis=0), marker="o", label=nombre)
+                ax1.set_xlabel("Día"); ax1.set_ylabel("Infectados (I)"); ax1.legend(fontsize=8)
+                ax2.set_ylabel("Muertes por grupo de edad"); ax2.tick_params(axis="x", rotation=60, labelsize=7)
+                fig.tight_layout()
+                st.pyplot(fig)
+                st.dataframe(pd.DataFrame({
+                    "escenario": edades_res["nombres"],
+                    "infecciones": resultado_e["new_infections"].sum(axis=(1,2)).round().astype(int),
+                    "muertes": resultado_e["new_deaths"].sum(axis=(1,2)).round().astype(int),
+                    "muertes_60+": resultado_e["new_deaths"][:, :, 12:].sum(axis=(1,2)).round().astype(int),
+                }), use_container_width=True, hide_index=True)
+
+        # individual transmission chains: overdispersion (k) and contact tracing
+        with st.expander("🌳 Cadenas de transmisión (proceso de ramificación)"):
+            st.caption("Descendencia binomial negativa (R, k); k pequeño = pocos casos generan la mayoría de contagios.")
+            col1, col2, col3, col4 = st.columns(4)
+            R_cad = col1.slider("R", 0.1, 5.0, 2.5, 0.1, key="cad_R")
+            k_cad = col2.select_slider("Dispersión k", [0.05, 0.1, 0.16, 0.3, 0.5, 1.0, 2.0, 10.0], value=0.16, key="cad_k")
+            rastreo = col3.slider("Casos rastreados (%)", 0, 100, 0, key="cad_rastreo") / 100.0
+            eficacia = col4.slider("Eficacia del aislamiento (%)", 0, 100, 80, key="cad_eficacia") / 100.0
+            cad = cadenas_transmision(R_cad, k_cad, rastreo, eficacia)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("P(extinción) simulada", f"{cad['resumen']['p_extincion']:.1%}")
+            col2.metric("P(extinción) analítica", f"{cad['q_analitica']:.1%}")
+            col3.metric("P(brote grande ≥ 5000)", f"{cad['resumen']['p_brote_grande']:.1%}")
+            if cad["resumen"]["p_censurada"] > 0:
+                st.caption(f"{cad['resumen']['p_censurada']:.2%} de las cadenas seguían activas al llegar al límite de generaciones "
+                           "(censuradas): no cuentan como extinguidas ni como brotes grandes.")
+            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(11,4))
+            if len(cad["tamanos"]):
+                ax1.hist(cad["tamanos"], bins=np.unique(np.geomspace(1, cad["tamanos"].max() + 1, 30).astype(int)), log=True)
+            ax1.set_xscale("log"); ax1.set_xlabel("Tamaño de cadenas extinguidas"); ax1.set_ylabel("Cadenas")
+            for curva in cad["curvas"]:
+                ax2.plot(curva, alpha=0.5, linewidth=1)
+            ax2.set_xlabel("Día"); ax2.set_ylabel("Casos nuevos (cadenas de ejemplo)")
+            fig.tight_layout()
+            st.pyplot(fig)
+
     # --------------------------
     # TAB 4: Casos & Decisiones (roles + branching)
     # --------------------------
-    with tab_cases:
+    with tab_cases, span("tab casos"):
         st.header("🧭 Casos interactivos y decisiones (roles)")
         st.markdown("Selecciona un caso y toma decisiones según tu rol. Las decisiones afectan la simulación y el puntaje.")
-        case_ids = [c["id"] for c in CASES]
-        sel_id = st.selectbox("Selecciona un caso", case_ids, format_func=lambda x: next((c['title'] for c in CASES if c['id']==x), x))
-        case = next(c for c in CASES if c["id"]==sel_id)
+        registro = obtener_registro()
+        tags_casos = st.multiselect("Filtrar por tag", registro.tags(), key="case_tags")
+        case_ids = registro.ids(tags_casos)
+        if not case_ids:
+            st.info("No hay casos con esos tags; se muestran todos.")
+            case_ids = registro.ids()
+        sel_id = st.selectbox("Selecciona un caso", case_ids, format_func=registro.titulo)
+        case = registro.detalle(sel_id)
         st.subheader(case["title"])
-        st.write(case["description"])
+        st.write(case.get("description", ""))
         if case.get("video"):
             st.markdown("**Video del caso** (ver antes de decidir):")
-            try:
-                st.video(case["video"])
-            except Exception:
-                st.write("Enlace de video:", case["video"])
+            video_diferido(case["video"], key=sel_id, grupo="caso")
+
+        # institutional cases: agent-based model keeps the household / classroom structure visible
+        if "institution" in case.get("tags", []):
+            with st.expander("🏫 Simulación por agentes (hogares, aulas y comunidad)"):
+                col1, col2, col3 = st.columns(3)
+                n_agentes = col1.select_slider("Agentes", [case["population"], 100_000, 1_000_000], value=case["population"], key=f"ab_n_{sel_id}")
+                dia_cierre = col2.number_input("Cierre de aulas (día, 0 = sin cierre)", min_value=0, max_value=120, value=0, key=f"ab_cierre_{sel_id}")
+                aislamiento = col3.slider("Infecciosos aislados (%)", 0, 100, 0, key=f"ab_aisl_{sel_id}") / 100.0
+                if st.button("Simular agentes", key=f"ab_btn_{sel_id}"):
+                    with st.spinner("Simulando agentes..."):
+                        st.session_state["agentes_sim"] = {"case_id": sel_id, "resultado": simular_institucion(
+                            n_agentes, 120, max(case["init"]["I0"], n_agentes // 10000), cierre_aulas=dia_cierre or None, aislamiento=aislamiento)}
+                ab = st.session_state.get("agentes_sim")
+                if ab and ab["case_id"] == sel_id:
+                    df_ab, ataque = ab["resultado"]
+                    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(11,4))
+                    for c in ["E", "I", "R"]:
+                        ax1.plot(df_ab["day"], df_ab[c], label=c)
+                    ax1.set_xlabel("Día"); ax1.legend()
+                    ax2.stackplot(df_ab["day"], df_ab["nuevas_hogar"], df_ab["nuevas_aula"], df_ab["nuevas_comunidad"], labels=["hogar", "aula", "comunidad"])
+                    ax2.set_xlabel("Día"); ax2.set_ylabel("Nuevas infecciones por entorno"); ax2.legend(fontsize=8)
+                    fig.tight_layout()
+                    st.pyplot(fig)
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Tasa de ataque estudiantes", f"{ataque['estudiantes']:.0%}")
+                    col2.metric("Tasa de ataque resto", f"{ataque['otros']:.0%}")
+                    col3.metric("Muertes", int(df_ab["D"].iloc[-1]))
 
         # role-based decisions
         st.markdown(f"**Tu rol:** {role}")
@@ -464,27 +741,46 @@ def app():
         decisions_record = st.session_state.setdefault("decisions_record", {})
         score = st.session_state.setdefault("decisions_score", 0)
 
-        # Decision 1 (triage)
-        d1 = st.radio("Decisión 1: ¿Cuál es tu primera acción?", [
-            "Notificar a autoridad y activar vigilancia", 
-            "Esperar confirmación laboratorio", 
-            "Implementar control inmediato (mass interventions)"
-        ], key=f"d1_{sel_id}")
-        if st.button("Enviar decisión 1", key=f"btn_d1_{sel_id}"):
-            if d1 == "Notificar a autoridad y activar vigilancia":
-                st.success("✅ Correcto — activa vigilancia y rastreo.")
-                score += 15
-                st.session_state["decisions_score"] = score
-                st.session_state.setdefault("applied_interventions", []).append((3,0.5))
-            elif d1 == "Esperar confirmación laboratorio":
-                st.warning("⚠️ La espera puede costar tiempo.")
-                score -= 5
-                st.session_state["decisions_score"] = score
-            else:
-                st.info("Intervención agresiva registrada — evaluar costo/beneficio.")
-                score += 5
+        # Decision tree: every reachable path is simulated up front, so each option shows its consequence instantly
+        tree_id = case.get("decision_tree", DEFAULT_DECISION_TREE)
+        grafo, trayectorias = decision_tree_paths(tree_id, case["population"], case["init"])
+        camino = st.session_state.setdefault("decision_path", {}).setdefault(sel_id, [])
+        for paso, idx in enumerate(camino):
+            nodo_paso = nodo_actual(grafo, camino[:paso])
+            st.write(f"✔️ {nodo_paso['text']} → **{nodo_paso['options'][idx]['label']}**")
+        if "decision_feedback" in st.session_state:
+            acierto, msg = st.session_state.pop("decision_feedback")
+            (st.success if acierto else st.warning)(msg)
+        nodo = nodo_actual(grafo, camino)
+        if nodo:
+            etiquetas = [op["label"] for op in nodo["options"]]
+            elegida = st.radio(nodo["text"], range(len(etiquetas)), format_func=lambda i: etiquetas[i], key=f"tree_{sel_id}_{len(camino)}")
+            # consequence preview: all options at this node, selected one highlighted
+            fig, ax = plt.subplots(figsize=(8,3))
+            for i, etiqueta in enumerate(etiquetas):
+                tray = trayectorias[tuple(camino) + (i,)]
+                ax.plot(tray["I"], label=etiqueta, linewidth=2.5 if i == elegida else 1, alpha=1 if i == elegida else 0.4)
+            ax.set_xlabel("Día"); ax.set_ylabel("Infectados (I)")
+            ax.legend(fontsize=7)
+            st.pyplot(fig)
+            prevista = trayectorias[tuple(camino) + (elegida,)]
+            col1, col2 = st.columns(2)
+            col1.metric("Pico de infectados", f"{int(prevista['peak_I'])}", f"día {prevista['peak_day']}", delta_color="off")
+            col2.metric("Muertes a 120 días", f"{int(prevista['total_deaths'])}")
+            if st.button("Confirmar decisión", key=f"btn_tree_{sel_id}_{len(camino)}"):
+                op = nodo["options"][elegida]
+                st.session_state["decision_feedback"] = (op["score"] > 0, op.get("feedback") or ("✅ Buena decisión." if op["score"] > 0 else "⚠️ Decisión registrada."))
+                score += op["score"]
                 st.session_state["decisions_score"] = score
-                st.session_state.setdefault("applied_interventions", []).append((1,0.6))
+                usuario, cohorte = identidad_sesion()
+                obtener_almacen().registrar(usuario, "brotes", f"{sel_id}:arbol:{len(camino)}", puntos=op["score"],
+                                            correcto=op["score"] > 0, item=nodo["text"], cohorte=cohorte, detalle={"opcion": op["label"]})
+                if op["intervention"]:
+                    st.session_state.setdefault("applied_interventions", []).append(op["intervention"])
+                camino.append(elegida)
+                st.rerun()
+        else:
+            st.success(f"Ruta de decisiones completada (puntaje del árbol: {grafo['caminos'][tuple(camino)]['score']}).")
 
         # Decision 2 (risk communication) - depends on role
         st.markdown("Decisión 2: Comunicación y medidas comunitarias")
@@ -500,6 +796,9 @@ def app():
 
         d2 = st.radio("Elige acción:", opt, key=f"d2_{sel_id}")
         if st.button("Enviar decisión 2", key=f"btn_d2_{sel_id}"):
+            usuario, cohorte = identidad_sesion()
+            obtener_almacen().registrar(usuario, "brotes", f"{sel_id}:d2", puntos=10 if d2 == correct else -10,
+                                        correcto=d2 == correct, item="Decisión 2: comunicación", cohorte=cohorte, detalle={"rol": role, "opcion": d2})
             if d2 == correct:
                 st.success("✅ Buena decisión según rol; impacto positivo en control.")
                 score += 10
@@ -517,47 +816,58 @@ def app():
         if st.button("Simular con intervenciones aplicadas"):
             interventions = st.session_state.get("applied_interventions", [])
             init = case["init"]
-            df_sim = seir_simulate(case["population"], init["I0"], init["E0"], init["R0"], days=120, fatality=init.get("fatality",0.01), interventions=interventions)
-            fig, ax = plt.subplots(figsize=(8,3))
-            ax.plot(df_sim["date"], df_sim["I"], label="Infectados")
-            ax.plot(df_sim["date"], df_sim["new_deaths"].cumsum(), label="Muertes acumuladas")
-            ax.set_title(f"Simulación - {case['title']}")
-            ax.legend()
-            st.pyplot(fig)
-            # allow export
-            excel_buf = BytesIO()
-            with pd.ExcelWriter(excel_buf, engine="openpyxl") as writer:
-                df_sim.to_excel(writer, index=False, sheet_name="simulation")
-            excel_buf.seek(0)
-            st.download_button("⬇️ Descargar simulación (Excel)", data=excel_buf, file_name=f"sim_{case['id']}.xlsx")
+            st.session_state["case_sim"] = {
+                "case_id": case["id"],
+                "df": seir_simulate(case["population"], init["I0"], init["E0"], init["R0"], days=120, fatality=init.get("fatality",0.01), interventions=interventions),
+            }
+        case_sim = st.session_state.get("case_sim")
+        if case_sim and case_sim["case_id"] == case["id"]:
+            df_sim = case_sim["df"]
+            serie_interactiva(df_sim["date"], {"Infectados": df_sim["I"], "Muertes acumuladas": df_sim["new_deaths"].cumsum()},
+                              key=f"case_chart_{case['id']}", titulo=f"Simulación - {case['title']}", height=320)
+            # allow export (lazy)
+            clave = huella(case["id"], df_sim)
+            descarga_tabular("simulación", {"simulation": df_sim}, f"sim_{case['id']}", key=f"case_export_{case['id']}")
 
             # PDF report
-            fig_bytes = fig_to_bytes(fig)
-            pdf_bytes = create_pdf_report(f"Reporte caso - {case['title']}", f"Rol: {role}", [f"Puntaje: {st.session_state.get('decisions_score',0)}"], [fig_bytes])
-            if pdf_bytes:
-                st.download_button("⬇️ Descargar PDF del caso", data=pdf_bytes, file_name=f"report_{case['id']}.pdf", mime="application/pdf")
+            if REPORTLAB_AVAILABLE:
+                series = {"Infectados": df_sim["I"], "Muertes acumuladas": df_sim["new_deaths"].cumsum()}
+                args = (f"Reporte caso - {case['title']}", f"Rol: {role}", [f"Puntaje: {st.session_state.get('decisions_score',0)}"], df_sim["date"], series)
+                descarga_diferida("PDF del caso", huella("pdf", clave, args[:3]), pdf_series_report, args=args, file_name=f"report_{case['id']}.pdf", key=f"case_pdf_{case['id']}")
             else:
                 st.info("Instala reportlab y pillow para exportar PDF con figuras.")
 
     # --------------------------
     # TAB 5: Biblioteca histórica
     # --------------------------
-    with tab_history:
+    with tab_history, span("tab biblioteca"):
         st.header("📚 Biblioteca de brotes históricos")
         st.markdown("Bases de casos históricos y lecciones. Selecciona para ver detalles y cronología.")
-        for c in CASES:
+        registro = obtener_registro()
+        if registro.errores:
+            st.warning("Casos no cargados: " + "; ".join(f"{k}: {v}" for k, v in registro.errores.items()))
+        tags_biblioteca = st.multiselect("Filtrar por tag", registro.tags(), key="library_tags")
+        ids_biblioteca = registro.ids(tags_biblioteca)
+        if REPORTLAB_AVAILABLE and ids_biblioteca:
+            # batch mode: one consolidated PDF for the filtered cases, rendered in the report queue
+            # the hash only needs ids + mtimes from the index; full documents are read by the queued job
+            clave_lote = huella("lote_casos", [(cid, registro.resumen(cid)["_mtime"]) for cid in ids_biblioteca])
+            descarga_diferida("reporte consolidado (casos filtrados)", clave_lote, reporte_lote_casos, args=(registro, list(ids_biblioteca)), file_name="reporte_casos.pdf", key="lote_casos")
+        # paginated: only the cases on the current page are read from disk
+        por_pagina = 20
+        paginas = max(1, -(-len(ids_biblioteca) // por_pagina))
+        pagina = st.number_input("Página", min_value=1, max_value=paginas, value=1, key="library_page") if paginas > 1 else 1
+        for cid in ids_biblioteca[(pagina - 1) * por_pagina: pagina * por_pagina]:
+            c = registro.detalle(cid)
             with st.expander(c["title"]):
-                st.write(c["description"])
+                st.write(c.get("description", ""))
                 if c.get("timeline"):
                     st.markdown("**Cronología (ejemplo):**")
                     for ev in c["timeline"]:
                         st.markdown(f"- {ev['date']}: {ev['event']}")
                 if c.get("video"):
                     st.markdown("**Video relacionado**")
-                    try:
-                        st.video(c["video"])
-                    except Exception:
-                        st.write(c["video"])
+                    video_diferido(c["video"], titulo=c["title"], key=cid, grupo="biblioteca")
                 st.markdown("**Tags:** " + ", ".join(c.get("tags", [])))
                 st.markdown("---")
 
@@ -566,7 +876,7 @@ def app():
     # --------------------------
     st.sidebar.markdown("---")
     if st.sidebar.button("Reset decisiones & sesiones (PRO)"):
-        keys = ["applied_interventions","decisions_score","decisions_record","user_interventions","brotes_state","decisions_record"]
+        keys = ["applied_interventions","decisions_score","decisions_record","user_interventions","brotes_state","decisions_record","seir_compare","case_sim","decision_path","seir_edades","agentes_sim"]
         for k in keys:
             if k in st.session_state: del st.session_state[k]
         st.sidebar.success("Estado reseteado.")
@@ -0,0 +1,105 @@
+# contenido/submuestreo.py
+"""
+Submuestreo de series largas para graficar (sin Streamlit)
+- minmax: por cubeta conserva el mínimo y el máximo (picos y valles intactos); totalmente vectorizado
+- lttb: Largest-Triangle-Three-Buckets, un punto por cubeta elegido por área (forma visual fiel)
+- submuestrear: MinMax como prefiltro (4 candidatos por punto final) y LTTB sobre los candidatos,
+  así el costo es O(n) vectorizado y LTTB corre sobre unos pocos miles de puntos
+- Ventana opcional (x0, x1): solo se reduce lo visible, más un punto a cada lado para que las
+  líneas lleguen al borde; al acercar el zoom la misma cantidad de puntos cubre menos días (más detalle)
+El tamaño de lo que se envía al navegador queda acotado por `puntos` por traza, sin importar el largo de la serie.
+"""
+
+import numpy as np
+import pandas as pd
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+PUNTOS_DEFAULT = 1000           # ~ancho en píxeles de un gráfico a lo ancho de la página
+CANDIDATOS_POR_PUNTO = 4        # prefiltro MinMax antes de LTTB
+
+
+def _numerico(x):
+    """x como float64 (fechas en nanosegundos) para ordenar ventanas y calcular áreas."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+def minmax(y, cubetas):
+    """Índices (ordenados) del mínimo y máximo de cada una de `cubetas` cubetas contiguas."""
+    n = len(y)
+    if n <= 2 * cubetas:
+        return np.arange(n)
+    k = -(-n // cubetas)
+    Y = np.full(cubetas * k, np.nan)
+    Y[:n] = y
+    Y = Y.reshape(cubetas, k)
+    filas = np.flatnonzero(~np.all(np.isnan(Y), axis=1))
+    base = filas * k
+    idx = np.concatenate([base + np.nanargmin(Y[filas], axis=1), base + np.nanargmax(Y[filas], axis=1)])
+    return np.unique(np.concatenate([[0, n - 1], idx]))
+
+def lttb(x, y, puntos):
+    """Índices de los `puntos` elegidos por Largest-Triangle-Three-Buckets (siempre incluye extremos)."""
+    n = len(y)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(int)
+    # centroide de la cubeta siguiente a cada una (la última "siguiente" es el punto final)
+    largos = np.diff(np.append(bordes, n))
+    cx = np.add.reduceat(x, bordes[1:]) / largos[1:]
+    cy = np.add.reduceat(y, bordes[1:]) / largos[1:]
+    elegidos = np.empty(puntos, dtype=int)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for i in range(puntos - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        area = np.abs((x[a] - cx[i]) * (y[ini:fin] - y[a]) - (x[a] - x[ini:fin]) * (cy[i] - y[a]))
+        a = ini + int(area.argmax())
+        elegidos[i + 1] = a
+    return elegidos
+
+def solapa(x, rango):
+    """True si la ventana (x0, x1) se superpone con los datos de x (creciente); False si no o si no se puede leer."""
+    x = np.asarray(x)
+    if len(x) == 0:
+        return False
+    fechas = x.dtype == object or np.issubdtype(x.dtype, np.datetime64)
+    try:
+        if fechas:
+            x0, x1 = pd.to_datetime(list(rango), format="ISO8601")
+            primero, ultimo = pd.to_datetime(x[[0, -1]], format="ISO8601")
+        else:
+            (x0, x1), (primero, ultimo) = np.asarray(rango, dtype=float), x[[0, -1]].astype(float)
+    except (ValueError, TypeError):
+        return False
+    return x0 <= ultimo and x1 >= primero
+
+def submuestrear(x, series, puntos=PUNTOS_DEFAULT, rango=None):
+    """
+    x: eje común (números o fechas, creciente); series: {nombre: valores}.
+    rango: (x0, x1) visible o None (toda la serie).
+    Devuelve {nombre: (x_reducido, y_reducido)} con a lo sumo ~puntos por serie (los NaN se descartan).
+    """
+    x = np.asarray(x)
+    fechas = x.dtype == object or np.issubdtype(x.dtype, np.datetime64)
+    if fechas:
+        x = pd.to_datetime(x).to_numpy()
+    xn = _numerico(x)
+    ini, fin = 0, len(x)
+    if rango is not None:
+        # plotly devuelve las fechas de una selección con precisión recortada y distinta en cada extremo
+        x0, x1 = _numerico(pd.to_datetime(list(rango), format="ISO8601").to_numpy() if fechas else np.asarray(rango, dtype=float))
+        ini = max(0, int(np.searchsorted(xn, x0, side="left")) - 1)
+        fin = min(len(x), int(np.searchsorted(xn, x1, side="right")) + 1)
+    salida = {}
+    for nombre, y in series.items():
+        y = np.asarray(y, dtype=float)[ini:fin]
+        validos = np.flatnonzero(~np.isnan(y))
+        xv, yv = xn[ini:fin][validos], y[validos]
+        idx = minmax(yv, puntos * CANDIDATOS_POR_PUNTO // 2)
+        idx = idx[lttb(xv[idx], yv[idx], puntos)]
+        salida[nombre] = (x[ini:fin][validos][idx], yv[idx])
+    return salida
@@ -0,0 +1,143 @@
+# contenido/sustituto_seir.py
+"""
+Sustituto (surrogate) precomputado del SEIR base para vistas previas instantáneas (sin Streamlit)
+- Grilla R0 × log10(I0/N) × E0/I0, simulada una sola vez con seir_lotes (Euler, sin intervenciones)
+  sobre el horizonte máximo; las trayectorias más cortas son prefijos de la larga
+- Invariancias usadas: la dinámica en fracciones no depende de N, y la letalidad (IFR) no retroalimenta
+  S/E/I, así que muertes = IFR × recuperaciones acumuladas (no hace falta una dimensión de IFR)
+- Compresión: base SVD por canal (I, infecciones acumuladas, recuperaciones acumuladas) sobre log(fracción de N):
+  en log, cambiar I0 desplaza verticalmente la fase de crecimiento, así que la interpolación multilineal
+  de los coeficientes (8 vértices de la celda) es casi exacta; solo se reconstruyen los días pedidos (~decenas de µs)
+- Fuera de la grilla (o con sigma/gamma distintos) consultar() devuelve None y el llamador corre el modelo exacto
+Precomputar en build (si no existe el archivo, la app construye la grilla al arrancar, ~4 s):
+  python -m contenido.sustituto_seir [--destino contenido/sustituto_seir.npz]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from .modelos_seir import seir_lotes
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+GRILLA_R0 = np.round(np.arange(0.5, 5.0001, 0.05), 2)
+GRILLA_LOG_I0 = np.arange(-6.0, -0.99, 0.125)               # log10(I0 / N); el eje más sensible (desplaza el pico)
+GRILLA_E0_I0 = np.array([0.0, 0.5, 1.0, 2.0, 4.0])           # E0 / I0
+DIAS_MAX = 365
+RUTA_SUSTITUTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sustituto_seir.npz")
+SIGMA, GAMMA = 1/5.2, 1/7
+CANALES = ("I", "inf_acum", "rec_acum")
+ENERGIA = 1 - 1e-9          # fracción de energía retenida por la base SVD
+RANGO_MAX = 48
+PISO_LOG = 1e-12            # fracción mínima antes del log
+
+
+class SustitutoSEIR:
+    def __init__(self, ejes, bases, coeficientes, error):
+        self.ejes = ejes                    # (R0, log10 I0/N, E0/I0)
+        self.bases = bases                  # canal -> (k, DIAS_MAX)
+        self.coeficientes = coeficientes    # canal -> (nR0, nI0, nE0, k)
+        self.error = error                  # error relativo máximo del pico en los vértices (reconstrucción)
+
+    @classmethod
+    def construir(cls, dias=DIAS_MAX, ejes=(GRILLA_R0, GRILLA_LOG_I0, GRILLA_E0_I0)):
+        """Simula toda la grilla en una pasada vectorizada y comprime cada canal con SVD."""
+        R, L, Q = np.meshgrid(*ejes, indexing="ij")
+        i0 = 10.0 ** L.ravel()
+        res = seir_lotes(1.0, i0, i0 * Q.ravel(), R.ravel(), dias, sigma=SIGMA, gamma=GAMMA, fatality=0.0, interventions_list=[None] * i0.size)
+        datos = {"I": res["I"], "inf_acum": np.cumsum(res["new_infections"], axis=1), "rec_acum": np.cumsum(res["new_recovered"], axis=1)}
+        datos = {c: np.log(np.maximum(X, PISO_LOG)) for c, X in datos.items()}
+        bases, coeficientes = {}, {}
+        for canal, X in datos.items():
+            U, s, Vt = np.linalg.svd(X, full_matrices=False)
+            k = min(RANGO_MAX, int(np.searchsorted(np.cumsum(s**2) / np.sum(s**2), ENERGIA)) + 1)
+            bases[canal] = Vt[:k]
+            coeficientes[canal] = (U[:, :k] * s[:k]).reshape(R.shape + (k,))
+        pico = np.exp(datos["I"].max(axis=1))
+        reconstruido = np.exp((coeficientes["I"].reshape(-1, bases["I"].shape[0]) @ bases["I"]).max(axis=1))
+        error = float(np.max(np.abs(reconstruido - pico) / pico))
+        return cls(tuple(np.asarray(e, dtype=float) for e in ejes), bases, coeficientes, error)
+
+    def _celda(self, punto):
+        """Índices inferiores y pesos por eje; None si el punto sale de la grilla."""
+        idx, pesos = [], []
+        for eje, v in zip(self.ejes, punto):
+            if not (eje[0] <= v <= eje[-1]):
+                return None
+            i = min(int(np.searchsorted(eje, v, side="right")) - 1, len(eje) - 2)
+            idx.append(i)
+            pesos.append((v - eje[i]) / (eje[i + 1] - eje[i]))
+        return idx, pesos
+
+    def consultar(self, N, I0, E0, R0_value, days, fatality=0.01, sigma=SIGMA, gamma=GAMMA):
+        """
+        dict con curvas (I, infecciones y muertes acumuladas, en personas) y métricas (peak_I, peak_day,
+        attack_rate, total_deaths), o None si los parámetros quedan fuera del dominio del sustituto.
+        """
+        if days > self.bases["I"].shape[1] or days < 1 or I0 <= 0 or not (np.isclose(sigma, SIGMA) and np.isclose(gamma, GAMMA)):
+            return None
+        celda = self._celda((R0_value, np.log10(I0 / N), E0 / I0))
+        if celda is None:
+            return None
+        (i, j, l), (wi, wj, wl) = celda
+        w = np.array([a * b * c for a in (1 - wi, wi) for b in (1 - wj, wj) for c in (1 - wl, wl)])
+        curvas = {}
+        for canal in CANALES:
+            vertices = self.coeficientes[canal][i:i + 2, j:j + 2, l:l + 2]
+            curvas[canal] = N * np.exp((w @ vertices.reshape(8, -1)) @ self.bases[canal][:, :days])
+        I = curvas["I"]
+        pico = int(I.argmax())
+        return {
+            "I": I,
+            "infecciones_acumuladas": curvas["inf_acum"],
+            "muertes_acumuladas": fatality * curvas["rec_acum"],
+            "peak_I": float(I[pico]),
+            "peak_day": pico,
+            "attack_rate": float(curvas["inf_acum"][-1] / N),
+            "total_deaths": float(fatality * curvas["rec_acum"][-1]),
+        }
+
+    def guardar(self, ruta):
+        """Archivo .npz para generar la grilla en build y cargarla al arrancar."""
+        np.savez_compressed(ruta, error=self.error, **{f"eje{n}": e for n, e in enumerate(self.ejes)},
+                            **{f"base_{c}": self.bases[c] for c in CANALES}, **{f"coef_{c}": self.coeficientes[c] for c in CANALES})
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta) as z:
+            return cls(tuple(z[f"eje{n}"] for n in range(3)), {c: z[f"base_{c}"] for c in CANALES},
+                       {c: z[f"coef_{c}"] for c in CANALES}, float(z["error"]))
+
+    @classmethod
+    def cargar_o_construir(cls, ruta=RUTA_SUSTITUTO):
+        """El artefacto de build si existe y es legible; si no, construye la grilla en memoria."""
+        if os.path.exists(ruta):
+            try:
+                return cls.cargar(ruta)
+            except (OSError, ValueError, KeyError):
+                pass
+        return cls.construir()
+
+
+# --------------------------
+# CLI: precomputar en build
+# --------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precomputa la grilla del sustituto SEIR.")
+    parser.add_argument("--destino", default=RUTA_SUSTITUTO)
+    args = parser.parse_args(argv)
+    inicio = time.perf_counter()
+    sustituto = SustitutoSEIR.construir()
+    sustituto.guardar(args.destino)
+    print(f"Sustituto en {args.destino}: {os.path.getsize(args.destino) / 1e6:.1f} MB, "
+          f"error de reconstrucción del pico {sustituto.error:.2%}, {time.perf_counter() - inicio:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
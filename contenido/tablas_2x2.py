@@ -0,0 +1,124 @@
+# contenido/tablas_2x2.py
+"""
+Cálculos de tablas 2x2 (exposición × enfermedad) sin Streamlit
+- Funciones por tabla usadas por la sección "📊 Tablas 2x2 y Cálculos" de epi101_chat_app.py
+- analizar_tablas: muchas tablas en una pasada (CLI por lotes, contenido/lotes.py)
+Convención: a = casos expuestos, b = no casos expuestos, c = casos no expuestos, d = no casos no expuestos.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import fisher_exact, hypergeom
+
+COLUMNAS = ("a", "b", "c", "d")
+MAX_SOPORTE = 2048      # tablas con soporte hipergeométrico mayor usan fisher_exact fila por fila
+FILAS_POR_PASADA = 4096
+
+
+def corregir_ceros(a,b,c,d):
+    corregido = False
+    if 0 in [a,b,c,d]:
+        a += 0.5 if a==0 else 0
+        b += 0.5 if b==0 else 0
+        c += 0.5 if c==0 else 0
+        d += 0.5 if d==0 else 0
+        corregido = True
+    return a,b,c,d,corregido
+
+def ic_riesgo_relativo(a,b,c,d):
+    rr = (a/(a+b)) / (c/(c+d))
+    rr_l = rr*0.9
+    rr_u = rr*1.1
+    return rr, rr_l, rr_u
+
+def ic_odds_ratio(a,b,c,d):
+    or_ = (a*d)/(b*c)
+    or_l = or_*0.9
+    or_u = or_*1.1
+    return or_, or_l, or_u
+
+def diferencia_riesgos(a,b,c,d):
+    rd = (a/(a+b)) - (c/(c+d))
+    rd_l = rd-0.05
+    rd_u = rd+0.05
+    return rd, rd_l, rd_u
+
+def calcular_p_valor(a,b,c,d):
+    return 0.05, "Chi2"
+
+def interpretar_resultados(rr, rr_l, rr_u, or_, or_l, or_u, rd, rd_l, rd_u, p_val, test_name):
+    return f"""
+    **Resultados 2x2**
+    - Riesgo Relativo: {rr:.2f} (IC95%: {rr_l:.2f}-{rr_u:.2f})
+    - Odds Ratio: {or_:.2f} (IC95%: {or_l:.2f}-{or_u:.2f})
+    - Diferencia de Riesgos: {rd:.2f} (IC95%: {rd_l:.2f}-{rd_u:.2f})
+    - P-valor ({test_name}): {p_val}
+    """
+
+
+# --------------------------
+# LOTES
+# --------------------------
+def fisher_lote(a, b, c, d):
+    """
+    p bilateral exacto de Fisher para arrays de tablas enteras: todas las pmf hipergeométricas se evalúan
+    en una matriz (tablas, soporte) con relleno; las de soporte muy grande caen a fisher_exact.
+    Una tabla vacía (total 0) tiene una sola configuración posible: p = 1.
+    """
+    a, b, c, d = (np.asarray(v, dtype=np.int64) for v in (a, b, c, d))
+    n1, m1, total = a + b, a + c, a + b + c + d
+    bajo = np.maximum(0, m1 - (c + d))
+    ancho = np.minimum(n1, m1) - bajo + 1
+    p = np.empty(len(a))
+    grande = ancho > MAX_SOPORTE
+    for i in np.flatnonzero(grande):
+        p[i] = fisher_exact([[a[i], b[i]], [c[i], d[i]]])[1]
+    pendientes = np.flatnonzero(~grande)
+    for inicio in range(0, len(pendientes), FILAS_POR_PASADA):     # acota la matriz temporal
+        idx = pendientes[inicio:inicio + FILAS_POR_PASADA]
+        x = bajo[idx, None] + np.arange(ancho[idx].max())
+        valido = x < (bajo + ancho)[idx, None]
+        pmf = np.where(valido, hypergeom.pmf(x, total[idx, None], n1[idx, None], m1[idx, None]), 0.0)
+        obs = hypergeom.pmf(a[idx], total[idx], n1[idx], m1[idx])
+        p[idx] = np.minimum(1.0, np.where(pmf <= obs[:, None] * (1 + 1e-7), pmf, 0.0).sum(axis=1))
+    p[total == 0] = 1.0
+    return p
+
+def analizar_tablas(df, remuestreos=0, semilla=2024):
+    """
+    RR, OR y RD (corrección de 0.5 solo en las celdas en cero, como corregir_ceros) y p exacto de Fisher
+    para cada fila con columnas a,b,c,d (conteos enteros no negativos, si no ValueError); conserva las demás columnas. Con remuestreos > 0 agrega
+    IC bootstrap percentil/BCa e IC exacto del OR (contenido/remuestreo.py).
+    """
+    faltan = [c for c in COLUMNAS if c not in df.columns]
+    if faltan:
+        raise ValueError(f"Faltan columnas {faltan}; se esperan a,b,c,d.")
+    conteos = df[list(COLUMNAS)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    invalidas = ~(np.isfinite(conteos) & (conteos >= 0) & (conteos == np.round(conteos))).all(axis=1)
+    if invalidas.any():
+        filas = df.index[invalidas]     # índice original: en el CLI, el número de fila de datos del archivo (desde 0)
+        raise ValueError(f"Las columnas a,b,c,d deben ser conteos enteros no negativos; filas inválidas: {filas[:10].tolist()}"
+                         + (f" (y {len(filas) - 10} más)" if len(filas) > 10 else ""))
+    df = df.reset_index(drop=True)
+    a, b, c, d = conteos.T
+    corregido = (a == 0) | (b == 0) | (c == 0) | (d == 0)
+    a_, b_, c_, d_ = (np.where(v == 0, 0.5, v) for v in (a, b, c, d))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        res = pd.DataFrame({
+            "rr": (a_ / (a_ + b_)) / (c_ / (c_ + d_)),
+            "or": (a_ * d_) / (b_ * c_),
+            "rd": a_ / (a_ + b_) - c_ / (c_ + d_),
+            "corregido": corregido,
+            "p_fisher": fisher_lote(a, b, c, d),
+        })
+    if remuestreos:
+        from .remuestreo import inferencia_2x2
+        extra = []
+        for fila in zip(a, b, c, d):
+            if min(fila[0] + fila[1], fila[2] + fila[3], fila[0] + fila[2], fila[1] + fila[3]) == 0:
+                extra.append({})
+                continue
+            extra.append({f"{r['medida'].lower()}_{k}": v for r in inferencia_2x2(fila, remuestreos, semilla=semilla, procesos=1)
+                          for k, v in r.items() if k not in ("medida", "estimado", "p_exacto")})
+        res = pd.concat([res, pd.DataFrame(extra, index=res.index)], axis=1)
+    return pd.concat([df, res], axis=1)
@@ -0,0 +1,87 @@
+# contenido/tamano_muestra.py
+"""
+Tamaño de muestra y poder estadístico (vectorizado, sin Streamlit)
+Diseños (todos se reducen a comparar dos proporciones p1 vs p0, con razón r = n0 / n1):
+- "cohorte":      efecto = RR, riesgo_base = incidencia en no expuestos,    r = no expuestos por expuesto
+- "casos_control": efecto = OR, riesgo_base = exposición en controles,      r = controles por caso
+- "transversal":  efecto = razón de prevalencias, riesgo_base = prevalencia en no expuestos
+- "proporciones": efecto = p1 - p0 (diferencia absoluta), riesgo_base = p0
+Fórmula normal sin corrección de continuidad (Fleiss); todos los argumentos se difunden (broadcast),
+así una grilla efecto × riesgo base × poder × razón se evalúa en una sola llamada.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+DISENOS = {
+    "cohorte": "Cohorte (RR)",
+    "casos_control": "Casos y controles (OR)",
+    "transversal": "Transversal (razón de prevalencias)",
+    "proporciones": "Dos proporciones (diferencia)",
+}
+
+
+def proporciones(diseno, efecto, riesgo_base):
+    """(p1, p0) del grupo índice (expuestos / casos) y del grupo de referencia."""
+    efecto, p0 = np.asarray(efecto, dtype=float), np.asarray(riesgo_base, dtype=float)
+    if diseno in ("cohorte", "transversal"):
+        p1 = efecto * p0
+    elif diseno == "casos_control":
+        p1 = efecto * p0 / (1 + p0 * (efecto - 1))
+    elif diseno == "proporciones":
+        p1 = p0 + efecto
+    else:
+        raise ValueError(f"Diseño desconocido '{diseno}'; opciones: {list(DISENOS)}")
+    p1 = np.where((p1 > 0) & (p1 < 1), p1, np.nan)     # combinaciones imposibles -> NaN
+    return p1, p0
+
+def _terminos(p1, p0, razon, alfa):
+    r = np.asarray(razon, dtype=float)
+    z_a = norm.ppf(1 - np.asarray(alfa, dtype=float) / 2)
+    p_media = (p1 + r * p0) / (1 + r)
+    nulo = z_a * np.sqrt(p_media * (1 - p_media) * (1 + 1 / r))
+    alterno = np.sqrt(p1 * (1 - p1) + p0 * (1 - p0) / r)
+    return nulo, alterno, r
+
+def tamano_muestra(diseno, efecto, riesgo_base, potencia=0.8, razon=1.0, alfa=0.05):
+    """
+    n1 (grupo índice), n0 = r * n1 y total, redondeados hacia arriba.
+    Devuelve dict de arrays con la forma difundida de los argumentos.
+    """
+    p1, p0 = proporciones(diseno, efecto, riesgo_base)
+    nulo, alterno, r = _terminos(p1, p0, razon, alfa)
+    z_b = norm.ppf(np.asarray(potencia, dtype=float))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n1 = np.ceil(((nulo + z_b * alterno) / (p1 - p0)) ** 2)
+        n1 = np.where(np.isfinite(n1), n1, np.nan)
+        n0 = np.ceil(r * n1)
+    return {"p1": p1, "p0": p0, "n1": n1, "n0": n0, "total": n1 + n0}
+
+def poder(diseno, efecto, riesgo_base, n1, razon=1.0, alfa=0.05):
+    """Poder (bilateral, aproximación normal) con n1 sujetos en el grupo índice y r * n1 en el de referencia."""
+    p1, p0 = proporciones(diseno, efecto, riesgo_base)
+    nulo, alterno, _ = _terminos(p1, p0, razon, alfa)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return norm.cdf((np.abs(p1 - p0) * np.sqrt(np.asarray(n1, dtype=float)) - nulo) / alterno)
+
+def grilla(diseno, efectos, riesgos_base, potencias=(0.8,), razones=(1.0,), alfa=0.05):
+    """Tabla de consulta: todas las combinaciones (una sola evaluación vectorizada) como DataFrame largo."""
+    E, P0, W, R = np.meshgrid(np.asarray(efectos, dtype=float), np.asarray(riesgos_base, dtype=float),
+                              np.asarray(potencias, dtype=float), np.asarray(razones, dtype=float), indexing="ij")
+    res = tamano_muestra(diseno, E, P0, W, R, alfa)
+    return pd.DataFrame({
+        "efecto": E.ravel(), "riesgo_base": P0.ravel(), "poder": W.ravel(), "razon": R.ravel(),
+        "n1": res["n1"].ravel(), "n0": res["n0"].ravel(), "total": res["total"].ravel(),
+    })
+
+def curvas_poder(diseno, efectos, riesgo_base, n1_max, razon=1.0, alfa=0.05, puntos=200):
+    """Poder para cada efecto (filas) y cada n1 en 1..n1_max (columnas): (n1, matriz de poder)."""
+    n1 = np.unique(np.linspace(1, n1_max, puntos).round())
+    return n1, poder(diseno, np.asarray(efectos, dtype=float)[:, None], riesgo_base, n1[None, :], razon, alfa)
+
+def n_precision(prevalencia, precision, conf=0.95):
+    """n para estimar una prevalencia con margen de error absoluto `precision` (encuesta transversal)."""
+    z = norm.ppf(0.5 + conf / 2)
+    p = np.asarray(prevalencia, dtype=float)
+    return np.ceil(z**2 * p * (1 - p) / np.asarray(precision, dtype=float) ** 2)
@@ -0,0 +1,147 @@
+# contenido/trazas.py
+"""
+Instrumentación ligera de reruns
+- span("nombre"): context manager que mide una sección o helper (anidable)
+- @trazar(): decorador equivalente para funciones
+- Agregación por proceso en histogramas (buckets logarítmicos en ms)
+- Panel de depuración opcional en la barra lateral + exportación JSON
+Activar el panel: EPI101_DEBUG=1 (entorno o st.secrets) o ?debug=1 en la URL.
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# --------------------------
+# CONSTANTES / CONFIG
+# --------------------------
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+SEPARADOR = " › "
+
+_lock = threading.Lock()
+_registro = {}                 # nombre -> estadísticas agregadas
+_pila = threading.local()      # spans abiertos en el hilo actual (para nombres anidados)
+
+
+# --------------------------
+# REGISTRO
+# --------------------------
+def _nuevo():
+    return {"n": 0, "total_ms": 0.0, "min_ms": float("inf"), "max_ms": 0.0, "ultimo_ms": 0.0, "buckets": [0] * (len(BUCKETS_MS) + 1)}
+
+def registrar(nombre, ms):
+    with _lock:
+        h = _registro.get(nombre)
+        if h is None:
+            h = _registro[nombre] = _nuevo()
+        h["n"] += 1
+        h["total_ms"] += ms
+        h["min_ms"] = min(h["min_ms"], ms)
+        h["max_ms"] = max(h["max_ms"], ms)
+        h["ultimo_ms"] = ms
+        h["buckets"][bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+@contextmanager
+def span(nombre):
+    """Mide el bloque; el nombre registrado incluye los spans padre del mismo hilo."""
+    pila = getattr(_pila, "nombres", None)
+    if pila is None:
+        pila = _pila.nombres = []
+    pila.append(nombre)
+    completo = SEPARADOR.join(pila)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(completo, (time.perf_counter() - t0) * 1000)
+        pila.pop()
+
+def trazar(nombre=None):
+    """Decorador: @trazar() usa el nombre de la función."""
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__name__
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with span(etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def reiniciar():
+    with _lock:
+        _registro.clear()
+
+
+# --------------------------
+# RESUMEN / EXPORT
+# --------------------------
+def percentil(h, q):
+    """Percentil aproximado a partir del histograma (límite superior del bucket)."""
+    objetivo = q * h["n"]
+    acumulado = 0
+    for i, c in enumerate(h["buckets"]):
+        acumulado += c
+        if acumulado >= objetivo and c:
+            return BUCKETS_MS[i] if i < len(BUCKETS_MS) else h["max_ms"]
+    return h["max_ms"]
+
+def resumen():
+    """Filas ordenadas por tiempo total (las secciones más costosas primero)."""
+    with _lock:
+        datos = {k: dict(v, buckets=list(v["buckets"])) for k, v in _registro.items()}
+    filas = []
+    for nombre, h in datos.items():
+        filas.append({
+            "span": nombre,
+            "n": h["n"],
+            "media_ms": round(h["total_ms"] / h["n"], 2),
+            "p50_ms": percentil(h, 0.5),
+            "p95_ms": percentil(h, 0.95),
+            "max_ms": round(h["max_ms"], 2),
+            "ultimo_ms": round(h["ultimo_ms"], 2),
+            "total_ms": round(h["total_ms"], 1),
+        })
+    return sorted(filas, key=lambda f: f["total_ms"], reverse=True)
+
+def exportar_json():
+    with _lock:
+        datos = {k: dict(v, buckets=list(v["buckets"])) for k, v in _registro.items()}
+    return json.dumps({"pid": os.getpid(), "buckets_ms": BUCKETS_MS, "spans": datos}, ensure_ascii=False, indent=1)
+
+
+# --------------------------
+# UI: panel de depuración
+# --------------------------
+def debug_activo():
+    if os.environ.get("EPI101_DEBUG") == "1":
+        return True
+    try:
+        if str(st.secrets.get("EPI101_DEBUG", "")) == "1":
+            return True
+    except Exception:
+        pass
+    try:
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+def panel_debug():
+    """Tabla de tiempos agregados del proceso en la barra lateral (solo si la depuración está activa)."""
+    if not debug_activo():
+        return
+    with st.sidebar.expander("⏱️ Depuración: tiempos por sección"):
+        filas = resumen()
+        if filas:
+            st.dataframe(filas, use_container_width=True, hide_index=True)
+        else:
+            st.caption("Sin mediciones todavía.")
+        col1, col2 = st.columns(2)
+        col1.download_button("JSON", data=exportar_json(), file_name="trazas_epi101.json", mime="application/json")
+        if col2.button("Reiniciar"):
+            reiniciar()
@@ -9,7 +9,8 @@ import os
 import random
 import requests
 import math
-from scipy.stats import chi2_contingency, fisher_exact, norm
+import time
+import functools
 
 # Streamlit extras opcional
 try:
@@ -20,14 +21,22 @@ except:
 # --- CONFIGURACIÓN STREAMLIT ---
 st.set_page_config(page_title="Epidemiología 101", layout="wide")
 
-# --- Intento de importar Gemini (Google Generative AI) ---
-try:
-    import google.generativeai as genai
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
+# --- Chat (Gemini o modelo local de prueba, con caché y streaming) ---
+from contenido.chat_epidemiologico import obtener_chat
+from contenido.recuperacion import obtener_indice, construir_prompt, citas
+from contenido.trazas import span, trazar, panel_debug
+from contenido.multimedia import video_diferido
+from contenido.tamano_muestra import DISENOS, tamano_muestra, curvas_poder, grilla
+from contenido.pruebas_diagnosticas import exactitud_diagnostica, barrido_prevalencia, evaluar_lote, tabla_resultados, METODOS_IC
+from contenido.tablas_2x2 import corregir_ceros, ic_riesgo_relativo, ic_odds_ratio, diferencia_riesgos, calcular_p_valor, interpretar_resultados
+from contenido.remuestreo import inferencia_2x2, inferencia_estratificada
+from contenido.almacen_progreso import obtener_almacen, identidad_sesion
+from contenido.analitica_items import obtener_analitica
+from contenido.reportes import descarga_diferida, huella, REPORTLAB_AVAILABLE
+from contenido.simulacion_adaptativa import simulacion_adaptativa, reporte_cohorte_pdf
 
 # --- Funciones auxiliares ---
+@trazar()
 def cargar_md(ruta):
     try:
         with open(ruta, "r", encoding="utf-8") as f:
@@ -35,6 +44,7 @@ def cargar_md(ruta):
     except:
         return None
 
+@trazar()
 def cargar_py_variable(ruta, variable):
     try:
         import importlib.util
@@ -90,47 +100,7 @@ def pagina_inicio():
     if col3.button("Ir a 2x2"):
         st.session_state.seccion = "📊 Tablas 2x2 y Cálculos"
 
-# --- 2x2 Calculations ---
-def corregir_ceros(a,b,c,d):
-    corregido = False
-    if 0 in [a,b,c,d]:
-        a += 0.5 if a==0 else 0
-        b += 0.5 if b==0 else 0
-        c += 0.5 if c==0 else 0
-        d += 0.5 if d==0 else 0
-        corregido = True
-    return a,b,c,d,corregido
-
-def ic_riesgo_relativo(a,b,c,d):
-    rr = (a/(a+b)) / (c/(c+d))
-    rr_l = rr*0.9
-    rr_u = rr*1.1
-    return rr, rr_l, rr_u
-
-def ic_odds_ratio(a,b,c,d):
-    or_ = (a*d)/(b*c)
-    or_l = or_*0.9
-    or_u = or_*1.1
-    return or_, or_l, or_u
-
-def diferencia_riesgos(a,b,c,d):
-    rd = (a/(a+b)) - (c/(c+d))
-    rd_l = rd-0.05
-    rd_u = rd+0.05
-    return rd, rd_l, rd_u
-
-def calcular_p_valor(a,b,c,d):
-    return 0.05, "Chi2"
-
-def interpretar_resultados(rr, rr_l, rr_u, or_, or_l, or_u, rd, rd_l, rd_u, p_val, test_name):
-    return f"""
-    **Resultados 2x2**
-    - Riesgo Relativo: {rr:.2f} (IC95%: {rr_l:.2f}-{rr_u:.2f})
-    - Odds Ratio: {or_:.2f} (IC95%: {or_l:.2f}-{or_u:.2f})
-    - Diferencia de Riesgos: {rd:.2f} (IC95%: {rd_l:.2f}-{rd_u:.2f})
-    - P-valor ({test_name}): {p_val}
-    """
-
+# --- 2x2 Calculations (contenido/tablas_2x2.py) ---
 def make_forest_fig(rr, rr_l, rr_u, or_, or_l, or_u):
     fig, ax = plt.subplots()
     ax.errorbar([1,2],[rr,or_],[rr-rr_l, or_-or_l],[rr_u-rr, or_u-or_], fmt='o', color="#0d3b66")
@@ -144,32 +114,182 @@ def plot_barras_expuestos(a,b,c,d):
     ax.set_title("Distribución 2x2")
     st.pyplot(fig, use_container_width=True)
 
-# --- Simulación adaptativa ---
-def sim_adapt(respuestas):
-    preguntas_demo = [
-        {"pregunta":"¿Qué es incidencia?","opciones":["Casos nuevos","Casos totales"],"respuesta_correcta":"Casos nuevos","nivel":"Principiante"},
-        {"pregunta":"RR>1 indica:","opciones":["Riesgo incrementado","Riesgo reducido"],"respuesta_correcta":"Riesgo incrementado","nivel":"Intermedio"}
-    ]
-    mensaje_demo = "Selecciona la respuesta correcta"
-    if len(respuestas) >= len(preguntas_demo):
-        return preguntas_demo[-1], "¡Has completado el módulo!"
-    return preguntas_demo[len(respuestas)], mensaje_demo
+# --- Inferencia por remuestreo (bootstrap multinúcleo + permutación exacta) ---
+@trazar()
+@st.cache_data(show_spinner="Remuestreando…")
+def remuestreo_2x2(tabla, remuestreos, semilla):
+    return pd.DataFrame(inferencia_2x2(tabla, remuestreos, semilla=semilla))
+
+@trazar()
+@st.cache_data(show_spinner="Remuestreando estratos…")
+def remuestreo_estratos(tablas, remuestreos, semilla):
+    return pd.DataFrame(inferencia_estratificada(tablas, remuestreos, semilla=semilla))
+
+def seccion_remuestreo(a, b, c, d):
+    col1, col2 = st.columns(2)
+    remuestreos = col1.select_slider("Remuestras bootstrap", [1_000, 10_000, 50_000, 100_000], value=10_000)
+    semilla = col2.number_input("Semilla", min_value=0, value=2024, step=1)
+    if min(a + b, c + d, a + c, b + d) == 0:
+        st.warning("La tabla necesita al menos una observación en cada fila y columna.")
+    else:
+        st.dataframe(remuestreo_2x2((a, b, c, d), remuestreos, semilla).round(4), hide_index=True, use_container_width=True)
+        st.caption("IC percentil y BCa por bootstrap multinomial; p exacto por permutación con márgenes fijos; "
+                   "IC exacto condicional solo para el OR.")
+    st.markdown("**Tablas estratificadas (Mantel-Haenszel)**")
+    estratos = st.data_editor(pd.DataFrame({"estrato": ["1", "2"], "a": [a, a], "b": [b, b], "c": [c, c], "d": [d, d]}),
+                              num_rows="dynamic", hide_index=True, key="estratos_2x2",
+                              column_config={k: st.column_config.NumberColumn(min_value=0, step=1) for k in "abcd"})
+    tablas = estratos.dropna(subset=["a", "b", "c", "d"])[["a", "b", "c", "d"]].astype(int)
+    # cada estrato necesita ambas filas (expuestos / no expuestos) y ambas columnas (casos / no casos)
+    margenes = pd.concat([tablas.a + tablas.b, tablas.c + tablas.d, tablas.a + tablas.c, tablas.b + tablas.d], axis=1)
+    if (tablas < 0).any().any() or not (margenes > 0).all().all():
+        st.warning("Cada estrato necesita conteos no negativos y al menos una observación en cada fila y columna.")
+    elif len(tablas) >= 2:
+        st.dataframe(remuestreo_estratos(tuple(map(tuple, tablas.to_numpy())), remuestreos, semilla).round(4), hide_index=True, use_container_width=True)
+
+# --- Exactitud diagnóstica (misma tabla a/b/c/d: prueba × enfermedad) ---
+def fig_barrido_prevalencia(sens, spec, prev_muestra):
+    prevalencias = np.linspace(0.001, 0.999, 5000)
+    vpp, vpn = barrido_prevalencia(sens, spec, prevalencias)
+    fig, ax = plt.subplots(figsize=(7,3.5))
+    ax.plot(prevalencias, vpp, label="VPP", color="#0d3b66")
+    ax.plot(prevalencias, vpn, label="VPN", color="#f95738")
+    ax.axvline(prev_muestra, linestyle="--", color="gray", label="Prevalencia de la muestra")
+    ax.set_xlabel("Prevalencia"); ax.set_ylabel("Valor predictivo"); ax.set_xscale("log")
+    ax.legend(); ax.set_title("VPP / VPN según prevalencia")
+    return fig
+
+def seccion_diagnostica():
+    col1, col2 = st.columns(2)
+    a = col1.number_input("Verdaderos positivos (a)", min_value=0, value=90)
+    b = col2.number_input("Falsos positivos (b)", min_value=0, value=15)
+    c = col1.number_input("Falsos negativos (c)", min_value=0, value=10)
+    d = col2.number_input("Verdaderos negativos (d)", min_value=0, value=185)
+    metodo = st.selectbox("Intervalo de confianza 95%", METODOS_IC, format_func=lambda m: {"wilson": "Wilson", "clopper-pearson": "Clopper-Pearson (exacto)"}[m])
+    res = exactitud_diagnostica(a, b, c, d, metodo=metodo)
+    st.dataframe(tabla_resultados(res), hide_index=True)
+    if a + c and b + d:
+        st.pyplot(fig_barrido_prevalencia(res["sensibilidad"], res["especificidad"], float(res["prevalencia"])))
+    # lote: un CSV con muchas tablas (columnas a,b,c,d o VP,FP,FN,VN) evaluado en una sola pasada
+    archivo = st.file_uploader("Lote de evaluaciones (CSV con columnas a,b,c,d o VP,FP,FN,VN)", type=["csv"])
+    if archivo:
+        try:
+            lote = evaluar_lote(pd.read_csv(archivo), metodo=metodo)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.dataframe(lote.round(4), use_container_width=True)
+            st.download_button("Descargar resultados (CSV)", lote.to_csv(index=False).encode("utf-8"), file_name="exactitud_diagnostica.csv", mime="text/csv")
+
+# --- Tamaño de muestra y poder ---
+ETIQUETAS_EFECTO = {"cohorte": ("RR esperado", "Riesgo en no expuestos"), "casos_control": ("OR esperado", "Exposición en controles"),
+                    "transversal": ("Razón de prevalencias", "Prevalencia en no expuestos"), "proporciones": ("Diferencia p1 - p0", "Proporción p0")}
+
+def seccion_tamano_muestra():
+    diseno = st.selectbox("Diseño", list(DISENOS), format_func=DISENOS.get)
+    etiqueta_efecto, etiqueta_base = ETIQUETAS_EFECTO[diseno]
+    col1, col2 = st.columns(2)
+    if diseno == "proporciones":
+        efecto = col1.slider(etiqueta_efecto, 0.01, 0.5, 0.1, 0.01)
+    else:
+        efecto = col1.slider(etiqueta_efecto, 1.1, 5.0, 2.0, 0.1)
+    riesgo_base = col2.slider(etiqueta_base, 0.01, 0.5, 0.1, 0.01)
+    col1, col2, col3 = st.columns(3)
+    potencia = col1.slider("Poder (1 - β)", 0.5, 0.99, 0.8, 0.01)
+    alfa = col2.select_slider("α (bilateral)", [0.01, 0.05, 0.1], value=0.05)
+    razon = col3.slider("Razón referencia : índice", 1, 5, 1)
+    res = tamano_muestra(diseno, efecto, riesgo_base, potencia, razon, alfa)
+    if np.isnan(res["n1"]):
+        st.warning("Combinación imposible: la proporción del grupo índice queda fuera de (0, 1).")
+        return
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Grupo índice (n1)", f"{int(res['n1']):,}")
+    col2.metric("Grupo de referencia (n0)", f"{int(res['n0']):,}")
+    col3.metric("Total", f"{int(res['total']):,}")
+    st.caption(f"p1 = {float(res['p1']):.3f}, p0 = {float(res['p0']):.3f}")
+    # curvas de poder para el efecto elegido y efectos vecinos (una evaluación vectorizada)
+    efectos = [efecto * f for f in (0.75, 1.0, 1.25)] if diseno == "proporciones" else [1 + (efecto - 1) * f for f in (0.75, 1.0, 1.25)]
+    n1, curvas = curvas_poder(diseno, efectos, riesgo_base, max(3 * res["n1"], 10), razon, alfa)
+    fig, ax = plt.subplots(figsize=(7,3.5))
+    for e, curva in zip(efectos, curvas):
+        ax.plot(n1, curva, label=f"{etiqueta_efecto} = {e:.2f}")
+    ax.axhline(potencia, linestyle="--", color="gray")
+    ax.set_xlabel("n1 (grupo índice)"); ax.set_ylabel("Poder"); ax.set_ylim(0, 1); ax.legend()
+    st.pyplot(fig)
+    # tabla de consulta: efecto × poder para el riesgo base y la razón elegidos
+    tabla = grilla(diseno, efectos, [riesgo_base], [0.8, 0.9, 0.95], [razon], alfa)
+    st.dataframe(tabla.pivot(index="efecto", columns="poder", values="total").rename(columns=lambda w: f"total (poder {w:.0%})").round(0), use_container_width=True)
+
+# --- Simulación adaptativa (contenido/simulacion_adaptativa.py, banco de contenido/ejercicios_completos.py) ---
+def nuevo_intento():
+    st.session_state.respuestas_usuario = {}
+    st.session_state.puntaje_adaptativa = 0
+    st.session_state.intento_adaptativa = int(time.time())
+    st.session_state.pregunta_adaptativa = None
+
+def avanzar_adaptativa(registrar=None):
+    """
+    Siguiente pregunta según las respuestas de la sesión, ponderada por la última instantánea de la analítica de ítems;
+    con registrar, guarda la última respuesta (una sola vez por envío).
+    """
+    pregunta, mensaje, puntaje = simulacion_adaptativa(st.session_state.respuestas_usuario, puntaje=st.session_state.puntaje_adaptativa,
+                                                       registrar=registrar, intento=st.session_state.intento_adaptativa,
+                                                       instantanea=obtener_analitica().instantanea)
+    st.session_state.pregunta_adaptativa = (pregunta, mensaje)
+    st.session_state.puntaje_adaptativa = puntaje
 
 def mostrar_confeti():
     st.balloons()
 
+# --- Progreso persistente (SQLite, escrituras asíncronas) ---
+def restaurar_progreso():
+    """Recupera aciertos, insignias y puntaje de brotes guardados del usuario (sesión nueva o cambio de alias)."""
+    usuario, _ = identidad_sesion()
+    guardado = obtener_almacen().progreso(usuario) or {"por_fuente": {}, "insignias": []}
+    # "gamificacion" conserva las respuestas de la versión anterior del cuestionario
+    gam = [guardado["por_fuente"].get(f, {}) for f in ("gamificacion", "adaptativa")]
+    st.session_state.respuestas_correctas = sum(g.get("correctas", 0) for g in gam)
+    st.session_state.index_pregunta = sum(g.get("respuestas", 0) for g in gam)
+    st.session_state.badges = guardado["insignias"]
+    st.session_state.decisions_score = guardado["por_fuente"].get("brotes", {}).get("puntos", 0)
+
+def tabla_posiciones():
+    usuario, cohorte = identidad_sesion()
+    almacen = obtener_almacen()
+    st.subheader(f"🏆 Tabla de posiciones · {cohorte}")
+    top = pd.DataFrame(almacen.top(cohorte, 10))
+    if top.empty:
+        st.caption("Aún no hay puntajes en esta cohorte.")
+    else:
+        top.index = range(1, len(top) + 1)
+        st.dataframe(top.style.apply(lambda f: ["font-weight: bold" if f["usuario"] == usuario else "" for _ in f], axis=1), use_container_width=True)
+    if REPORTLAB_AVAILABLE and not top.empty:
+        # modo lote: un PDF con todos los estudiantes de la cohorte, generado en la cola de reportes
+        descarga_diferida(f"reporte de la cohorte {cohorte}", huella("cohorte", cohorte, list(almacen.version_cohorte(cohorte))),
+                          reporte_cohorte_pdf, args=(almacen, cohorte), file_name=f"reporte_{cohorte}.pdf", key="reporte_cohorte")
+    with st.expander("Mi historial"):
+        historial = pd.DataFrame(almacen.historial(usuario, 50))
+        if not historial.empty:
+            historial["ts"] = pd.to_datetime(historial["ts"], unit="s").dt.strftime("%Y-%m-%d %H:%M")
+        st.dataframe(historial, hide_index=True, use_container_width=True)
+
 # --- Sidebar ---
 def barra_lateral(seleccion_actual):
     opciones = [
         "📚 Academia", "📈 Medidas de Asociación", "📊 Diseños de Estudio",
         "⚠️ Sesgos y Errores", "📚 Glosario Interactivo", "🧪 Ejercicios Prácticos",
         "📊 Tablas 2x2 y Cálculos", "📊 Visualización de Datos", "🎥 Multimedia YouTube",
-        "🤖 Chat Epidemiológico", "🎯 Gamificación", "📢 Brotes"
+        "🤖 Chat Epidemiológico", "🎯 Gamificación", "📢 Brotes", "📐 Tamaño de Muestra y Poder"
     ]
-    seleccion_sidebar = st.sidebar.radio("Ir a sección:", opciones, index=opciones.index(seleccion_actual) if seleccion_actual in opciones else 0)
+    # con key el radio conserva su propio estado; un index calculado en cada rerun cambiaría la identidad del
+    # widget y descartaría la elección (había que elegir dos veces). La sección de la portada lo inicializa.
+    if st.session_state.get("seccion_sidebar") not in opciones:
+        st.session_state.seccion_sidebar = seleccion_actual if seleccion_actual in opciones else opciones[0]
+    seleccion_sidebar = st.sidebar.radio("Ir a sección:", opciones, key="seccion_sidebar")
     return seleccion_sidebar
 
 # --- Main ---
+@trazar()
 def main():
     user_info = setup_auth()
     if "seccion" not in st.session_state:
@@ -177,9 +297,10 @@ def main():
         st.session_state.nivel_gamificacion = None
         st.session_state.index_pregunta = 0
         st.session_state.respuestas_correctas = 0
-        st.session_state.respuestas_usuario = {}
+        nuevo_intento()
         st.session_state.progress = 20
         st.session_state.badges = []
+        restaurar_progreso()
 
     if st.session_state.seccion is None:
         pagina_inicio()
@@ -189,159 +310,209 @@ def main():
     st.session_state.seccion = seleccion
 
     # -------------------- SECCIONES --------------------
-    if seleccion == "📚 Academia":
-        st.header("📚 Academia")
-        contenido = cargar_md("contenido/conceptosbasicos.md")
-        if contenido: st.markdown(contenido)
-        else: st.info("Archivo 'contenido/conceptosbasicos.md' no encontrado.")
-
-    elif seleccion == "📈 Medidas de Asociación":
-        st.header(seleccion)
-        contenido = cargar_md("contenido/medidas_completas.md")
-        if contenido: st.markdown(contenido)
-        else: st.info("Archivo 'contenido/medidas_completas.md' no encontrado.")
-
-    elif seleccion == "📊 Diseños de Estudio":
-        st.header(seleccion)
-        contenido = cargar_md("contenido/disenos_completos.md")
-        if contenido: st.markdown(contenido)
-        else: st.info("Archivo 'contenido/disenos_completos.md' no encontrado.")
-
-    elif seleccion == "⚠️ Sesgos y Errores":
-        st.header(seleccion)
-        contenido = cargar_md("contenido/sesgos_completos.md")
-        if contenido: st.markdown(contenido)
-        else: st.info("Archivo 'contenido/sesgos_completos.md' no encontrado.")
-
-    elif seleccion == "📚 Glosario Interactivo":
-        st.header(seleccion)
-        glosario = cargar_py_variable("contenido/glosario_completo.py","glosario")
-        if glosario:
-            for termino, definicion in glosario.items():
-                with st.expander(termino):
-                    st.write(definicion)
-        else:
-            st.info("Archivo 'glosario_completo.py' no encontrado.")
-
-    elif seleccion == "🧪 Ejercicios Prácticos":
-        st.header(seleccion)
-        preguntas = cargar_py_variable("contenido/ejercicios_completos.py","preguntas")
-        if preguntas:
-            for i,p in enumerate(preguntas):
-                st.subheader(f"Pregunta {i+1}")
-                respuesta = st.radio(p["pregunta"], p["opciones"], key=f"ej_{i}")
-                if st.button(f"Verificar {i+1}", key=f"btn_{i}"):
-                    if respuesta == p["respuesta_correcta"]:
-                        st.success("✅ Correcto")
-                    else:
-                        st.error(f"❌ Incorrecto. Respuesta: {p['respuesta_correcta']}")
-        else:
-            st.info("Archivo 'ejercicios_completos.py' no encontrado.")
-
-    elif seleccion == "📊 Tablas 2x2 y Cálculos":
-        st.header(seleccion)
-        a = st.number_input("Casos expuestos (a)", min_value=0, value=10)
-        b = st.number_input("No casos expuestos (b)", min_value=0, value=20)
-        c = st.number_input("Casos no expuestos (c)", min_value=0, value=5)
-        d = st.number_input("No casos no expuestos (d)", min_value=0, value=40)
-        if st.button("Calcular"):
-            a_,b_,c_,d_,corr = corregir_ceros(a,b,c,d)
-            rr,rr_l,rr_u = ic_riesgo_relativo(a_,b_,c_,d_)
-            or_,or_l,or_u = ic_odds_ratio(a_,b_,c_,d_)
-            rd,rd_l,rd_u = diferencia_riesgos(a_,b_,c_,d_)
-            p_val, test_name = calcular_p_valor(a_,b_,c_,d_)
-            st.markdown(interpretar_resultados(rr, rr_l, rr_u, or_, or_l, or_u, rd, rd_l, rd_u, p_val, test_name))
-            st.pyplot(make_forest_fig(rr, rr_l, rr_u, or_, or_l, or_u))
-            plot_barras_expuestos(a,b,c,d)
-
-    elif seleccion == "📊 Visualización de Datos":
-        st.header(seleccion)
-        uploaded_file = st.file_uploader("Cargar CSV", type=["csv"])
-        if uploaded_file:
-            df = pd.read_csv(uploaded_file)
-            st.dataframe(df.head())
-            num_cols = df.select_dtypes(include=np.number).columns.tolist()
-            if num_cols:
-                col = st.selectbox("Columna a graficar", num_cols)
-                fig, ax = plt.subplots()
-                df[col].value_counts().plot(kind='bar',ax=ax,color='#0d3b66')
-                st.pyplot(fig,use_container_width=True)
-
-    elif seleccion == "🎯 Gamificación":
-        st.header(seleccion)
-        if st.session_state.nivel_gamificacion is None:
-            nivel = st.radio("Nivel", ["Principiante","Intermedio","Avanzado"])
-            if st.button("Comenzar"):
-                st.session_state.nivel_gamificacion = nivel
-        else:
-            pregunta_actual, mensaje = sim_adapt(st.session_state.respuestas_usuario)
-            st.subheader(f"Pregunta {st.session_state.index_pregunta+1}")
-            st.write(pregunta_actual["pregunta"])
-            st.info(mensaje)
-            respuesta = st.radio("Selecciona tu respuesta", pregunta_actual["opciones"])
-            if st.button("Enviar"):
-                correcta = pregunta_actual["respuesta_correcta"]
-                if respuesta == correcta:
-                    st.success("✅ Correcto")
-                    mostrar_confeti()
-                    st.session_state.respuestas_correctas +=1
+    with span(f"sección {seleccion}"):
+        if seleccion == "📚 Academia":
+            st.header("📚 Academia")
+            contenido = cargar_md("contenido/conceptosbasicos.md")
+            if contenido: st.markdown(contenido)
+            else: st.info("Archivo 'contenido/conceptosbasicos.md' no encontrado.")
+
+        elif seleccion == "📈 Medidas de Asociación":
+            st.header(seleccion)
+            contenido = cargar_md("contenido/medidas_completas.md")
+            if contenido: st.markdown(contenido)
+            else: st.info("Archivo 'contenido/medidas_completas.md' no encontrado.")
+
+        elif seleccion == "📊 Diseños de Estudio":
+            st.header(seleccion)
+            contenido = cargar_md("contenido/disenos_completos.md")
+            if contenido: st.markdown(contenido)
+            else: st.info("Archivo 'contenido/disenos_completos.md' no encontrado.")
+
+        elif seleccion == "⚠️ Sesgos y Errores":
+            st.header(seleccion)
+            contenido = cargar_md("contenido/sesgos_completos.md")
+            if contenido: st.markdown(contenido)
+            else: st.info("Archivo 'contenido/sesgos_completos.md' no encontrado.")
+
+        elif seleccion == "📚 Glosario Interactivo":
+            st.header(seleccion)
+            glosario = cargar_py_variable("contenido/glosario_completo.py","glosario")
+            if glosario:
+                for termino, definicion in glosario.items():
+                    with st.expander(termino):
+                        st.write(definicion)
+            else:
+                st.info("Archivo 'glosario_completo.py' no encontrado.")
+
+        elif seleccion == "🧪 Ejercicios Prácticos":
+            st.header(seleccion)
+            preguntas = cargar_py_variable("contenido/ejercicios_completos.py","preguntas")
+            if preguntas:
+                for i,p in enumerate(preguntas):
+                    st.subheader(f"Pregunta {i+1}")
+                    respuesta = st.radio(p["pregunta"], p["opciones"], key=f"ej_{i}")
+                    if st.button(f"Verificar {i+1}", key=f"btn_{i}"):
+                        if respuesta == p["respuesta_correcta"]:
+                            st.success("✅ Correcto")
+                        else:
+                            st.error(f"❌ Incorrecto. Respuesta: {p['respuesta_correcta']}")
+            else:
+                st.info("Archivo 'ejercicios_completos.py' no encontrado.")
+
+        elif seleccion == "📊 Tablas 2x2 y Cálculos":
+            st.header(seleccion)
+            modo_2x2 = st.radio("Modo", ["Asociación (exposición × enfermedad)", "Exactitud diagnóstica (prueba × enfermedad)"], horizontal=True)
+            if modo_2x2.startswith("Exactitud"):
+                seccion_diagnostica()
+            else:
+                a = st.number_input("Casos expuestos (a)", min_value=0, value=10)
+                b = st.number_input("No casos expuestos (b)", min_value=0, value=20)
+                c = st.number_input("Casos no expuestos (c)", min_value=0, value=5)
+                d = st.number_input("No casos no expuestos (d)", min_value=0, value=40)
+                if st.button("Calcular"):
+                    a_,b_,c_,d_,corr = corregir_ceros(a,b,c,d)
+                    rr,rr_l,rr_u = ic_riesgo_relativo(a_,b_,c_,d_)
+                    or_,or_l,or_u = ic_odds_ratio(a_,b_,c_,d_)
+                    rd,rd_l,rd_u = diferencia_riesgos(a_,b_,c_,d_)
+                    p_val, test_name = calcular_p_valor(a_,b_,c_,d_)
+                    st.markdown(interpretar_resultados(rr, rr_l, rr_u, or_, or_l, or_u, rd, rd_l, rd_u, p_val, test_name))
+                    with span("figuras 2x2"):
+                        st.pyplot(make_forest_fig(rr, rr_l, rr_u, or_, or_l, or_u))
+                        plot_barras_expuestos(a,b,c,d)
+                if st.checkbox("Inferencia por remuestreo (bootstrap y permutación exacta)"):
+                    seccion_remuestreo(a, b, c, d)
+
+        elif seleccion == "📊 Visualización de Datos":
+            st.header(seleccion)
+            uploaded_file = st.file_uploader("Cargar CSV", type=["csv"])
+            if uploaded_file:
+                df = pd.read_csv(uploaded_file)
+                st.dataframe(df.head())
+                num_cols = df.select_dtypes(include=np.number).columns.tolist()
+                if num_cols:
+                    col = st.selectbox("Columna a graficar", num_cols)
+                    fig, ax = plt.subplots()
+                    df[col].value_counts().plot(kind='bar',ax=ax,color='#0d3b66')
+                    st.pyplot(fig,use_container_width=True)
+
+        elif seleccion == "🎯 Gamificación":
+            st.header(seleccion)
+            usuario, cohorte = identidad_sesion()
+            obtener_analitica()     # suscribe la analítica de ítems al flujo de respuestas
+            col1, col2 = st.columns(2)
+            alias = col1.text_input("Tu alias", value=usuario).strip() or usuario
+            if alias != usuario:
+                st.session_state.usuario_progreso = alias
+                restaurar_progreso()
+            st.session_state.cohorte_progreso = col2.text_input("Cohorte / grupo", value=cohorte).strip() or cohorte
+            if st.session_state.nivel_gamificacion is None:
+                nivel = st.radio("Nivel", ["Principiante","Intermedio","Avanzado"])
+                if st.button("Comenzar"):
+                    st.session_state.nivel_gamificacion = nivel
+            else:
+                if st.session_state.pregunta_adaptativa is None:
+                    avanzar_adaptativa()
+                pregunta_actual, mensaje = st.session_state.pregunta_adaptativa
+                n = len(st.session_state.respuestas_usuario)
+                if pregunta_actual is None:
+                    st.success(mensaje)
+                    st.caption(f"Puntaje del intento: {st.session_state.puntaje_adaptativa}")
+                    if st.button("Nuevo intento"):
+                        nuevo_intento()
+                        st.rerun()
                 else:
-                    st.error(f"❌ Incorrecto. Respuesta: {correcta}")
-                st.session_state.index_pregunta +=1
+                    st.subheader(f"Pregunta {n+1} · {pregunta_actual['nivel']}")
+                    st.write(pregunta_actual["pregunta"])
+                    st.info(mensaje)
+                    respuesta = st.radio("Selecciona tu respuesta", pregunta_actual["opciones"], key=f"respuesta_adaptativa_{n}")
+                    if st.button("Enviar"):
+                        correcta = pregunta_actual["respuesta_correcta"]
+                        if respuesta == correcta:
+                            st.success("✅ Correcto")
+                            mostrar_confeti()
+                            st.session_state.respuestas_correctas +=1
+                        else:
+                            st.error(f"❌ Incorrecto. Respuesta: {correcta}")
+                        st.session_state.respuestas_usuario[n] = {"pregunta": pregunta_actual["pregunta"], "nivel": pregunta_actual["nivel"],
+                                                                  "correcto": respuesta == correcta, "respuesta": respuesta}
+                        usuario, cohorte = identidad_sesion()
+                        avanzar_adaptativa(functools.partial(obtener_almacen().registrar, usuario, "adaptativa", cohorte=cohorte))
+                        st.session_state.index_pregunta +=1
+                        st.button("Siguiente pregunta")
+            tabla_posiciones()
+            with st.expander("📊 Analítica de ítems (última instantánea)"):
+                instantanea = obtener_analitica().instantanea
+                if instantanea.empty:
+                    st.caption("Sin respuestas registradas todavía.")
+                else:
+                    st.dataframe(instantanea.round(3), hide_index=True, use_container_width=True)
 
-    elif seleccion == "📢 Brotes":
-        st.header(seleccion)
-        st.markdown("""
-        🦠 **Brotes en Epidemiología**
+        elif seleccion == "📢 Brotes":
+            st.header(seleccion)
+            st.markdown("""
+            🦠 **Brotes en Epidemiología**
         
-        Un brote es la aparición repentina de casos de una enfermedad en una población determinada y en un tiempo específico.  
+            Un brote es la aparición repentina de casos de una enfermedad en una población determinada y en un tiempo específico.  
         
-        **Tipos de brotes:**
-        - Brote puntual: casos concentrados en un solo lugar o evento.
-        - Brote propagado: transmisión persona a persona, gradual en el tiempo.
-        - Brote mixto: combinación de ambos anteriores.
+            **Tipos de brotes:**
+            - Brote puntual: casos concentrados en un solo lugar o evento.
+            - Brote propagado: transmisión persona a persona, gradual en el tiempo.
+            - Brote mixto: combinación de ambos anteriores.
         
-        **Investigación de brotes:**
-        1. Confirmar el brote y definir caso.
-        2. Describir la distribución en tiempo, lugar y persona.
-        3. Formular hipótesis sobre la fuente y modo de transmisión.
-        4. Implementar medidas de control y prevención.
-        5. Comunicar hallazgos y lecciones aprendidas.
+            **Investigación de brotes:**
+            1. Confirmar el brote y definir caso.
+            2. Describir la distribución en tiempo, lugar y persona.
+            3. Formular hipótesis sobre la fuente y modo de transmisión.
+            4. Implementar medidas de control y prevención.
+            5. Comunicar hallazgos y lecciones aprendidas.
         
-        **Ejemplo:** brote de salmonella en una escuela tras un almuerzo contaminado.
-        """)
-
-    elif seleccion == "🎥 Multimedia YouTube":
-        st.header(seleccion)
-        videos = {
-            "Introducción": "https://www.youtube.com/watch?v=qVFP-IkyWgQ",
-            "Medidas": "https://www.youtube.com/watch?v=d61E24xvRfI"
-        }
-        for t,u in videos.items():
-            st.markdown(f"**{t}**")
-            st.video(u)
-
-    elif seleccion == "🤖 Chat Epidemiológico":
-        st.header(seleccion)
-        pregunta = st.text_input("Escribe tu pregunta epidemiológica:")
-        if st.button("Enviar") and pregunta:
-            if not GENAI_AVAILABLE:
-                st.warning("Gemini (google.generativeai) no está disponible en este entorno. Instala la librería y agrega GEMINI_API_KEY en secrets.")
-            else:
-                api_key = st.secrets.get("GEMINI_API_KEY")
-                if not api_key:
-                    st.error("No se encontró GEMINI_API_KEY en secrets.")
+            **Ejemplo:** brote de salmonella en una escuela tras un almuerzo contaminado.
+            """)
+            st.markdown("---")
+            if st.toggle("Abrir módulo PRO de simulación de brotes", key="brotes_pro"):
+                from contenido.simulacion_brotes import app as app_brotes
+                app_brotes()
+
+        elif seleccion == "📐 Tamaño de Muestra y Poder":
+            st.header(seleccion)
+            seccion_tamano_muestra()
+
+        elif seleccion == "🎥 Multimedia YouTube":
+            st.header(seleccion)
+            videos = {
+                "Introducción": "https://www.youtube.com/watch?v=qVFP-IkyWgQ",
+                "Medidas": "https://www.youtube.com/watch?v=d61E24xvRfI"
+            }
+            # miniaturas livianas; solo el video elegido crea su reproductor
+            for t,u in videos.items():
+                st.markdown(f"**{t}**")
+                video_diferido(u, key=t, grupo="multimedia")
+
+        elif seleccion == "🤖 Chat Epidemiológico":
+            st.header(seleccion)
+            pregunta = st.text_input("Escribe tu pregunta epidemiológica:")
+            if st.button("Enviar") and pregunta:
+                try:
+                    chat = obtener_chat()
+                except RuntimeError as e:
+                    st.warning(str(e))
                 else:
+                    # grounding: top passages from the course content, cited as [n]
+                    with span("recuperación"):
+                        pasajes = obtener_indice().buscar(pregunta)
                     try:
-                        genai.configure(api_key=api_key)
-                        respuesta = genai.chat.create(
-                            model="models/text-bison-001",
-                            messages=[{"author":"user","content":pregunta}]
-                        )
-                        st.write(respuesta.last.message.content)
+                        with span("respuesta chat"):
+                            st.write_stream(chat.responder_stream(pregunta, prompt=construir_prompt(pregunta, pasajes)))
+                        if pasajes:
+                            st.caption("Fuentes: " + " · ".join(citas(pasajes)))
+                    except TimeoutError as e:
+                        st.warning(str(e))
                     except Exception as e:
                         st.error(f"Error consultando Gemini: {e}")
 
+    panel_debug()
+
 # --- Run App ---
 if __name__ == "__main__":
     main()
@@ -0,0 +1,294 @@
+# herramientas/benchmarks.py
+"""
+Microbenchmarks de los kernels de cálculo con compuerta de regresión
+- seir_simulate (días y método de integración), continuación SEIR desde puntos de control, consulta al sustituto SEIR, submuestreo de series para gráficos, SEIR por edades (escenarios), agentes (población),
+  cadenas de ramificación, grillas de tamaño de muestra, funciones 2x2 (número de tablas), remuestreo 2x2
+  (remuestras, un proceso vs. pool), almacén de progreso (eventos, top-N),
+  analítica de ítems en flujo (eventos), risk_grid (resolución),
+  simulacion_adaptativa (tamaño del banco), create_pdf_report (figuras)
+- Tiempos (mediana / mínimo) y pico de memoria (tracemalloc) por caso
+- Historial JSON; falla (exit 1) si la mediana empeora más que el umbral respecto a la referencia:
+  mediana de las últimas corridas aceptadas. Las regresiones se guardan marcadas y no mueven la referencia
+  (--aceptar las registra como nueva base cuando el cambio es intencional)
+Uso: python -m herramientas.benchmarks [--umbral 0.25] [--filtro seir] [--no-guardar] [--aceptar]
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_HISTORIAL = os.path.join(RAIZ, "herramientas", "historial_benchmarks.json")
+DEFAULT_UMBRAL = 0.25
+DEFAULT_REPETICIONES = 5
+VENTANA_REFERENCIA = 5      # corridas aceptadas que forman la referencia (mediana)
+
+
+# --------------------------
+# CASOS
+# --------------------------
+def casos():
+    """Lista de (nombre, preparar) donde preparar() devuelve la función sin argumentos a medir."""
+    sys.path.insert(0, RAIZ)
+    from contenido import simulacion_brotes as sb
+    from contenido import simulacion_adaptativa as sa
+
+    lista = []
+
+    # seir_simulate en frío: se vacían los puntos de control antes de cada corrida
+    for days in [120, 365, 1000]:
+        lista.append((f"seir_simulate[days={days}]",
+                      lambda days=days: (lambda: (sb.obtener_continuacion().vaciar(), sb.seir_simulate(100000, 10, 5, 2.5, days, interventions=[(20, 0.4), (60, 0.2)])))))
+    for metodo in ["RK45", "LSODA"]:
+        lista.append((f"seir_simulate[days=365,metodo={metodo}]",
+                      lambda metodo=metodo: (lambda: (sb.obtener_continuacion().vaciar(), sb.seir_simulate(100000, 10, 5, 2.5, 365, interventions=[(20, 0.4), (60, 0.2)], metodo=metodo)))))
+
+    # "¿y si actuamos más tarde?": cada corrida mueve una intervención tardía un día (reanuda desde ~día 300)
+    for days, n_esc in [(1000, 1), (1000, 100)]:
+        def preparar_continuacion(days=days, n_esc=n_esc):
+            from contenido.continuacion_seir import ContinuacionSEIR
+            continuacion, dia = ContinuacionSEIR(), itertools.count(300)
+            R0 = np.linspace(1.2, 3.0, n_esc)
+            continuacion.simular(100000, 10, 5, R0, days, interventions_list=[[(20, 0.4)]] * n_esc)
+            return lambda: continuacion.simular(100000, 10, 5, R0, days, interventions_list=[[(20, 0.4), (next(dia), 0.3)]] * n_esc)
+        lista.append((f"seir_continuacion[days={days},escenarios={n_esc}]", preparar_continuacion))
+
+    def preparar_sustituto():
+        from contenido.sustituto_seir import SustitutoSEIR
+        sustituto = SustitutoSEIR.construir()
+        return lambda: sustituto.consultar(100000, 10, 5, 2.2, 365, 0.01)
+    lista.append(("sustituto_seir.consultar[days=365]", preparar_sustituto))
+
+    for n_esc in [1, 20]:
+        def preparar_edades(n_esc=n_esc):
+            escenarios = [[sb.cierre_escuelas(10 + k)] for k in range(n_esc)]
+            return lambda: sb.seir_por_edades(100000, 10, 5, 2.5, 365, escenarios)
+        lista.append((f"seir_edades[grupos=16,escenarios={n_esc}]", preparar_edades))
+
+    for n_agentes in [20_000, 1_000_000]:
+        def preparar_agentes(n_agentes=n_agentes):
+            from contenido.simulacion_agentes import crear_poblacion, simular_agentes
+            poblacion = crear_poblacion(n_agentes)
+            return lambda: simular_agentes(poblacion, 120, I0=max(10, n_agentes // 10000))
+        lista.append((f"simular_agentes[n={n_agentes},dias=120]", preparar_agentes))
+
+    for n_cadenas in [10_000, 100_000]:
+        def preparar_cadenas(n_cadenas=n_cadenas):
+            from contenido.procesos_ramificacion import simular_cadenas
+            return lambda: simular_cadenas(n_cadenas, 1.5, 0.5, rastreo=0.3)
+        lista.append((f"simular_cadenas[n={n_cadenas}]", preparar_cadenas))
+
+    for n in [1_000, 10_000, 100_000]:
+        def preparar_2x2(n=n):
+            from contenido import tablas_2x2 as t2
+            rng = np.random.default_rng(0)
+            tablas = rng.integers(0, 50, size=(n, 4)).tolist()
+            def correr():
+                for a, b, c, d in tablas:
+                    a_, b_, c_, d_, _ = t2.corregir_ceros(a, b, c, d)
+                    t2.ic_riesgo_relativo(a_, b_, c_, d_)
+                    t2.ic_odds_ratio(a_, b_, c_, d_)
+                    t2.diferencia_riesgos(a_, b_, c_, d_)
+            return correr
+        lista.append((f"tablas_2x2[n={n}]", preparar_2x2))
+        def preparar_lote_2x2(n=n):
+            import pandas as pd
+            from contenido.tablas_2x2 import analizar_tablas
+            tablas = pd.DataFrame(np.random.default_rng(0).integers(0, 50, size=(n, 4)), columns=list("abcd"))
+            return lambda: analizar_tablas(tablas)
+        lista.append((f"analizar_tablas[n={n}]", preparar_lote_2x2))
+
+    for remuestreos, procesos in [(10_000, None), (100_000, 1), (100_000, None)]:
+        def preparar_remuestreo(remuestreos=remuestreos, procesos=procesos):
+            from contenido.remuestreo import inferencia_2x2
+            inferencia_2x2((10, 20, 5, 40), remuestreos, procesos=procesos)     # calienta el pool
+            return lambda: inferencia_2x2((10, 20, 5, 40), remuestreos, procesos=procesos)
+        lista.append((f"remuestreo_2x2[B={remuestreos},procesos={procesos or 'pool'}]", preparar_remuestreo))
+
+    for n_eventos in [1_000, 20_000]:
+        def preparar_almacen(n_eventos=n_eventos):
+            import tempfile
+            from contenido.almacen_progreso import AlmacenProgreso
+            almacen = AlmacenProgreso(os.path.join(tempfile.mkdtemp(), "progreso.db"))
+            ronda = iter(range(10**9))
+            def correr():
+                r = next(ronda)
+                for i in range(n_eventos):
+                    almacen.registrar(f"u{i % 2000}", "gamificacion", f"{r}:{i}", puntos=10, correcto=True, cohorte=f"c{i % 20}")
+                almacen.vaciar()
+                almacen.top("c0", 10)
+            return correr
+        lista.append((f"almacen_progreso[eventos={n_eventos}]", preparar_almacen))
+
+    for n_eventos in [10_000, 100_000]:
+        def preparar_analitica(n_eventos=n_eventos):
+            from contenido.analitica_items import AnaliticaItems
+            rng = np.random.default_rng(0)
+            eventos = [{"usuario": f"u{u}", "item": f"q{q}", "correcto": bool(c), "opcion": "A" if c else "B"}
+                       for u, q, c in zip(rng.integers(0, 3000, n_eventos), rng.integers(0, 200, n_eventos), rng.random(n_eventos) < 0.6)]
+            def correr():
+                analitica = AnaliticaItems(intervalo=float("inf"))
+                for i in range(0, n_eventos, 500):
+                    analitica.consumir(eventos[i:i + 500])
+                analitica.publicar()
+            return correr
+        lista.append((f"analitica_items[eventos={n_eventos}]", preparar_analitica))
+
+    for n_puntos in [100_000, 1_000_000]:
+        def preparar_submuestreo(n_puntos=n_puntos):
+            from contenido.submuestreo import submuestrear
+            x = np.arange(n_puntos)
+            series = {f"s{k}": np.random.default_rng(k).normal(size=n_puntos).cumsum() for k in range(5)}
+            return lambda: submuestrear(x, series, 1000)
+        lista.append((f"submuestreo[puntos={n_puntos},series=5]", preparar_submuestreo))
+
+    for n_celdas in [1_000, 100_000]:
+        def preparar_grilla(n_celdas=n_celdas):
+            from contenido.tamano_muestra import grilla
+            lado = int(round((n_celdas / 8) ** 0.5))
+            return lambda: grilla("cohorte", np.linspace(1.1, 4, lado), np.linspace(0.01, 0.3, lado), [0.8, 0.9], [1, 2, 3, 4])
+        lista.append((f"tamano_muestra_grilla[celdas={n_celdas}]", preparar_grilla))
+
+    for res in [25, 100, 400]:
+        lista.append((f"risk_grid[n={res}]", lambda res=res: (lambda: sb.risk_grid(4.6, -74.07, 2.0, 0.5, n=res))))
+
+    for factor in [1, 10, 100]:
+        def preparar_adaptativa(factor=factor):
+            banco = [dict(q, pregunta=f"{q['pregunta']} #{k}") for k in range(factor) for q in sa.preguntas]
+            def correr():
+                original = sa.preguntas
+                sa.preguntas = banco
+                try:
+                    respuestas, puntaje = {}, 0
+                    for i in range(10):
+                        pregunta, _, puntaje = sa.simulacion_adaptativa(respuestas, puntaje=puntaje)
+                        if pregunta is None:
+                            break
+                        respuestas[i + 1] = {"pregunta": pregunta["pregunta"], "nivel": pregunta["nivel"], "correcto": i % 3 != 0}
+                finally:
+                    sa.preguntas = original
+            return correr
+        lista.append((f"simulacion_adaptativa[banco={len(sa.preguntas) * factor}]", preparar_adaptativa))
+
+    for n_figs in [1, 5]:
+        def preparar_pdf(n_figs=n_figs):
+            df = sb.seir_simulate(100000, 10, 5, 2.5, 365)
+            png = sb.series_png(df["day"], {"I": df["I"]})
+            lineas = [f"Línea {i}" for i in range(100)]
+            return lambda: sb.create_pdf_report("Benchmark", "subtítulo", lineas, [png] * n_figs)
+        lista.append((f"create_pdf_report[figs={n_figs}]", preparar_pdf))
+
+    return lista
+
+
+# --------------------------
+# MEDICIÓN
+# --------------------------
+def medir(funcion, repeticiones=DEFAULT_REPETICIONES):
+    funcion()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"mediana_s": statistics.median(tiempos), "min_s": min(tiempos), "pico_kb": round(pico / 1024, 1)}
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+# --------------------------
+# HISTORIAL Y REGRESIONES
+# --------------------------
+def cargar_historial(ruta=RUTA_HISTORIAL):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def guardar_historial(historial, ruta=RUTA_HISTORIAL):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(historial, f, ensure_ascii=False, indent=1)
+
+def referencia(historial, nombre, ventana=VENTANA_REFERENCIA):
+    """
+    Referencia del caso: mediana de las últimas `ventana` mediciones aceptadas (o None).
+    Las mediciones marcadas como regresión no cuentan, así una regresión no se convierte en la nueva base.
+    """
+    aceptadas = []
+    for corrida in reversed(historial):
+        r = corrida["resultados"].get(nombre)
+        if r is not None and nombre not in corrida.get("regresiones", []):
+            aceptadas.append(r["mediana_s"])
+            if len(aceptadas) == ventana:
+                break
+    return {"mediana_s": statistics.median(aceptadas)} if aceptadas else None
+
+def regresiones(resultados, historial, umbral):
+    """Casos cuya mediana supera la referencia en más de `umbral` (fracción)."""
+    peores = []
+    for nombre, r in resultados.items():
+        ref = referencia(historial, nombre)
+        if ref and r["mediana_s"] > ref["mediana_s"] * (1 + umbral):
+            peores.append((nombre, ref["mediana_s"], r["mediana_s"]))
+    return peores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks de Epidemiología 101.")
+    parser.add_argument("--umbral", type=float, default=DEFAULT_UMBRAL, help="regresión tolerada (0.25 = 25%%)")
+    parser.add_argument("--repeticiones", type=int, default=DEFAULT_REPETICIONES)
+    parser.add_argument("--filtro", default="", help="solo casos cuyo nombre contiene este texto")
+    parser.add_argument("--historial", default=RUTA_HISTORIAL)
+    parser.add_argument("--no-guardar", action="store_true", help="no añadir esta corrida al historial")
+    parser.add_argument("--aceptar", action="store_true", help="registrar los tiempos como referencia aunque empeoren (cambio intencional)")
+    args = parser.parse_args(argv)
+
+    historial = cargar_historial(args.historial)
+    resultados = {}
+    for nombre, preparar in casos():
+        if args.filtro and args.filtro not in nombre:
+            continue
+        r = medir(preparar(), args.repeticiones)
+        resultados[nombre] = r
+        ref = referencia(historial, nombre)
+        cambio = f"{(r['mediana_s'] / ref['mediana_s'] - 1) * 100:+.1f}%" if ref else "—"
+        print(f"{nombre:42} {r['mediana_s'] * 1000:10.2f} ms  (min {r['min_s'] * 1000:.2f})  {r['pico_kb']:10.1f} KB  {cambio}")
+
+    peores = regresiones(resultados, historial, args.umbral)
+    if not args.no_guardar:
+        historial.append({
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_actual(),
+            "python": platform.python_version(),
+            "maquina": platform.node(),
+            "resultados": resultados,
+            "regresiones": [] if args.aceptar else [nombre for nombre, _, _ in peores],
+        })
+        guardar_historial(historial, args.historial)
+    if peores and not args.aceptar:
+        for nombre, antes, ahora in peores:
+            print(f"REGRESIÓN {nombre}: {antes * 1000:.2f} ms -> {ahora * 1000:.2f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+# herramientas/carga.py
+"""
+Prueba de carga con sesiones concurrentes (Streamlit AppTest en un solo proceso)
+- N usuarios simulados navegan por barra_lateral y ejecutan acciones:
+  tablas 2x2, simulaciones SEIR (módulo de Brotes), gamificación y chat (modelo stub)
+- Cada usuario es un hilo con su propia sesión AppTest, todos en el mismo proceso, como las
+  sesiones de un servidor: comparten st.cache_data/st.cache_resource, el almacén de progreso,
+  la cola de reportes, los pools y el GIL, así que la contención entre sesiones sí se mide
+- Reporta percentiles de latencia de rerun por sección, throughput y el RSS máximo del proceso
+  (costo base + todas las sesiones concurrentes)
+- Una navegación que no muestra la sección elegida cuenta como error (no se reintenta)
+Uso: python -m herramientas.carga --usuarios 20 --iteraciones 3 [--salida carga.json]
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from collections import defaultdict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(RAIZ, "epi101_chat_app.py")
+
+SECCIONES = [
+    "📚 Academia", "📈 Medidas de Asociación", "📚 Glosario Interactivo",
+    "📊 Tablas 2x2 y Cálculos", "🎯 Gamificación", "📢 Brotes", "🤖 Chat Epidemiológico",
+]
+PREGUNTAS_CHAT = ["¿Qué es la incidencia?", "Diferencia entre prevalencia e incidencia", "¿Qué es el odds ratio?", "Sesgo de selección"]
+
+
+# --------------------------
+# ACCIONES POR SECCIÓN
+# --------------------------
+def _boton(at, etiqueta):
+    return next(b for b in at.button if b.label == etiqueta)
+
+def accion_2x2(at, rng):
+    for widget, valor in zip(at.main.number_input[:4], rng.integers(0, 200, size=4)):
+        widget.set_value(int(valor))
+    _boton(at, "Calcular").click()
+
+def accion_gamificacion(at, rng):
+    if any(b.label == "Comenzar" for b in at.button):
+        _boton(at, "Comenzar").click()
+        return
+    radio = at.main.radio[-1]
+    radio.set_value(radio.options[int(rng.integers(len(radio.options)))])
+    _boton(at, "Enviar").click()
+
+def accion_brotes(at, rng):
+    if not at.main.toggle[0].value:
+        at.main.toggle[0].set_value(True)
+        return
+    _boton(at, "Simular escenarios").click()
+
+def accion_chat(at, rng):
+    at.main.text_input[0].input(PREGUNTAS_CHAT[int(rng.integers(len(PREGUNTAS_CHAT)))])
+    _boton(at, "Enviar").click()
+
+ACCIONES = {
+    "📊 Tablas 2x2 y Cálculos": accion_2x2,
+    "🎯 Gamificación": accion_gamificacion,
+    "📢 Brotes": accion_brotes,
+    "🤖 Chat Epidemiológico": accion_chat,
+}
+
+
+# --------------------------
+# USUARIO SIMULADO
+# --------------------------
+class Metricas:
+    def __init__(self):
+        self.latencias = defaultdict(list)   # sección -> [segundos]
+        self.errores = defaultdict(int)
+        self.mensajes = {}                   # sección -> primer error observado
+        self.navegaciones_fallidas = 0
+        self._lock = threading.Lock()        # la comparten los hilos de todos los usuarios
+
+    def registrar(self, seccion, segundos, error=None):
+        with self._lock:
+            self.latencias[seccion].append(segundos)
+            if error:
+                self.errores[seccion] += 1
+                self.mensajes.setdefault(seccion, error)
+
+    def navegacion_fallida(self, seccion, mostrada):
+        with self._lock:
+            self.navegaciones_fallidas += 1
+            self.errores[seccion] += 1
+            self.mensajes.setdefault(seccion, f"la barra lateral mostró {mostrada!r} en vez de la sección elegida")
+
+
+def _rerun(at, seccion, metricas, timeout):
+    t0 = time.perf_counter()
+    at.run(timeout=timeout)
+    error = at.exception[0].message if at.exception else None
+    metricas.registrar(seccion, time.perf_counter() - t0, error=error)
+
+def usuario(idx, secciones, iteraciones, pausa, timeout, semilla, metricas):
+    """Un usuario simulado (un hilo con su propia sesión); acumula en las métricas compartidas."""
+    from streamlit.testing.v1 import AppTest
+    rng = np.random.default_rng(semilla + idx)
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    _rerun(at, "inicio", metricas, timeout)
+    _boton(at, "Ir a Academia").click()
+    _rerun(at, "📚 Academia", metricas, timeout)
+    if not at.sidebar.radio:
+        # la landing cambia la sección durante el mismo rerun; la barra lateral aparece en el siguiente
+        _rerun(at, "📚 Academia", metricas, timeout)
+    for _ in range(iteraciones):
+        for seccion in rng.permutation(secciones):
+            at.sidebar.radio[0].set_value(seccion)
+            _rerun(at, seccion, metricas, timeout)
+            if not at.header or at.header[0].value != seccion:
+                metricas.navegacion_fallida(seccion, at.header[0].value if at.header else None)
+                continue
+            accion = ACCIONES.get(seccion)
+            if accion is not None:
+                try:
+                    accion(at, rng)
+                except (StopIteration, IndexError) as e:
+                    metricas.registrar(seccion, 0.0, error=f"acción no disponible: {e!r}")
+                    continue
+                _rerun(at, seccion, metricas, timeout)
+            if pausa:
+                time.sleep(rng.exponential(pausa))
+
+
+def compilar_una_vez():
+    """
+    Como en un servidor (un único ScriptCache), el script se compila una sola vez para todas las sesiones.
+    AppTest crea un ScriptCache por rerun y ast.parse concurrente entre hilos falla en CPython 3.11
+    (SystemError: AST constructor recursion depth mismatch). Devuelve la función que deshace el cambio.
+    """
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    original = ScriptCache.get_bytecode
+    compilados, lock = {}, threading.Lock()
+    def get_bytecode(self, script_path):
+        with lock:
+            if script_path not in compilados:
+                compilados[script_path] = original(self, script_path)
+            return compilados[script_path]
+    ScriptCache.get_bytecode = get_bytecode
+    return lambda: setattr(ScriptCache, "get_bytecode", original)
+
+
+# --------------------------
+# REPORTE
+# --------------------------
+def rss_max_mb():
+    """RSS máximo del proceso (ru_maxrss está en KB en Linux y en bytes en macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def resumen(metricas, duracion, usuarios):
+    filas = []
+    for seccion, lat in sorted(metricas.latencias.items()):
+        arr = np.asarray(lat) * 1000
+        p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+        filas.append({"seccion": seccion, "reruns": len(arr), "errores": metricas.errores.get(seccion, 0),
+                      "primer_error": metricas.mensajes.get(seccion), "p50_ms": round(p50, 1), "p90_ms": round(p90, 1), "p99_ms": round(p99, 1), "max_ms": round(arr.max(), 1)})
+    total = sum(f["reruns"] for f in filas)
+    return {
+        "usuarios": usuarios,
+        "duracion_s": round(duracion, 2),
+        "reruns": total,
+        "throughput_reruns_s": round(total / duracion, 2) if duracion else 0.0,
+        "rss_max_mb": round(rss_max_mb(), 1),
+        "navegaciones_fallidas": metricas.navegaciones_fallidas,
+        "secciones": filas,
+    }
+
+def imprimir(res):
+    print(f"Usuarios: {res['usuarios']}  Duración: {res['duracion_s']} s  Reruns: {res['reruns']}  "
+          f"Throughput: {res['throughput_reruns_s']} reruns/s  RSS máx del proceso: {res['rss_max_mb']} MB  "
+          f"Navegaciones fallidas: {res['navegaciones_fallidas']}")
+    print(f"{'Sección':32} {'n':>5} {'err':>4} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for f in res["secciones"]:
+        print(f"{f['seccion']:32} {f['reruns']:>5} {f['errores']:>4} {f['p50_ms']:>9} {f['p90_ms']:>9} {f['p99_ms']:>9} {f['max_ms']:>9}")
+    for f in res["secciones"]:
+        if f["primer_error"]:
+            print(f"  ! {f['seccion']}: {f['primer_error']}")
+
+def ejecutar(usuarios=10, iteraciones=2, secciones=SECCIONES, pausa=0.0, timeout=120, semilla=0):
+    os.environ.setdefault("CHAT_BACKEND", "stub")   # chat sin red ni API key durante la prueba
+    os.chdir(RAIZ)                                  # la app carga contenido/*.md con rutas relativas
+    metricas = Metricas()
+    restaurar = compilar_una_vez()
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=usuarios) as pool:
+            futuros = [pool.submit(usuario, i, secciones, iteraciones, pausa, timeout, semilla, metricas) for i in range(usuarios)]
+            for f in futuros:
+                f.result()
+    finally:
+        restaurar()
+    return resumen(metricas, time.perf_counter() - t0, usuarios)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga concurrente de Epidemiología 101 (AppTest).")
+    parser.add_argument("--usuarios", type=int, default=10)
+    parser.add_argument("--iteraciones", type=int, default=2, help="recorridos completos por usuario")
+    parser.add_argument("--secciones", nargs="*", default=SECCIONES)
+    parser.add_argument("--pausa", type=float, default=0.0, help="tiempo medio de 'pensar' entre acciones (s)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="archivo JSON con el resumen")
+    args = parser.parse_args(argv)
+    res = ejecutar(args.usuarios, args.iteraciones, args.secciones, args.pausa, args.timeout, args.semilla)
+    imprimir(res)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(res, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()